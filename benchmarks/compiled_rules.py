@@ -0,0 +1,104 @@
+"""
+Compiled rules against the interpreter, both when triggering each rule once per context (i.e., joins alone) and for
+whole inference (`engine="compiled"`, as well as `engine="encoded"`). Run from the repository root, e.g.:
+
+    python -m benchmarks.compiled_rules --contexts 50 --facts 400
+"""
+import argparse
+import random
+import time
+from typing import List
+from prudens_core.entities.Policy import Policy
+from prudens_core.entities.Context import Context
+from prudens_core.entities.CompiledRule import CompiledRule
+from prudens_core.errors.RuntimeErrors import LiteralNotInContextError
+
+
+def generate_policy(n_rules: int) -> Policy:
+    rules: List[str] = [
+        "T1 :: edge(X, Y) implies path(X, Y)",
+        "T2 :: path(X, Y), edge(Y, Z) implies path(X, Z)",
+    ]
+    priorities: List[str] = []
+    for i in range(n_rules):
+        rules.append(f"R{i}a :: p{i}(X), q{i % 7}(X, Y), edge(Y, c{i % 3}) implies r{i}(Y)")
+        rules.append(f"R{i}b :: r{i}(X), s{i % 5}(X), path(X, X) implies -r{i}(X)")
+        priorities.append(f"R{i}b > R{i}a")
+    return Policy(
+        "@Policy\n" + ";\n".join(rules) + ";\n@Priorities\n" + ";\n".join(priorities) + ";"
+    )
+
+
+def generate_contexts(n_contexts: int, n_rules: int, n_facts: int, seed: int) -> List[Context]:
+    rng: random.Random = random.Random(seed)
+    contexts: List[Context] = []
+    for _ in range(n_contexts):
+        facts = set()
+        while len(facts) < n_facts:
+            i: int = rng.randrange(n_rules)
+            a: str = f"c{rng.randrange(20)}"
+            b: str = f"c{rng.randrange(20)}"
+            facts.add(
+                rng.choice(
+                    [f"p{i}({a})", f"q{i % 7}({a}, {b})", f"s{i % 5}({b})", f"edge({a}, {b})"]
+                )
+            )
+        contexts.append(Context("; ".join(facts) + ";"))
+    return contexts
+
+
+def trigger_all(rules: List, contexts: List[Context]) -> List[List]:
+    instances: List[List] = []
+    for context in contexts:
+        for rule in rules:
+            try:
+                instances.append(sorted(str(literal) for literal, _ in rule.trigger(context)))
+            except LiteralNotInContextError:
+                instances.append([])
+    return instances
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contexts", type=int, default=50)
+    parser.add_argument("--rules", type=int, default=20)
+    parser.add_argument("--facts", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    policy: Policy = generate_policy(args.rules)
+    contexts: List[Context] = generate_contexts(args.contexts, args.rules, args.facts, args.seed)
+    print(f"{args.contexts} contexts, {len(policy.rules)} rules, {args.facts} facts per context")
+    rules = {
+        "interpreter": list(policy.rules.values()),
+        "compiled": [CompiledRule.compile(rule) for rule in policy.rules.values()],
+    }
+    instances = dict()
+    baseline: float = 0.0
+    for engine in ["interpreter", "compiled"]:
+        start: float = time.perf_counter()
+        instances[engine] = trigger_all(rules[engine], contexts)
+        elapsed: float = time.perf_counter() - start
+        if engine == "interpreter":
+            baseline = elapsed
+        print(f"triggering  engine={engine:12s}  time={elapsed:8.3f}s  speedup={baseline / elapsed:6.2f}")
+    if instances["interpreter"] != instances["compiled"]:
+        raise AssertionError("Compiled rules and the interpreter disagree.")
+    inferences = dict()
+    for engine in ["interpreter", "compiled", "encoded"]:
+        start: float = time.perf_counter()
+        inferences[engine] = [policy.infer(c, engine=engine).inferences for c in contexts]
+        elapsed: float = time.perf_counter() - start
+        if engine == "interpreter":
+            baseline = elapsed
+        print(
+            f"inference   engine={engine:12s}  time={elapsed:8.3f}s  "
+            f"contexts/s={args.contexts / elapsed:9.1f}  speedup={baseline / elapsed:6.2f}"
+        )
+    if inferences["interpreter"] != inferences["compiled"]:
+        raise AssertionError("Compiled rules and the interpreter disagree.")
+    if inferences["interpreter"] != inferences["encoded"]:
+        raise AssertionError("Encoded rules and the interpreter disagree.")
+
+
+if __name__ == "__main__":
+    main()
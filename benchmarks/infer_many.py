@@ -0,0 +1,70 @@
+"""
+Scaling of `Policy.infer_many()` with the number of worker processes. Run from the repository root, e.g.:
+
+    python -m benchmarks.infer_many --contexts 2000 --max-workers 32
+"""
+import argparse
+import os
+import random
+import time
+from typing import List
+from prudens_core.entities.Policy import Policy
+from prudens_core.entities.Context import Context
+
+
+def generate_policy(n_rules: int) -> Policy:
+    rules: List[str] = []
+    priorities: List[str] = []
+    for i in range(n_rules):
+        rules.append(f"R{i}a :: p{i}(X), q{i % 7}(X, Y) implies r{i}(Y)")
+        rules.append(f"R{i}b :: r{i}(X), s{i % 5}(X) implies -r{i}(X)")
+        priorities.append(f"R{i}b > R{i}a")
+    return Policy(
+        "@Policy\n" + ";\n".join(rules) + ";\n@Priorities\n" + ";\n".join(priorities) + ";"
+    )
+
+
+def generate_contexts(n_contexts: int, n_rules: int, n_facts: int, seed: int) -> List[Context]:
+    rng: random.Random = random.Random(seed)
+    contexts: List[Context] = []
+    for _ in range(n_contexts):
+        facts = set()
+        while len(facts) < n_facts:
+            i: int = rng.randrange(n_rules)
+            a: str = f"c{rng.randrange(20)}"
+            b: str = f"c{rng.randrange(20)}"
+            facts.add(rng.choice([f"p{i}({a})", f"q{i % 7}({a}, {b})", f"s{i % 5}({b})"]))
+        contexts.append(Context("; ".join(facts) + ";"))
+    return contexts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--contexts", type=int, default=2000)
+    parser.add_argument("--rules", type=int, default=20)
+    parser.add_argument("--facts", type=int, default=40)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    policy: Policy = generate_policy(args.rules)
+    contexts: List[Context] = generate_contexts(args.contexts, args.rules, args.facts, args.seed)
+    print(f"{args.contexts} contexts, {2 * args.rules} rules, {args.facts} facts per context")
+    workers: int = 1
+    baseline: float = 0.0
+    while workers <= args.max_workers:
+        start: float = time.perf_counter()
+        for _ in policy.infer_many(contexts, workers=workers, chunksize=args.chunksize):
+            pass
+        elapsed: float = time.perf_counter() - start
+        if workers == 1:
+            baseline = elapsed
+        print(
+            f"workers={workers:3d}  time={elapsed:8.3f}s  "
+            f"contexts/s={args.contexts / elapsed:9.1f}  speedup={baseline / elapsed:6.2f}"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+from __future__ import annotations
+from typing import Union
+from math import inf
+import threading
+import time
+from prudens_core.errors.RuntimeErrors import BudgetExhaustedError
+
+
+class Budget:
+    """
+    A wall-clock and operation budget for a single inference call, which may also be cancelled (e.g., by another
+    thread) at any time. An operation is a single unification step, so the operation count bounds the work done
+    within joins as well. Checks are cooperative: `spend()` is called from within the inference loops and raises a
+    `BudgetExhaustedError` as soon as the budget runs out.
+
+    A truncated inference only returns the literals marked so far (see `Policy.infer()`). Literals are only marked
+    once the whole inference graph is computed, since until then a rule with a higher priority might still override
+    any of them. Hence, if the budget runs out while the graph is computed, nothing is inferred at all and
+    `result.inferences` holds only the facts of the context, with `result.depth` at 0.
+    """
+
+    __slots__ = ("deadline", "max_operations", "operations", "_cancelled")
+
+    def __init__(
+        self,
+        timeout: Union[None, float] = None,
+        max_operations: float = inf,
+    ) -> None:
+        """`timeout` is in seconds, counting from the creation of the budget."""
+        self.deadline: float = inf if timeout is None else time.monotonic() + timeout
+        self.max_operations: float = max_operations
+        self.operations: int = 0
+        self._cancelled: threading.Event = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def spend(self, operations: int = 1) -> None:
+        self.operations += operations
+        if self.operations > self.max_operations:
+            raise BudgetExhaustedError("operation budget exhausted")
+        if self._cancelled.is_set():
+            raise BudgetExhaustedError("cancelled")
+        if self.deadline != inf and time.monotonic() > self.deadline:
+            raise BudgetExhaustedError("deadline exceeded")
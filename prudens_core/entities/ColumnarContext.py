@@ -0,0 +1,59 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from prudens_core.entities.Context import Context
+from prudens_core.entities.SymbolTable import SymbolTable, Fact
+from prudens_core.entities.EncodedContext import EncodedContext
+from prudens_core.errors.RuntimeErrors import MissingDependencyError
+
+try:
+    import numpy as np
+except ImportError:  # Only needed by the columnar engine.
+    np = None
+
+
+class ColumnarContext(EncodedContext):
+    """
+    An encoded context that also keeps the facts of each signature as a NumPy array of codes, with one row per fact
+    and one column per argument, so that joins over it may be vectorized (see `ColumnarRule`). Arrays are built upon
+    first use and extended with the facts added since, which are kept aside until then.
+    """
+
+    __slots__ = ("_columns", "_pending")
+
+    def __init__(self, symbols: SymbolTable) -> None:
+        if np is None:
+            raise MissingDependencyError("numpy")
+        super().__init__(symbols)
+        self._columns: Dict[int, np.ndarray] = dict()
+        self._pending: Dict[int, List[Tuple[int, ...]]] = dict()
+
+    @classmethod
+    def from_context(cls, context: Context, symbols: SymbolTable) -> ColumnarContext:
+        """Raises a `ValueError` if `context` contains non-ground literals."""
+        columnar_context: ColumnarContext = cls(symbols)
+        for literal in context:
+            columnar_context.add_fact(symbols.encode_literal(literal))
+        return columnar_context
+
+    def add_fact(self, fact: Fact) -> bool:
+        if not super().add_fact(fact):
+            return False
+        try:
+            self._pending[fact[0]].append(fact[1])
+        except KeyError:
+            self._pending[fact[0]] = [fact[1]]
+        return True
+
+    def get_columns(self, signature: int, arity: int) -> np.ndarray:
+        """The arguments of all facts with the provided signature code, as an array of shape `(facts, arity)`."""
+        pending: List[Tuple[int, ...]] = self._pending.pop(signature, [])
+        try:
+            columns: np.ndarray = self._columns[signature]
+        except KeyError:
+            columns = np.empty((0, arity), dtype=np.int64)
+        if pending:
+            columns = np.concatenate(
+                [columns, np.array(pending, dtype=np.int64).reshape(len(pending), arity)]
+            )
+            self._columns[signature] = columns
+        return columns
@@ -0,0 +1,142 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple, Union
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+from prudens_core.entities.EncodedRule import EncodedRule
+from prudens_core.entities.Budget import Budget
+from prudens_core.entities.ColumnarContext import ColumnarContext, np
+from prudens_core.errors.RuntimeErrors import LiteralNotInContextError
+
+# For each body literal: its signature code, its arity, its constants (position, code) and its variables (position,
+# index of the variable in `EncodedRule.variables`); `None` for truisms.
+BodyLiteral = Union[None, Tuple[int, int, List[Tuple[int, int]], List[Tuple[int, int]]]]
+
+
+class ColumnarRule(EncodedRule):
+    """
+    An encoded rule whose body is joined over the arrays of a `ColumnarContext` as a whole, one body literal at a
+    time: constants and repeated variables filter the rows of each literal, which are then sort-merge joined with the
+    partial matches so far on their shared variables. Matches are the same as those of the encoded rule, though
+    possibly in a different order.
+    """
+
+    __slots__ = ("_literals",)
+
+    context_class: type = ColumnarContext
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        indices: Dict[Variable, int] = {x: i for i, x in enumerate(self.variables)}
+        self._literals: List[BodyLiteral] = []
+        for literal, signature in zip(self.rule.body, self.body_signatures):
+            if signature is None:
+                self._literals.append(None)
+                continue
+            constants: List[Tuple[int, int]] = []
+            variables: List[Tuple[int, int]] = []
+            for j, argument in enumerate(literal.arguments):
+                if isinstance(argument, Constant):
+                    constants.append((j, self.symbols.encode(argument)))
+                else:
+                    variables.append((j, indices[argument]))
+            self._literals.append((signature, literal.arity, constants, variables))
+
+    def trigger(
+        self,
+        facts: ColumnarContext,
+        delta: Union[None, ColumnarContext] = None,
+        budget: Union[None, Budget] = None,
+    ) -> List[Tuple[int, ...]]:
+        for i, signature in enumerate(self.body_signatures):
+            if signature is not None and not facts.has_signature(signature):
+                raise LiteralNotInContextError(self.rule.body[i])
+        if delta is None:
+            return self.__join(facts, budget=budget)
+        matches: Set[Tuple[int, ...]] = set()  # Matches using delta facts at several positions are found repeatedly.
+        for i, signature in enumerate(self.body_signatures):
+            if signature is None or not delta.has_signature(signature):
+                continue
+            matches.update(self.__join(facts, delta, i, budget))
+        return list(matches)
+
+    def __join(
+        self,
+        facts: ColumnarContext,
+        delta: Union[None, ColumnarContext] = None,
+        delta_index: int = -1,
+        budget: Union[None, Budget] = None,
+    ) -> List[Tuple[int, ...]]:
+        """The delta literal (if any), which is typically the most selective one, is joined first."""
+        order: List[int] = [i for i, x in enumerate(self._literals) if x is not None and i != delta_index]
+        if delta_index != -1:
+            order.insert(0, delta_index)
+        matches: np.ndarray = np.empty((1, 0), dtype=np.int64)
+        columns: Dict[int, int] = dict()  # The column of each bound variable in `matches`.
+        for i in order:
+            signature, arity, constants, variables = self._literals[i]
+            rows: np.ndarray = (delta if i == delta_index else facts).get_columns(signature, arity)
+            mask: Union[None, np.ndarray] = None
+            for j, code in constants:
+                mask = rows[:, j] == code if mask is None else mask & (rows[:, j] == code)
+            positions: Dict[int, int] = dict()  # The first position of each variable in the literal.
+            shared: List[Tuple[int, int]] = []
+            new: List[Tuple[int, int]] = []
+            for j, variable in variables:
+                if variable in positions.keys():
+                    equal: np.ndarray = rows[:, j] == rows[:, positions[variable]]
+                    mask = equal if mask is None else mask & equal
+                    continue
+                positions[variable] = j
+                if variable in columns.keys():
+                    shared.append((j, columns[variable]))
+                else:
+                    new.append((j, variable))
+            if mask is not None:
+                rows = rows[mask]
+            if shared:
+                left, right = self.__get_keys(
+                    matches[:, [x for _, x in shared]], rows[:, [x for x, _ in shared]]
+                )
+                left_indices, right_indices = self.__merge(left, right, budget)
+            else:
+                if budget is not None:
+                    budget.spend(len(matches) * len(rows))
+                left_indices = np.repeat(np.arange(len(matches)), len(rows))
+                right_indices = np.tile(np.arange(len(rows)), len(matches))
+            for k, (_, variable) in enumerate(new):
+                columns[variable] = matches.shape[1] + k
+            matches = np.hstack(
+                [matches[left_indices], rows[right_indices][:, [x for x, _ in new]]]
+            )
+            if len(matches) == 0:
+                return []
+        permutation: List[int] = [columns[x] for x in range(len(self.variables))]
+        return [tuple(x) for x in matches[:, permutation].tolist()]
+
+    @staticmethod
+    def __get_keys(left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Single keys for rows of several columns, such that two rows have the same key iff they are equal."""
+        if left.shape[1] == 1:
+            return left[:, 0], right[:, 0]
+        rows: np.ndarray = np.concatenate([left, right])
+        keys: np.ndarray = np.zeros(len(rows), dtype=np.int64)
+        for column in range(rows.shape[1]):
+            _, codes = np.unique(rows[:, column], return_inverse=True)
+            _, keys = np.unique(keys * (codes.max() + 1) + codes, return_inverse=True)  # Kept small, not to overflow.
+        return keys[: len(left)], keys[len(left) :]
+
+    @staticmethod
+    def __merge(
+        left: np.ndarray, right: np.ndarray, budget: Union[None, Budget] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """The indices of all pairs of equal keys in `left` and `right`, by sorting `right` and searching in it."""
+        order: np.ndarray = np.argsort(right, kind="stable")
+        sorted_right: np.ndarray = right[order]
+        starts: np.ndarray = np.searchsorted(sorted_right, left, side="left")
+        counts: np.ndarray = np.searchsorted(sorted_right, left, side="right") - starts
+        total: int = int(counts.sum())
+        if budget is not None:
+            budget.spend(len(left) + len(right) + total)
+        left_indices: np.ndarray = np.repeat(np.arange(len(left)), counts)
+        offsets: np.ndarray = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return left_indices, order[np.repeat(starts, counts) + offsets]
@@ -0,0 +1,169 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple, Union, Callable, Iterator
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+from prudens_core.entities.Context import Context
+from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Rule import Rule
+from prudens_core.entities.Budget import Budget
+from prudens_core.entities.SymbolTable import SymbolTable
+from prudens_core.parsers.VariableParser import VariableType
+from prudens_core.errors.RuntimeErrors import LiteralNotInContextError
+
+
+class CompiledRule:
+    """
+    A rule compiled to a Python function that joins its body over the facts' argument tuples, with the join order,
+    constant checks and variable bindings inlined, so no substitutions or literal instances are created until a
+    match is complete. It is a drop-in replacement for `Rule.trigger()`, producing the same instances and the same
+    substitutions (bound in the order their variables appear in the body). Use `CompiledRule.compile()`, which
+    returns `None` for rules that cannot be compiled (e.g., rules with expressions as arguments), so that these are
+    left to the interpreter.
+    """
+
+    __slots__ = ("rule", "source", "variables", "head_arguments", "_match")
+
+    def __init__(
+        self,
+        rule: Rule,
+        source: str,
+        variables: List[Variable],
+        head_arguments: List[Union[int, Variable, Constant]],
+    ) -> None:
+        self.rule: Rule = rule
+        self.source: str = source  # Kept for debugging.
+        self.variables: List[Variable] = variables
+        self.head_arguments: List[Union[int, Variable, Constant]] = head_arguments
+        namespace: Dict = {"LiteralNotInContextError": LiteralNotInContextError, "body": rule.body}
+        exec(compile(source, f"<rule {rule.name}>", "exec"), namespace)
+        self._match: Callable = namespace["match"]
+
+    @classmethod
+    def compile(cls, rule: Rule) -> Union[None, CompiledRule]:
+        generated: Union[None, Tuple[str, List[Variable], Dict[Variable, int]]] = cls._generate(rule)
+        if generated is None:
+            return None
+        source, variables, indices = generated
+        head_arguments: List[Union[int, Variable, Constant]] = []
+        for argument in rule.head.arguments:
+            if isinstance(argument, Variable) and argument.type != VariableType.VARIABLE:
+                return None
+            if isinstance(argument, Variable) and argument in indices.keys():
+                head_arguments.append(indices[argument])
+            else:
+                head_arguments.append(argument)  # Left as is, as `Substitution.apply()` does.
+        return cls(rule, source, variables, head_arguments)
+
+    @staticmethod
+    def _generate(
+        rule: Rule, symbols: Union[None, SymbolTable] = None
+    ) -> Union[None, Tuple[str, List[Variable], Dict[Variable, int]]]:
+        """
+        The source of the join function of `rule`, its variables in the order they are bound and their indices, or
+        `None` if it cannot be compiled. If `symbols` is provided, the function joins over argument tuples encoded
+        through it (see `EncodedContext`) instead of literals.
+        """
+        variables: List[Variable] = []
+        indices: Dict[Variable, int] = dict()
+        constants: List[str] = []
+        lines: List[str] = ["def match(buckets, spend):", "    results = []"]
+        indent: str = "    "
+        for i, literal in enumerate(rule.body):
+            if literal.is_truism():
+                continue
+            lines.append(f"{indent}if buckets[{i}] is None:")
+            lines.append(f"{indent}    raise LiteralNotInContextError(body[{i}])")
+            lines.append(f"{indent}for f{i} in buckets[{i}]:")
+            indent += "    "
+            lines.append(f"{indent}if spend is not None:")
+            lines.append(f"{indent}    spend()")
+            if literal.arity > 0:
+                lines.append(f"{indent}a = f{i}" if symbols is not None else f"{indent}a = f{i}.arguments")
+            checks: List[str] = []
+            for j, argument in enumerate(literal.arguments):
+                if isinstance(argument, Constant):
+                    if symbols is not None:
+                        constants.append(f"k{len(constants)} = {symbols.encode(argument)}")
+                    else:
+                        constants.append(f"k{len(constants)} = body[{i}].arguments[{j}]")
+                    checks.append(f"a[{j}] != k{len(constants) - 1}")
+                elif argument.type != VariableType.VARIABLE:
+                    return None
+                elif argument in indices.keys():
+                    checks.append(f"a[{j}] != v{indices[argument]}")
+                else:
+                    indices[argument] = len(variables)
+                    variables.append(argument)
+                    if checks:
+                        lines.append(f"{indent}if {' or '.join(checks)}:")
+                        lines.append(f"{indent}    continue")
+                        checks = []
+                    lines.append(f"{indent}v{indices[argument]} = a[{j}]")
+            if checks:
+                lines.append(f"{indent}if {' or '.join(checks)}:")
+                lines.append(f"{indent}    continue")
+        lines.append(f"{indent}results.append(({''.join(f'v{k}, ' for k in range(len(variables)))}))")
+        lines.append("    return results")
+        return "\n".join(constants + lines) + "\n", variables, indices
+
+    def trigger(
+        self,
+        context: Context,
+        delta: Union[None, Context] = None,
+        budget: Union[None, Budget] = None,
+    ) -> Iterator[Tuple[Literal, Substitution]]:
+        """
+        Same as `Rule.trigger()`. The generated function compares arguments to constants and bindings as they are, so if
+        some fact the body is joined against is not ground, the rule is triggered through `Rule.trigger()` instead.
+        """
+        body: List[Literal] = self.rule.body
+        spend: Union[None, Callable] = budget.spend if budget is not None else None
+        if not self.__is_ground(context):
+            return self.rule.trigger(context, delta, budget)
+        if delta is None:
+            matches: List[Tuple] = self._match(self.__get_buckets(context), spend)
+        else:
+            for literal in body:
+                if not context.has_signature(literal):
+                    raise LiteralNotInContextError(literal)
+            matches = []
+            for i, literal in enumerate(body):
+                if literal.is_truism() or not delta.has_signature(literal):
+                    continue
+                matches += self._match(self.__get_buckets(context, delta, i), spend)
+        return (self.__instantiate(values) for values in matches)
+
+    def __is_ground(self, context: Context) -> bool:
+        """Whether all facts of `context` the body is joined against are ground (those of a delta are among them)."""
+        for literal in self.rule.body:
+            if not literal.is_truism() and not context.is_ground_signature(literal.signature):
+                return False
+        return True
+
+    def __get_buckets(
+        self, context: Context, delta: Union[None, Context] = None, delta_index: int = -1
+    ) -> List[Union[None, List[Literal]]]:
+        """The facts each body literal is joined against, or `None` if there are none with its signature."""
+        buckets: List[Union[None, List[Literal]]] = []
+        for i, literal in enumerate(self.rule.body):
+            if literal.is_truism():
+                buckets.append(None)
+            elif i == delta_index:
+                buckets.append(delta.get_bucket(literal.signature))
+            elif not context.has_signature(literal):
+                buckets.append(None)
+            elif i < delta_index:
+                buckets.append(
+                    [x for x in context.get_bucket(literal.signature) if x not in delta]
+                )
+            else:
+                buckets.append(context.get_bucket(literal.signature))
+        return buckets
+
+    def __instantiate(self, values: Tuple) -> Tuple[Literal, Substitution]:
+        sub: Substitution = Substitution.from_values(self.variables, values)
+        head: Literal = self.rule.head.with_arguments(
+            [values[x] if isinstance(x, int) else x for x in self.head_arguments]
+        )
+        return head, sub
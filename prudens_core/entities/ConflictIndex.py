@@ -0,0 +1,46 @@
+from __future__ import annotations
+from typing import Dict, List, Set
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Substitution import Substitution
+
+
+class ConflictIndex:
+    """
+    The rule instances that are still consistent during an inference, by their heads. So, the rules with instances
+    that conflict with a ground literal are found by looking up its complement instead of applying and comparing the
+    substitutions of all candidate rules. Non-ground heads, i.e., of rules with head variables missing from their
+    bodies, may conflict with many literals, so they are kept aside and checked through unification.
+    """
+
+    __slots__ = ("heads", "open_heads")
+
+    def __init__(self) -> None:
+        self.heads: Dict[Literal, Dict[str, Set[Substitution]]] = dict()
+        self.open_heads: Dict[str, List[Literal]] = dict()
+
+    def add(self, head: Literal, rule_subs: Dict[str, Set[Substitution]]) -> None:
+        """Records that each rule in `rule_subs` infers `head` under each of its substitutions."""
+        if head.is_ground():
+            self.heads[head] = rule_subs
+            return
+        for rule_name in rule_subs.keys():
+            try:
+                self.open_heads[rule_name].append(head)
+            except KeyError:
+                self.open_heads[rule_name] = [head]
+
+    def get_conflicting_rules(self, literal: Literal) -> Set[str]:
+        """All recorded rules with an instance whose head conflicts with `literal`."""
+        if literal.is_ground():
+            rules: Set[str] = set(self.heads.get(literal.complement(), ()))
+        else:
+            rules = {
+                rule_name
+                for head, rule_subs in self.heads.items()
+                if literal.is_conflicting_with(head)
+                for rule_name in rule_subs.keys()
+            }
+        for rule_name, heads in self.open_heads.items():
+            if rule_name not in rules and any(literal.is_conflicting_with(x) for x in heads):
+                rules.add(rule_name)
+        return rules
@@ -1,4 +1,6 @@
 from __future__ import annotations
+import re
+import weakref
 from typing import Union, Dict
 from prudens_core.parsers.ConstantParser import (
     ConstantParser,
@@ -9,7 +11,10 @@ import prudens_core.utilities.utils as utils
 
 
 class Constant:
-    __slots__ = ("original_string", "value", "type")
+    __slots__ = ("original_string", "value", "type", "_hash", "__weakref__")
+
+    # Constants in use, by their string representation, so that repeated constants share a single object.
+    _interned: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
 
     def __init__(self, constant_string: str) -> None:
         parser: ConstantParser = ConstantParser(constant_string)
@@ -20,6 +25,23 @@ class Constant:
         self.original_string: str = constant_string
         self.value: Union[int, float, str] = parsed_constant.value
         self.type: ConstantType = parsed_constant.type
+        self._hash: int = self.__get_hash()
+
+    @classmethod
+    def interned(cls, constant_string: str) -> Constant:
+        """The shared instance of the constant `constant_string` stands for; constants are never modified in place."""
+        try:
+            return cls._interned[constant_string]
+        except KeyError:
+            pass
+        return cls.__intern(cls(constant_string), constant_string)
+
+    @classmethod
+    def __intern(cls, constant: Constant, *keys: str) -> Constant:
+        constant = cls._interned.setdefault(str(constant), constant)
+        for key in keys:
+            cls._interned[key] = constant
+        return constant
 
     @classmethod
     def from_dict(cls, init_dict: dict) -> Constant:
@@ -44,8 +66,30 @@ class Constant:
             raise KeyError(
                 f"Wrong constant type provided: '{constant_type}'. Accepted types: {[x.name for x in ConstantType]}."
             )
+        constant._hash = constant.__get_hash()
         return constant
 
+    @classmethod
+    def from_value(cls, value: Union[int, float, str]) -> Constant:
+        """The constant with the provided value, e.g., as returned by an external predicate."""
+        constant = cls.__new__(cls)
+        constant.value = value
+        if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+            raise TypeError(
+                f"Expected input of type 'int', 'float' or 'str' for Constant.value but received {type(value)}."
+            )
+        if isinstance(value, int):
+            constant.type = ConstantType.INT
+        elif isinstance(value, float):
+            constant.type = ConstantType.FLOAT
+        elif re.fullmatch(r"[a-z]\w*", value, flags=re.ASCII):
+            constant.type = ConstantType.ENTITY
+        else:
+            constant.type = ConstantType.STRING
+        constant.original_string = str(constant)
+        constant._hash = constant.__get_hash()
+        return cls.__intern(constant)
+
     def to_dict(self) -> Dict:
         return {
             "original_string": self.original_string,
@@ -58,17 +102,36 @@ class Constant:
             return self.value == other.value and self.type == other.type
         return True  # FIXME You have to somehow manage cyclic references (Constants <-> Variables).
 
-    def __hash__(self) -> int:
+    def __get_hash(self) -> int:
         h = 2166136261
         h = (h * 16777619) ^ hash(self.value)
         h = (h * 16777619) ^ hash(self.type.name)
         return h
 
+    def __hash__(self) -> int:
+        return self._hash
+
     def __eq__(self, other: Constant) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Constant):
             return False
         return self.type == other.type and self.value == other.value
 
+    def __getstate__(self) -> Dict:
+        """String hashes differ between processes, so the cached hash is not pickled."""
+        return {
+            "original_string": self.original_string,
+            "value": self.value,
+            "type": self.type,
+        }
+
+    def __setstate__(self, state: Dict) -> None:
+        self.original_string = state["original_string"]
+        self.value = state["value"]
+        self.type = state["type"]
+        self._hash = self.__get_hash()
+
     def __str__(self) -> str:
         if self.type == ConstantType.INT or self.type == ConstantType.FLOAT:
             return str(self.value)
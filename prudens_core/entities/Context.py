@@ -1,8 +1,11 @@
 from __future__ import annotations
-from typing import Union, Dict, List
+from typing import Union, Dict, List, Set, Iterator, Tuple, Sequence
 from copy import deepcopy
 from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
 from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Budget import Budget
 from prudens_core.parsers.ContextParser import ContextParser
 from prudens_core.errors.RuntimeErrors import (
     LiteralNotInContextError,
@@ -11,23 +14,29 @@ from prudens_core.errors.RuntimeErrors import (
 import prudens_core.utilities.utils as utils
 
 
+Index = Dict[Union[None, Constant], List[Literal]]
+
+
 class Context:
     __slots__ = (
         "original_string",
         "facts",
-        "_current_bucket",
-        "_current_bucket_index",
-        "_buckets",
+        "_ground",
         "_length",
+        "_indexes",
+        "_index_requests",
     )
 
+    INDEX_MIN_BUCKET_SIZE: int = 8  # Smaller buckets are cheaper to scan than to index.
+    INDEX_MIN_REQUESTS: int = 2  # Lookups on a bucket position before it is indexed.
+
     def __init__(self, context_str: str = "") -> None:
         self.original_string: str = context_str
         self.facts: Dict[int, List[Literal]] = dict()
-        self._current_bucket: int = -1
-        self._current_bucket_index: int = -1
-        self._buckets: List[int] = []
+        self._ground: Dict[int, Set[Literal]] = dict()
         self._length: int = 0
+        self._indexes: Dict[int, Dict[int, Index]] = dict()
+        self._index_requests: Dict[Tuple[int, int], int] = dict()
         if context_str:
             parser: ContextParser = ContextParser(self.original_string)
             try:
@@ -38,7 +47,10 @@ class Context:
                 self.add_literal(fact)
         """Some notes here:
         self.facts is not just a dict, but actually a bucket hash-table, i.e., a dict with partial hashes as keys
-        and lists of literals as values, such that each literal in the list has the same partial hash value."""
+        and lists of literals as values, such that each literal in the list has the same partial hash value.
+        Besides, buckets may have secondary indexes on argument positions (see `self.candidates()`), while the
+        ground facts of each bucket are also kept in a set (i.e., self._ground), so that membership takes constant
+        time."""
 
     @classmethod
     def from_dict(cls, init_dict: Dict) -> Context:
@@ -50,26 +62,12 @@ class Context:
             default_value="",
             expected_types=[str],
         )
-        context._current_bucket = utils.parse_dict_prop(
-            init_dict,
-            "current_bucket",
-            "Context",
-            default_value=-1,
-            expected_types=[int],
-        )
-        context._current_bucket_index = utils.parse_dict_prop(
-            init_dict,
-            "current_bucket_index",
-            "Context",
-            default_value=-1,
-            expected_types=[int],
-        )
-        context._buckets = utils.parse_dict_prop(
-            init_dict, "buckets", "Context", default_value=[], expected_types=[list]
-        )
         context._length = utils.parse_dict_prop(
             init_dict, "length", "Context", default_value=0, expected_types=[int]
         )
+        context._ground = dict()
+        context._indexes = dict()
+        context._index_requests = dict()
         try:
             context_facts = init_dict["facts"]
         except KeyError:
@@ -89,7 +87,10 @@ class Context:
             context.facts[bucket] = []
             for l in literals:
                 try:
-                    context.facts[bucket].append(Literal.from_dict(l))
+                    literal: Literal = Literal.from_dict(l)
+                    context.facts[bucket].append(literal)
+                    if literal.is_ground():
+                        context._ground.setdefault(bucket, set()).add(literal)
                 except KeyError as e:
                     raise KeyError(
                         f"While parsing context from a dict, literal dict {l} could not be properly "
@@ -111,35 +112,132 @@ class Context:
         return {
             "original_string": self.original_string,
             "facts": {k: [l.to_dict() for l in v] for k, v in self.facts.items()},
-            "current_bucket": self._current_bucket,
-            "current_bucket_index": self._current_bucket_index,
-            "buckets": self._buckets,
             "length": self._length,
         }
 
     def add_literal(self, literal: Literal) -> None:
         if self.__contains(literal):
             raise LiteralAlreadyInContextError(literal)
+        self._insert(literal)
+
+    def remove_literal(self, literal: Literal) -> None:
         literal_hash: int = self.__get_hash(literal)
+        self.facts[literal_hash].remove(literal)
+        if literal.is_ground():
+            self._ground[literal_hash].discard(literal)
+        self.__unindex(literal_hash, literal)
+        self._length -= 1
+
+    def _insert(self, literal: Literal) -> None:
+        """Adds `literal` to its bucket and to any indexes on it, without checking whether it is already there."""
+        literal_hash: int = hash(literal.signature)
         if literal_hash in self.facts.keys():
             self.facts[literal_hash].append(literal)
         else:
             self.facts[literal_hash] = [literal]
+        if literal.is_ground():
+            try:
+                self._ground[literal_hash].add(literal)
+            except KeyError:
+                self._ground[literal_hash] = {literal}
+        try:
+            indexes: Dict[int, Index] = self._indexes[literal_hash]
+        except KeyError:
+            pass
+        else:
+            for position, index in indexes.items():
+                key: Union[None, Constant] = self.__get_key(literal, position)
+                if key in index.keys():
+                    index[key].append(literal)
+                else:
+                    index[key] = [literal]
         self._length += 1
 
-    def remove_literal(self, literal: Literal) -> None:
-        literal_hash: int = self.__get_hash(literal)
-        self.facts[literal_hash].remove(literal)
-        self._length -= 1
+    def __unindex(self, literal_hash: int, literal: Literal) -> None:
+        try:
+            indexes: Dict[int, Index] = self._indexes[literal_hash]
+        except KeyError:
+            return
+        if len(self.facts[literal_hash]) == 0:
+            del self._indexes[literal_hash]
+            return
+        for position, index in indexes.items():
+            key: Union[None, Constant] = self.__get_key(literal, position)
+            index[key].remove(literal)
+            if len(index[key]) == 0:
+                del index[key]
+
+    @staticmethod
+    def __get_key(literal: Literal, position: int) -> Union[None, Constant]:
+        """Facts with a variable at `position` are indexed under `None`, since they unify with any constant."""
+        argument = literal.arguments[position]
+        return argument if isinstance(argument, Constant) else None
+
+    def candidates(self, literal: Literal) -> List[Literal]:
+        """
+        The facts that might unify with `literal`, i.e., a superset of those that do. If `literal` has some constant
+        argument and the bucket of its signature is large enough, these are looked up in an index on the position of
+        that argument, which is built once there have been enough lookups on it and kept up to date from then on.
+        Hence, lookups with bound arguments take time proportional to the number of matches instead of bucket size.
+        """
+        return self._lookup(self.__get_hash(literal), literal.arguments)
+
+    def lookup(self, signature: str, arguments: Sequence[Union[Variable, Constant]]) -> List[Literal]:
+        """
+        Same as `self.candidates()`, for a literal with the provided signature and arguments, so that callers may probe
+        with bound values (e.g., those of a join) without building a literal for each.
+        """
+        return self._lookup(hash(signature), arguments)
+
+    def _lookup(self, literal_hash: int, arguments: Sequence[Union[Variable, Constant]]) -> List[Literal]:
+        try:
+            bucket: List[Literal] = self.facts[literal_hash]
+        except KeyError:
+            return []
+        if len(bucket) < self.INDEX_MIN_BUCKET_SIZE:
+            return bucket
+        indexes: Dict[int, Index] = self._indexes.get(literal_hash, dict())
+        position: int = -1
+        for i, argument in enumerate(arguments):
+            if not isinstance(argument, Constant):
+                continue
+            if i in indexes.keys():
+                position = i
+                break
+            if position == -1:
+                position = i
+        if position == -1:
+            return bucket
+        if position not in indexes.keys():
+            requests: int = self._index_requests.get((literal_hash, position), 0) + 1
+            self._index_requests[(literal_hash, position)] = requests
+            if requests < self.INDEX_MIN_REQUESTS:
+                return bucket
+            index: Index = dict()
+            for fact in bucket:
+                key: Union[None, Constant] = self.__get_key(fact, position)
+                if key in index.keys():
+                    index[key].append(fact)
+                else:
+                    index[key] = [fact]
+            indexes[position] = index  # Only published once complete, so readers never see a partial index.
+            self._indexes[literal_hash] = indexes
+        index = indexes[position]
+        matches: List[Literal] = index.get(arguments[position], [])
+        if None in index.keys():
+            return matches + index[None]
+        return matches
 
     def unify(
-        self, literal: Literal
+        self, literal: Literal, exclude: Union[None, Context] = None
     ) -> List[Substitution]:  # TODO Make this a generator? Check line 109 in Rule.py...
         """
         Substitution semantics are as follows:
             * [...]: First-order sub;
             * [Substitution()]: Propositional sub (nothing to substitute);
             * None: Failed to unify --> Captured by a LiteralNotInContextError.
+        Facts that also appear in `exclude` are skipped (used for semi-naive evaluation, where `exclude` is the
+        latest delta).
         """
         if literal.is_truism():
             return [Substitution()]
@@ -152,7 +250,9 @@ class Context:
         # print("hash included")
         subs: List[Substitution] = []
         # print("bucket:", [str(x) for x in self.facts[literal_hash]])
-        for fact in self.facts[literal_hash]:
+        for fact in self.candidates(literal):
+            if exclude is not None and fact in exclude:
+                continue
             sub: Union[None, Substitution] = literal.unify(fact)
             # print("sub in context.unify():", sub)
             if sub:
@@ -166,16 +266,41 @@ class Context:
             return True
         if literal.is_truism():
             return [Substitution()]
-        literal_hash: int = self.__get_hash(literal)
-        if literal_hash not in self.facts.keys():
-            return False
-        for fact in self.facts[literal_hash]:
+        for fact in self.candidates(literal):
             if literal.unifies(fact):
                 return True
         return False
 
-    def remove_conflicts_with(self, ground_facts: Context) -> None:
+    def get_bucket(self, signature: str) -> List[Literal]:
+        """All facts with the provided signature."""
+        try:
+            return self.facts[hash(signature)]
+        except KeyError:
+            return []
+
+    def count_signature(self, signature: str) -> int:
+        """The number of facts with the provided signature."""
+        try:
+            return len(self.facts[hash(signature)])
+        except KeyError:
+            return 0
+
+    def is_ground_signature(self, signature: str) -> bool:
+        """Whether all facts with the provided signature are ground, in constant time."""
+        literal_hash: int = hash(signature)
+        return len(self._ground.get(literal_hash, ())) == len(self.facts.get(literal_hash, ()))
+
+    def has_signature(self, literal: Literal) -> bool:
+        """Whether there is at least one fact sharing `literal`'s signature. Truisms are always present."""
+        if literal.is_truism():
+            return True
+        return self.__get_hash(literal) in self.facts.keys()
+
+    def remove_conflicts_with(self, ground_facts: Context, budget: Union[None, Budget] = None) -> None:
+        """Each fact in `ground_facts` costs one operation of `budget`."""
         for ground_fact in ground_facts:
+            if budget is not None:
+                budget.spend()
             negated_hash: int = self.__get_hash(ground_fact, negate=True)
             try:
                 bucket: List[Literal] = self.facts[negated_hash]
@@ -187,11 +312,16 @@ class Context:
                 fact: Literal = bucket[i]
                 if fact.is_conflicting_with(ground_fact):
                     del bucket[i]
+                    if fact.is_ground():
+                        self._ground[negated_hash].discard(fact)
+                    self.__unindex(negated_hash, fact)
+                    self._length -= 1
                     n -= 1
                 else:
                     i += 1
             if len(bucket) == 0:
                 del self.facts[negated_hash]
+                self._ground.pop(negated_hash, None)
 
     def __get_hash(self, literal: Literal, negate: bool = False) -> int:
         signature: str = literal.signature
@@ -200,31 +330,18 @@ class Context:
         return hash(signature)
 
     def __contains(self, literal: Literal) -> bool:
-        try:
-            return literal in self.facts[self.__get_hash(literal)]
-        except KeyError:
-            return False
-
-    def __iter__(self) -> Context:
-        self._buckets = list(self.facts.keys())
-        return self
-
-    def __next__(self) -> Literal:
-        if len(self.facts) == 0:
-            raise StopIteration
-        if self._current_bucket == -1 or self._current_bucket_index == len(
-            self.facts[self._current_bucket]
-        ):
+        """Own facts only, even for subclasses. Ground literals only equal ground facts, so only these are scanned."""
+        if literal.is_ground():
             try:
-                self._current_bucket = self._buckets.pop()
-            except IndexError:
-                raise StopIteration
-            self._current_bucket_index = 0
-        next_literal: Literal = self.facts[self._current_bucket][
-            self._current_bucket_index
-        ]
-        self._current_bucket_index += 1
-        return next_literal
+                return literal in self._ground[self.__get_hash(literal)]
+            except KeyError:
+                return False
+        return literal in Context.candidates(self, literal)
+
+    def __iter__(self) -> Iterator[Literal]:
+        """Each call returns an independent iterator, so a context may be iterated over by many threads at once."""
+        for bucket in reversed(list(self.facts.values())):
+            yield from bucket
 
     def __len__(self) -> int:
         return self._length
@@ -275,12 +392,11 @@ class Context:
     def __deepcopy__(self, memodict={}) -> Context:
         copycat: Context = Context()
         copycat.original_string = self.original_string
-        copycat._current_bucket = self._current_bucket
-        copycat._current_bucket_index = self._current_bucket_index
-        copycat._buckets = self._buckets
         copycat._length = self._length
         for bucket, literals in self.facts.items():
             copycat.facts[bucket] = [x for x in literals]
+        for bucket, literals in self._ground.items():
+            copycat._ground[bucket] = {x for x in literals}
         return copycat
 
     def __hash__(self) -> int:
@@ -0,0 +1,107 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Rule import Rule
+
+
+class DependencyGraph:
+    """
+    The predicate dependency graph of a policy. Nodes are unsigned literal signatures (so that a literal and its
+    negation, which may conflict with each other, always share a node) and there is an edge from each body predicate
+    of a rule to its head predicate.
+    """
+
+    __slots__ = ("rules", "nodes", "edges", "rule_nodes")
+
+    def __init__(self, rules: Dict[str, Rule]) -> None:
+        self.rules: Dict[str, Rule] = rules
+        self.nodes: List[str] = []
+        self.edges: Dict[str, Set[str]] = dict()
+        self.rule_nodes: Dict[str, str] = dict()
+        for rule_name, rule in rules.items():
+            head_node: str = self.__add_node(rule.head)
+            self.rule_nodes[rule_name] = head_node
+            for literal in rule.body:
+                if literal.is_truism():
+                    continue
+                self.edges[self.__add_node(literal)].add(head_node)
+
+    @staticmethod
+    def get_node(literal: Literal) -> str:
+        """The node of `literal`, i.e., its signature without the leading '-' of negative literals."""
+        return literal.signature if literal.sign else literal.signature[1:]
+
+    def __add_node(self, literal: Literal) -> str:
+        node: str = self.get_node(literal)
+        if node not in self.edges.keys():
+            self.nodes.append(node)
+            self.edges[node] = set()
+        return node
+
+    def components(self) -> List[Tuple[List[str], bool]]:
+        """
+        Strongly connected components in topological order (Tarjan's algorithm, iteratively), each along with whether
+        it is recursive, i.e., whether it contains a cycle.
+        """
+        index: Dict[str, int] = dict()
+        low: Dict[str, int] = dict()
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[Tuple[List[str], bool]] = []
+        counter: int = 0
+        for root in self.nodes:
+            if root in index.keys():
+                continue
+            work: List[Tuple[str, List[str]]] = [(root, list(self.edges[root]))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, successors = work[-1]
+                if successors:
+                    successor: str = successors.pop()
+                    if successor not in index.keys():
+                        index[successor] = low[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, list(self.edges[successor])))
+                    elif successor in on_stack:
+                        low[node] = min(low[node], index[successor])
+                    continue
+                work.pop()
+                if work:
+                    parent: str = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] != index[node]:
+                    continue
+                component: List[str] = []
+                while True:
+                    member: str = stack.pop()
+                    on_stack.remove(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                recursive: bool = len(component) > 1 or node in self.edges[node]
+                components.append((component, recursive))
+        components.reverse()  # Tarjan's algorithm emits components in reverse topological order.
+        return components
+
+    def strata(self) -> List[Tuple[List[str], bool]]:
+        """
+        Rule names (in policy order) grouped by the component of their head predicate, in topological order.
+        Components with no rules (i.e., those that only contain context predicates) are omitted.
+        """
+        components: List[Tuple[List[str], bool]] = self.components()
+        component_indices: Dict[str, int] = {
+            node: i for i, (component, _) in enumerate(components) for node in component
+        }
+        component_rules: List[List[str]] = [[] for _ in components]
+        for rule_name, node in self.rule_nodes.items():
+            component_rules[component_indices[node]].append(rule_name)
+        return [
+            (rule_names, recursive)
+            for rule_names, (_, recursive) in zip(component_rules, components)
+            if rule_names
+        ]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from typing import Dict, Set, Tuple, Iterator
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Context import Context
+from prudens_core.entities.SymbolTable import SymbolTable, Fact
+
+
+class EncodedContext:
+    """
+    A context of ground facts encoded through `symbols`, i.e., each fact is kept as the tuple of the codes of its
+    arguments, in a set per signature code. Hence, hashing and comparing facts only involves small ints. Facts are
+    decoded back to literals through `to_context()`.
+    """
+
+    __slots__ = ("symbols", "facts", "_length")
+
+    def __init__(self, symbols: SymbolTable) -> None:
+        self.symbols: SymbolTable = symbols
+        self.facts: Dict[int, Set[Tuple[int, ...]]] = dict()
+        self._length: int = 0
+
+    @classmethod
+    def from_context(cls, context: Context, symbols: SymbolTable) -> EncodedContext:
+        """Raises a `ValueError` if `context` contains non-ground literals."""
+        encoded_context: EncodedContext = cls(symbols)
+        for literal in context:
+            encoded_context.add_fact(symbols.encode_literal(literal))
+        return encoded_context
+
+    def to_context(self) -> Context:
+        context: Context = Context()
+        for fact in self:
+            context.add_literal(self.symbols.decode_literal(fact))
+        return context
+
+    def add_fact(self, fact: Fact) -> bool:
+        """Returns whether `fact` is new, i.e., `False` if it was already in the context."""
+        try:
+            bucket: Set[Tuple[int, ...]] = self.facts[fact[0]]
+        except KeyError:
+            self.facts[fact[0]] = {fact[1]}
+            self._length += 1
+            return True
+        if fact[1] in bucket:
+            return False
+        bucket.add(fact[1])
+        self._length += 1
+        return True
+
+    def get_bucket(self, signature: int) -> Set[Tuple[int, ...]]:
+        """The arguments of all facts with the provided signature code."""
+        try:
+            return self.facts[signature]
+        except KeyError:
+            return set()
+
+    def has_signature(self, signature: int) -> bool:
+        return signature in self.facts.keys()
+
+    def __contains__(self, fact: Fact) -> bool:
+        try:
+            return fact[1] in self.facts[fact[0]]
+        except KeyError:
+            return False
+
+    def __iter__(self) -> Iterator[Fact]:
+        for signature, bucket in self.facts.items():
+            for arguments in bucket:
+                yield signature, arguments
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __str__(self) -> str:
+        return " ".join(str(self.symbols.decode_literal(fact)) + ";" for fact in self)
@@ -0,0 +1,117 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple, Union, Callable
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Rule import Rule
+from prudens_core.entities.CompiledRule import CompiledRule
+from prudens_core.entities.Budget import Budget
+from prudens_core.entities.SymbolTable import SymbolTable, Fact
+from prudens_core.entities.EncodedContext import EncodedContext
+from prudens_core.errors.RuntimeErrors import LiteralNotInContextError
+
+
+class EncodedRule:
+    """
+    A rule compiled as a `CompiledRule`, but joining over ground facts encoded through `symbols` (see
+    `EncodedContext`), so that matches are tuples of the codes of the values of its variables (in the order these
+    appear in the body). Use `EncodedRule.compile()`, which returns `None` for rules that cannot be compiled, including
+    rules whose heads have variables that do not appear in their bodies, since their instances are not ground.
+    """
+
+    __slots__ = (
+        "rule",
+        "source",
+        "symbols",
+        "variables",
+        "body_signatures",
+        "head_signature",
+        "head_arguments",
+        "_match",
+    )
+
+    context_class: type = EncodedContext  # The kind of contexts the rule is triggered on.
+
+    def __init__(
+        self,
+        rule: Rule,
+        source: str,
+        symbols: SymbolTable,
+        variables: List[Variable],
+        head_arguments: List[Tuple[bool, int]],
+    ) -> None:
+        self.rule: Rule = rule
+        self.source: str = source  # Kept for debugging.
+        self.symbols: SymbolTable = symbols
+        self.variables: List[Variable] = variables
+        self.body_signatures: List[Union[None, int]] = [
+            None if x.is_truism() else symbols.encode_signature(x) for x in rule.body
+        ]
+        self.head_signature: int = symbols.encode_signature(rule.head)
+        self.head_arguments: List[Tuple[bool, int]] = head_arguments  # (Is a variable index?, index or code).
+        namespace: Dict = {"LiteralNotInContextError": LiteralNotInContextError, "body": rule.body}
+        exec(compile(source, f"<encoded rule {rule.name}>", "exec"), namespace)
+        self._match: Callable = namespace["match"]
+
+    @classmethod
+    def compile(cls, rule: Rule, symbols: SymbolTable) -> Union[None, EncodedRule]:
+        generated: Union[None, Tuple[str, List[Variable], Dict[Variable, int]]] = CompiledRule._generate(
+            rule, symbols
+        )
+        if generated is None:
+            return None
+        source, variables, indices = generated
+        head_arguments: List[Tuple[bool, int]] = []
+        for argument in rule.head.arguments:
+            if isinstance(argument, Constant):
+                head_arguments.append((False, symbols.encode(argument)))
+            elif argument in indices.keys():
+                head_arguments.append((True, indices[argument]))
+            else:
+                return None
+        return cls(rule, source, symbols, variables, head_arguments)
+
+    def trigger(
+        self,
+        facts: EncodedContext,
+        delta: Union[None, EncodedContext] = None,
+        budget: Union[None, Budget] = None,
+    ) -> List[Tuple[int, ...]]:
+        """As `Rule.trigger()`, but returns the matches of the body, which `self.head_fact()` turns into instances."""
+        spend: Union[None, Callable] = budget.spend if budget is not None else None
+        if delta is None:
+            return self._match(self.__get_buckets(facts), spend)
+        for i, signature in enumerate(self.body_signatures):
+            if signature is not None and not facts.has_signature(signature):
+                raise LiteralNotInContextError(self.rule.body[i])
+        matches: List[Tuple[int, ...]] = []
+        for i, signature in enumerate(self.body_signatures):
+            if signature is None or not delta.has_signature(signature):
+                continue
+            matches += self._match(self.__get_buckets(facts, delta, i), spend)
+        return matches
+
+    def __get_buckets(
+        self, facts: EncodedContext, delta: Union[None, EncodedContext] = None, delta_index: int = -1
+    ) -> List[Union[None, Set[Tuple[int, ...]]]]:
+        buckets: List[Union[None, Set[Tuple[int, ...]]]] = []
+        for i, signature in enumerate(self.body_signatures):
+            if signature is None:
+                buckets.append(None)
+            elif i == delta_index:
+                buckets.append(delta.get_bucket(signature))
+            elif not facts.has_signature(signature):
+                buckets.append(None)
+            elif i < delta_index:
+                buckets.append(facts.get_bucket(signature) - delta.get_bucket(signature))
+            else:
+                buckets.append(facts.get_bucket(signature))
+        return buckets
+
+    def head_fact(self, values: Tuple[int, ...]) -> Fact:
+        return self.head_signature, tuple(
+            values[x] if is_variable else x for is_variable, x in self.head_arguments
+        )
+
+    def substitution(self, values: Tuple[int, ...]) -> Substitution:
+        return Substitution.from_values(self.variables, [self.symbols.decode(x) for x in values])
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Union, Dict, List
+import weakref
+from typing import Union, Dict, List, Tuple
 from prudens_core.entities.Variable import Variable
 from prudens_core.entities.Constant import Constant
 from prudens_core.entities.Substitution import Substitution
@@ -18,9 +19,16 @@ class Literal:
         "_is_external",
         "_is_action",
         "signature",
+        "_hash",
+        "__weakref__",
     )
 
+    # Ground literals in use, by their string representations and by their signatures and arguments (see
+    # `self.with_arguments()`), so that repeated facts, parsed or inferred, share a single object.
+    _interned: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
     def __init__(self, literal_string: str = None) -> None:
+        self._hash: Union[None, int] = None  # Computed on demand; literals must not be modified once hashed.
         if literal_string:
             self.original_string: str = literal_string
             parser: LiteralParser = LiteralParser(self.original_string)
@@ -38,6 +46,24 @@ class Literal:
             self._is_action: bool = parsed_literal.is_action
             self.signature: str = self.__get_signature()
 
+    @classmethod
+    def interned(cls, literal_string: str) -> Literal:
+        """
+        The literal `literal_string` stands for, which is shared among all its occurrences if it is ground. Hence,
+        the returned literal should be copied (e.g., through `deepcopy()`) before any modification.
+        """
+        try:
+            return cls._interned[literal_string]
+        except KeyError:
+            pass
+        literal: Literal = cls(literal_string)
+        if not literal.is_ground():
+            return literal
+        literal = cls._interned.setdefault((literal.signature, tuple(literal.arguments)), literal)
+        cls._interned[str(literal)] = literal
+        cls._interned[literal_string] = literal
+        return literal
+
     @property
     def name(self) -> str:
         return self._name
@@ -46,6 +72,7 @@ class Literal:
     def name(self, new_name: str) -> None:
         if new_name != self._name:
             self._name = new_name
+            self._hash = None
             self.signature = self.__get_signature()
 
     @property
@@ -56,6 +83,7 @@ class Literal:
     def sign(self, new_sign: bool) -> None:
         if new_sign != self._sign:
             self._sign = new_sign
+            self._hash = None
             self.signature = self.__get_signature()
 
     @property
@@ -66,6 +94,7 @@ class Literal:
     def arity(self, new_arity: int) -> None:
         if new_arity != self._arity:
             self._arity = new_arity
+            self._hash = None
             self.signature = self.__get_signature()
 
     @property
@@ -91,6 +120,7 @@ class Literal:
     @classmethod
     def from_dict(cls, init_dict: Dict) -> Literal:
         literal = cls.__new__(cls)
+        literal._hash = None
         literal.original_string = utils.parse_dict_prop(
             init_dict,
             "original_string",
@@ -155,9 +185,51 @@ class Literal:
             "signature": self.signature,
         }
 
+    def with_arguments(self, arguments: List[Union[Variable, Constant]]) -> Literal:
+        """
+        A copy of the literal with the provided arguments, built without copying anything else. Ground copies are
+        interned (see `Literal.interned()`), so they should not be modified in place either.
+        """
+        for argument in arguments:
+            if not isinstance(argument, Constant):
+                return self.__copy_with(arguments)
+        key: Tuple = (self.signature, tuple(arguments))
+        try:
+            return Literal._interned[key]
+        except KeyError:
+            pass
+        instance: Literal = self.__copy_with(arguments)
+        instance.original_string = str(instance)  # Not the template's, since facts parsed later on share the instance.
+        return Literal._interned.setdefault(key, instance)
+
+    def __copy_with(self, arguments: List[Union[Variable, Constant]]) -> Literal:
+        instance: Literal = Literal.__new__(Literal)
+        instance._hash = None
+        instance.original_string = self.original_string
+        instance._name = self._name
+        instance._sign = self._sign
+        instance._arity = self._arity
+        instance.arguments = arguments
+        instance._is_external = self._is_external
+        instance._is_action = self._is_action
+        instance.signature = self.signature
+        return instance
+
+    def complement(self) -> Literal:
+        """The same literal with the opposite sign."""
+        instance: Literal = self.__copy_with(list(self.arguments))
+        instance.sign = not self._sign
+        return instance
+
     def is_propositional(self) -> bool:
         return self.arity == 0
 
+    def is_ground(self) -> bool:
+        for argument in self.arguments:
+            if isinstance(argument, Variable):
+                return False
+        return True
+
     def is_truism(self) -> bool:
         return self.signature == "true0"  # FIXME What about "not true", i.e. "-true"?
 
@@ -213,12 +285,20 @@ class Literal:
         return True
 
     def is_conflicting_with(self, other: Literal) -> bool:
-        if self.sign == other.sign:
+        """Same as `self.unifies()` with the sign of `other` flipped, but without touching `other`."""
+        if (
+            self.sign == other.sign
+            or self.name != other.name
+            or self.arity != other.arity
+            or self.is_external != other.is_external
+            or self.is_action != other.is_action
+            or len(self.arguments) != len(other.arguments)
+        ):
             return False
-        other.sign = not other.sign
-        are_equal: bool = self.unifies(other)
-        other.sign = not other.sign
-        return are_equal
+        for this_arg, other_arg in zip(self.arguments, other.arguments):
+            if not this_arg.unifies(other_arg):
+                return False
+        return True
 
     def __get_signature(self) -> str:
         signature: str = "" if self.sign else "-"
@@ -231,6 +311,8 @@ class Literal:
     def __eq__(self, other: Literal) -> bool:
         # # print(self, other)
         # # print("literal equals enter")
+        if self is other:
+            return True
         if not isinstance(other, Literal):
             return False
         # # print("is instance of literal")
@@ -263,6 +345,8 @@ class Literal:
         return True
 
     def __hash__(self) -> int:
+        if self._hash is not None:
+            return self._hash
         h = 2166136261
         h = (h * 16777619) ^ hash(self._sign)
         h = (h * 16777619) ^ hash(self._name)
@@ -271,8 +355,22 @@ class Literal:
         h = (h * 16777619) ^ hash(self._is_external)
         for _arg in self.arguments:
             h = (h * 16777619) ^ hash(_arg)
+        self._hash = h
         return h
 
+    def __getstate__(self) -> Dict:
+        """String hashes differ between processes, so the cached hash is not pickled."""
+        return {
+            slot: getattr(self, slot)
+            for slot in self.__slots__
+            if slot not in ("_hash", "__weakref__") and hasattr(self, slot)
+        }
+
+    def __setstate__(self, state: Dict) -> None:
+        self._hash = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
+
     # def __hash__(self) -> int:
     #     hash_str: str = self.signature
     #     variable_indices: Dict[str, int] = dict()
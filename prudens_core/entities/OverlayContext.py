@@ -0,0 +1,174 @@
+from __future__ import annotations
+from typing import Union, Dict, List, Set, Iterator, Sequence
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+from prudens_core.entities.Context import Context
+from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Budget import Budget
+from prudens_core.errors.RuntimeErrors import (
+    LiteralNotInContextError,
+    LiteralAlreadyInContextError,
+)
+
+
+class OverlayContext(Context):
+    """
+    A copy-on-write view of a `base` context, which is never modified through the overlay. Literals added to the
+    overlay are kept in its own buckets (i.e., `self.facts`), while literals removed from the base are kept as
+    tombstones, so creating an overlay takes constant time, no matter the size of its base.
+    """
+
+    __slots__ = ("base", "removed")
+
+    def __init__(self, base: Context) -> None:
+        super().__init__()
+        self.base: Context = base
+        self.removed: Set[Literal] = set()  # Always a subset of the base.
+
+    @classmethod
+    def from_dict(cls, init_dict: Dict) -> Context:
+        """Overlays are serialized as plain contexts, so this returns a plain context."""
+        return Context.from_dict(init_dict)
+
+    def to_dict(self) -> Dict:
+        return self.flatten().to_dict()
+
+    def add_literal(self, literal: Literal) -> None:
+        if literal in self.removed:
+            self.removed.remove(literal)
+            return
+        if literal in self:
+            raise LiteralAlreadyInContextError(literal)
+        self._insert(literal)
+
+    def remove_literal(self, literal: Literal) -> None:
+        if super().__contains__(literal):
+            super().remove_literal(literal)
+        elif literal in self.base and literal not in self.removed:
+            self.removed.add(literal)
+        else:
+            raise ValueError(f"Literal {literal} is not in the context.")
+
+    def flatten(self) -> Context:
+        """A plain context with the same literals, independent of the base."""
+        flat_context: Context = Context()
+        for literal in self:
+            flat_context._insert(literal)
+        return flat_context
+
+    def forget(self, literal: Literal) -> None:
+        """Drops any tombstone of `literal`, e.g., after `literal` has been removed from the base itself."""
+        self.removed.discard(literal)
+
+    def unify(
+        self, literal: Literal, exclude: Union[None, Context] = None
+    ) -> List[Substitution]:
+        if literal.is_truism():
+            return [Substitution()]
+        if not self.has_signature(literal):
+            raise LiteralNotInContextError(literal)
+        subs: List[Substitution] = []
+        for fact in self.candidates(literal):
+            if exclude is not None and fact in exclude:
+                continue
+            sub: Union[None, Substitution] = literal.unify(fact)
+            if sub and (not self.removed or fact not in self.removed):
+                subs.append(sub)
+        return subs
+
+    def unifies(self, literal: Literal) -> bool:
+        if literal.is_truism():
+            return True
+        for fact in self.candidates(literal):
+            if literal.unifies(fact) and (not self.removed or fact not in self.removed):
+                return True
+        return False
+
+    def get_bucket(self, signature: str) -> List[Literal]:
+        bucket: List[Literal] = self.base.get_bucket(signature)
+        if self.removed:
+            bucket = [fact for fact in bucket if fact not in self.removed]
+        own_bucket: List[Literal] = super().get_bucket(signature)
+        return bucket + own_bucket if own_bucket else bucket
+
+    def candidates(self, literal: Literal) -> List[Literal]:
+        """Tombstones included, so that they are only looked up for facts that actually matter."""
+        candidates: List[Literal] = self.base.candidates(literal)
+        own_candidates: List[Literal] = super().candidates(literal)
+        return candidates + own_candidates if own_candidates else candidates
+
+    def lookup(self, signature: str, arguments: Sequence[Union[Variable, Constant]]) -> List[Literal]:
+        """Unlike `self.candidates()`, tombstones are left out, since these are matched as they are."""
+        candidates: List[Literal] = self.base.lookup(signature, arguments)
+        if self.removed:
+            candidates = [fact for fact in candidates if fact not in self.removed]
+        own_candidates: List[Literal] = super().lookup(signature, arguments)
+        return candidates + own_candidates if own_candidates else candidates
+
+    def count_signature(self, signature: str) -> int:
+        """An upper bound, since tombstones are not taken into account."""
+        return super().count_signature(signature) + self.base.count_signature(signature)
+
+    def is_ground_signature(self, signature: str) -> bool:
+        """Tombstones are not taken into account, so this may be `False` for a view that only has ground facts."""
+        return super().is_ground_signature(signature) and self.base.is_ground_signature(signature)
+
+    def has_signature(self, literal: Literal) -> bool:
+        return super().has_signature(literal) or self.base.has_signature(literal)
+
+    def remove_conflicts_with(self, ground_facts: Context, budget: Union[None, Budget] = None) -> None:
+        for ground_fact in ground_facts:
+            if budget is not None:
+                budget.spend()
+            signature: str = ground_fact.signature
+            negated_signature: str = (
+                signature[1:] if signature[0] == "-" else "-" + signature
+            )
+            conflicts: List[Literal] = [
+                fact
+                for fact in self.get_bucket(negated_signature)
+                if fact.is_conflicting_with(ground_fact)
+            ]
+            for fact in conflicts:
+                self.remove_literal(fact)
+
+    def __iter__(self) -> Iterator[Literal]:
+        for bucket in reversed(list(self.facts.values())):
+            yield from bucket
+        for fact in self.base:
+            if fact not in self.removed:
+                yield fact
+
+    def __len__(self) -> int:
+        return len(self.base) - len(self.removed) + self._length
+
+    def __contains__(self, literal: Literal) -> bool:
+        if super().__contains__(literal):
+            return True
+        return literal in self.base and literal not in self.removed
+
+    def __eq__(self, __other: object) -> bool:
+        if not isinstance(__other, Context):
+            return False
+        if len(self) != len(__other):
+            return False
+        for literal in self:
+            if literal not in __other:
+                return False
+        return True
+
+    def __hash__(self) -> int:
+        return super().__hash__()
+
+    def __deepcopy__(self, memodict={}) -> OverlayContext:
+        """Only the overlay is copied; the copy shares the same base."""
+        copycat: OverlayContext = OverlayContext(self.base)
+        copycat.original_string = self.original_string
+        copycat.removed = {x for x in self.removed}
+        copycat._length = self._length
+        for bucket, literals in self.facts.items():
+            copycat.facts[bucket] = [x for x in literals]
+        for bucket, literals in self._ground.items():
+            copycat._ground[bucket] = {x for x in literals}
+        return copycat
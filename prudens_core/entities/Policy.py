@@ -1,20 +1,54 @@
 from __future__ import annotations
-from typing import Dict, Set, List, Tuple, Iterator, overload, Union, FrozenSet
+from typing import (
+    Dict,
+    Set,
+    List,
+    Tuple,
+    Iterator,
+    Iterable,
+    overload,
+    Union,
+    FrozenSet,
+    Callable,
+    Any,
+)
 from copy import deepcopy
 from math import inf
+import asyncio
+import heapq
+import inspect
+import multiprocessing
+import os
 import re
+import threading
+import time
 # import itertools as it
 from prudens_core.entities.Literal import Literal
-from prudens_core.entities.Rule import Rule
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+from prudens_core.entities.Rule import Rule, Embedding
 from prudens_core.entities.Context import Context
+from prudens_core.entities.OverlayContext import OverlayContext
 from prudens_core.entities.Substitution import Substitution
 from prudens_core.entities.PriorityRelation import PriorityRelation
+from prudens_core.entities.ConflictIndex import ConflictIndex
+from prudens_core.entities.ReteNetwork import ReteNetwork
+from prudens_core.entities.CompiledRule import CompiledRule
+from prudens_core.entities.EncodedRule import EncodedRule
+from prudens_core.entities.ColumnarRule import ColumnarRule
+from prudens_core.entities.EncodedContext import EncodedContext
+from prudens_core.entities.SymbolTable import SymbolTable, Fact
+from prudens_core.entities.DependencyGraph import DependencyGraph
+from prudens_core.entities.Budget import Budget
 from prudens_core.parsers.PolicyParser import ParsedPolicy, PolicyParser
 from prudens_core.errors.RuntimeErrors import (
     RuleNotFoundError,
     LiteralNotInContextError,
     LiteralAlreadyInContextError,
     UnresolvedConflictsError,
+    InvalidEngineError,
+    ExternalPredicateNotFoundError,
+    BudgetExhaustedError,
 )
 from prudens_core.errors.SyntaxErrors import (
     PrudensSyntaxError,
@@ -29,10 +63,14 @@ class Policy:
         "original_string",
         "rules",
         "rule_hasse_diagram",
+        "strata",
         "priorities",
-        "inferences",
-        "dilemmas",
-        "inferred_by",
+        "last_result",
+        "_local",
+        "_compiled_rules",
+        "symbols",
+        "_encoded_rules",
+        "_columnar_rules",
     )
 
     def __init__(self, policy_string: str) -> None:
@@ -44,10 +82,14 @@ class Policy:
             raise e
         self.rules: Dict[str, Rule] = parsed_policy.rules
         self.rule_hasse_diagram: HasseDiagram = HasseDiagram(parsed_policy.rules)
+        self.strata: List[Stratum] = Stratum.stratify(parsed_policy.rules, self.rule_hasse_diagram)
         self.priorities: PriorityRelation = parsed_policy.priorities
-        self.inferences: Context = Context()
-        self.dilemmas: Dict[Literal, Dilemma] = dict()
-        self.inferred_by: Dict[Literal, List[Dict[str, Set[Substitution]]]] = dict()
+        self.last_result: InferenceResult = InferenceResult()
+        self._local: threading.local = threading.local()  # Per-thread state, i.e., Rete networks.
+        self._compiled_rules: Union[None, Dict[str, CompiledRule]] = None  # Compiled upon first use.
+        self.symbols: SymbolTable = SymbolTable()  # Signatures and constants of encoded rules and contexts.
+        self._encoded_rules: Union[None, Dict[str, EncodedRule]] = None  # Compiled upon first use.
+        self._columnar_rules: Union[None, Dict[str, ColumnarRule]] = None  # Compiled upon first use.
 
     @classmethod
     def from_dict(cls, init_dict: Dict) -> Policy:
@@ -88,6 +130,13 @@ class Policy:
                     f"While parsing a policy from a dict, rule {rn} could not be properly parsed."
                 ) from e
         policy.rule_hasse_diagram = HasseDiagram(policy.rules)
+        policy.strata = Stratum.stratify(policy.rules, policy.rule_hasse_diagram)
+        policy.last_result = InferenceResult()
+        policy._local = threading.local()
+        policy._compiled_rules = None
+        policy.symbols = SymbolTable()
+        policy._encoded_rules = None
+        policy._columnar_rules = None
         try:
             priorities = init_dict["priorities"]
         except KeyError:
@@ -122,7 +171,7 @@ class Policy:
                     f"Expected input of type 'dict' for Policy.inferences but received {type(inferences)}."
                 )
             try:
-                policy.inferences = Context.from_dict(inferences)
+                policy.last_result.inferences = Context.from_dict(inferences)
             except KeyError as e:
                 raise KeyError(
                     f"While parsing a policy from a dict, inferences could not be properly parsed."
@@ -143,7 +192,6 @@ class Policy:
             raise TypeError(
                 f"Expected input of type 'dict' for Policy.dilemmas but received {type(dilemmas)}."
             )
-        policy.dilemmas = dict()
         for l, d in dilemmas.items():
             try:
                 lit = Literal(l)
@@ -152,7 +200,7 @@ class Policy:
                     "While parsing a policy from a dict, dilemmas could not be properly parsed."
                 ) from e
             try:
-                policy.dilemmas[lit] = Dilemma.from_dict()
+                policy.last_result.dilemmas[lit] = Dilemma.from_dict()
             except KeyError as e:
                 raise KeyError(
                     f"While parsing a policy from a dict, dilemma {d} could not be properly parsed."
@@ -173,7 +221,6 @@ class Policy:
             raise TypeError(
                 f"Expected input of type 'dict' for Policy.inferred_by but received {type(inferred_by)}."
             )
-        policy.inferred_by = dict()
         for l, instances in inferred_by.items():
             try:
                 lit = Literal(l)
@@ -181,7 +228,7 @@ class Policy:
                 raise SyntaxError(
                     "While parsing a policy from a dict, inferred_by could not be properly parsed."
                 ) from e
-            policy.inferred_by[lit] = set()
+            policy.last_result.inferred_by[lit] = set()
             for inferring_rules in instances:
                 if type(inferring_rules) != dict:
                     raise TypeError(
@@ -211,9 +258,42 @@ class Policy:
                             raise ValueError(
                                 f"While parsing a policy from a dict, substitution {s} could not be properly parsed."
                             ) from e
-                        policy.inferred_by[lit].add(sub)
+                        policy.last_result.inferred_by[lit].add(sub)
         return policy
 
+    def __getstate__(self) -> Dict:
+        """Only the policy itself is pickled (e.g., when sent to worker processes), without any per-call state."""
+        return {
+            "original_string": self.original_string,
+            "rules": self.rules,
+            "rule_hasse_diagram": self.rule_hasse_diagram,
+            "strata": self.strata,
+            "priorities": self.priorities,
+        }
+
+    def __setstate__(self, state: Dict) -> None:
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self.last_result = InferenceResult()
+        self._local = threading.local()
+        self._compiled_rules = None
+        self.symbols = SymbolTable()
+        self._encoded_rules = None
+        self._columnar_rules = None
+
+    @property
+    def inferences(self) -> Context:
+        """The inferences of the latest call to `infer()` by any thread; prefer the result `infer()` returns."""
+        return self.last_result.inferences
+
+    @property
+    def dilemmas(self) -> Dict[Literal, Dilemma]:
+        return self.last_result.dilemmas
+
+    @property
+    def inferred_by(self) -> Dict[Literal, Dict[str, Set[Substitution]]]:
+        return self.last_result.inferred_by
+
     def to_dict(self) -> Dict:
         return {
             "original_string": self.original_string,
@@ -237,31 +317,391 @@ class Policy:
         context: Context,
         max_depth: float = inf,
         unittest_params: Union[None, Dict] = None,
-    ) -> None:
-        inference_graph: InferenceGraph = InferenceGraph(
-            self.rules,
-            self.rule_hasse_diagram,
-            context,
-            unittest_params=unittest_params,
-        )
-        # print("=" * 25)
-        # print("ig complete")
-        # marked_literals: Context = (
-        #     context  # NOTE Policy.infer() consumes the context, polluting it with inferences!
-        # )
-        marked_literals = context
-        dilemmas: Dict[Literal, Dilemma] = dict()
+        semi_naive: bool = True,
+        engine: str = "interpreter",
+        budget: Union[None, Budget] = None,
+    ) -> InferenceResult:
+        """
+        `context` is left untouched: all inferences are kept in overlays on top of it (so the returned inferences are
+        an `OverlayContext` whose base is `context`), hence the same context may be reused by any number of calls, as
+        long as it is not modified in the meantime.
+
+        All state of a call lives in the returned result, so any number of threads may call `infer()` on the same
+        policy at once. The result is also stored as `self.last_result`, which `self.inferences`, `self.dilemmas` and
+        `self.inferred_by` refer to.
+
+        `engine` determines how the inference graph is computed:
+            * "interpreter": Each rule is unified against the context on its own;
+            * "rete": Facts are propagated through a Rete network compiled from the policy, which keeps all partial
+            matches between consecutive calls;
+            * "compiled": As "interpreter", but rules are compiled to specialized Python functions (see
+            `CompiledRule`), except for those that cannot be compiled, which are interpreted;
+            * "encoded": As "compiled", but facts are encoded as tuples of ints through `self.symbols` (see
+            `EncodedContext`) and only decoded once the inference graph is complete. This requires that all rules can
+            be compiled (see `EncodedRule`) and that `context` is ground, otherwise "compiled" is used instead;
+            * "columnar": As "encoded", but facts are also kept as NumPy arrays (see `ColumnarContext`) and rule
+            bodies are joined over them as a whole (see `ColumnarRule`). This requires NumPy to be installed.
+
+        If `budget` runs out (or is cancelled), inference stops and the result holds the literals marked so far, with
+        `result.truncated` set. Literals are only marked once the inference graph is complete, so a result truncated
+        while computing the graph holds no inferences at all.
+        """
+        compiled_rules: Union[None, Dict[str, CompiledRule]] = None
+        encoded_rules: Union[None, Dict[str, EncodedRule]] = None
+        if engine == "interpreter":
+            network: Union[None, ReteNetwork] = None
+        elif engine == "compiled":
+            network = None
+            compiled_rules = self.__get_compiled_rules()
+        elif engine == "encoded":
+            network = None
+            encoded_rules = self.__get_encoded_rules()
+            if encoded_rules is None:
+                compiled_rules = self.__get_compiled_rules()
+        elif engine == "columnar":
+            network = None
+            encoded_rules = self.__get_columnar_rules()
+            if encoded_rules is None:
+                compiled_rules = self.__get_compiled_rules()
+        elif engine == "rete":
+            try:
+                network = self._local.rete_network
+            except AttributeError:  # Each thread compiles its own network, since networks keep state between calls.
+                network = ReteNetwork(self.rules)
+                self._local.rete_network = network
+        else:
+            raise InvalidEngineError(engine)
+        marked_literals: OverlayContext = OverlayContext(context)
+        result: InferenceResult = InferenceResult(marked_literals)
+        try:
+            inference_graph: InferenceGraph = InferenceGraph(
+                self.rules,
+                self.rule_hasse_diagram,
+                context,
+                unittest_params=unittest_params,
+                semi_naive=semi_naive,
+                network=network,
+                strata=self.strata,
+                budget=budget,
+                compiled_rules=compiled_rules,
+                encoded_rules=encoded_rules,
+            )
+            # print("=" * 25)
+            # print("ig complete")
+            inference_graph.remove_conflicts_with(marked_literals, budget)
+            result.inference_graph = inference_graph
+            for stratum in self.strata:
+                stratum_result: StratumResult = StratumResult()
+                result.stratum_results.append(stratum_result)
+                self.__infer_stratum(
+                    stratum,
+                    inference_graph,
+                    marked_literals,
+                    max_depth - result.depth,
+                    budget,
+                    stratum_result,
+                )
+                result.depth += stratum_result.depth
+        except BudgetExhaustedError:
+            result.truncated = True
+            if network is not None:  # Interrupted half-way, so it is no longer consistent.
+                del self._local.rete_network
+        # print("depth:", depth)
+        # print("Marked literals: ", marked_literals)
+        result.collect()
+        self.last_result = result
+        return result
+
+    async def ainfer(
+        self,
+        context: Context,
+        externals: Union[None, Dict[str, Callable[..., Any]]] = None,
+        **kwargs,
+    ) -> InferenceResult:
+        """
+        Same as `infer()`, but external literals (e.g., `?lt(X, Y)`) are evaluated through `externals`, which maps
+        predicate names (without the `?`) to plain or async callables. A callable is called with the values of the
+        arguments of an external literal (`None` for unbound variables) and returns either a bool, for ground
+        literals, or an iterable of tuples of argument values, one per solution. Outcomes are added as facts on top of
+        `context` (a false ground literal is added negated), so that they show up among the inferences.
+
+        Inference overlaps with external calls: a first call to `infer()` yields all calls that rules could use, which
+        are dispatched at once. As soon as some of them complete, their outcomes are fed into that same result through
+        `update()`, which maintains the inference graph and the marked literals incrementally, and any calls that the
+        new bindings give rise to are dispatched right away, while earlier ones are still pending. Only rules with some
+        body literal affected by an update are searched for new calls, and the result kept up to date all along is the
+        one returned, so nothing is inferred from scratch twice. Inference runs in a separate thread (see
+        `asyncio.to_thread()`), and so do plain callables, so the event loop is never blocked. Any other keyword
+        arguments are passed on to `infer()`, though updates are always interpreted and ignore `max_depth`.
+
+        If `budget` runs out while external calls are pending, they are cancelled and the result is returned without
+        their outcomes, with `result.truncated` set. If the awaiting task is cancelled, so are the budget and all
+        pending calls, hence the inference thread stops as soon as possible.
+        """
+        externals = externals if externals is not None else dict()
+        budget: Budget = kwargs.pop("budget", None) or Budget()
+        pending: Set[asyncio.Future] = set()
+        try:
+            result: InferenceResult = await asyncio.to_thread(self.infer, context, budget=budget, **kwargs)
+            requested: Set[Literal] = set()  # Calls dispatched so far, either evaluated or pending.
+            rules: List[Rule] = list(self.rules.values())
+            while not result.truncated:
+                calls: List[Literal] = await asyncio.to_thread(
+                    self.__external_calls, result.inference_graph.inferences, rules, requested
+                )
+                for call in calls:
+                    requested.add(call)
+                    pending.add(asyncio.ensure_future(self.__evaluate_external(call, externals)))
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=None if budget.deadline == inf else max(0.0, budget.deadline - time.monotonic()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:  # The deadline has passed.
+                    result.truncated = True
+                    break
+                added: Context = Context()
+                for future in done:
+                    pending.remove(future)
+                    for literal in future.result():
+                        if literal not in added:
+                            added.add_literal(literal)
+                try:
+                    changed: Set[str] = await asyncio.to_thread(
+                        self.__update, added, Context(), result, budget
+                    )
+                except BudgetExhaustedError:
+                    result.truncated = True
+                    result.collect()
+                    break
+                rules = [
+                    rule
+                    for rule in self.rules.values()
+                    if any(
+                        not x.is_truism() and DependencyGraph.get_node(x) in changed for x in rule.body
+                    )
+                ]
+            return result
+        except asyncio.CancelledError:
+            budget.cancel()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def __external_calls(
+        inferences: Context, rules: List[Rule], requested: Set[Literal]
+    ) -> List[Literal]:
+        """
+        All external calls not in `requested` that might be used by some of `rules`, given the literals that might be
+        inferred, i.e., those of an inference graph.
+        """
+        calls: Dict[Literal, None] = dict()  # Used as an ordered set.
+        for rule in rules:
+            for call in rule.external_calls(inferences, requested):
+                calls[call] = None
+        return list(calls.keys())
+
+    @staticmethod
+    async def __evaluate_external(
+        call: Literal, externals: Dict[str, Callable[..., Any]]
+    ) -> List[Literal]:
+        """The facts `call` evaluates to. Plain callables are called in a separate thread, as they may block."""
+        name: str = call.name.lstrip("?")
+        try:
+            function: Callable[..., Any] = externals[name]
+        except KeyError:
+            raise ExternalPredicateNotFoundError(name)
+        values: List[Any] = [None if isinstance(x, Variable) else x.value for x in call.arguments]
+        if inspect.iscoroutinefunction(function):
+            outcome: Any = function(*values)
+        else:
+            outcome = await asyncio.to_thread(function, *values)
+        if inspect.isawaitable(outcome):
+            outcome = await outcome
+        if isinstance(outcome, bool):
+            if any(isinstance(x, Variable) for x in call.arguments):
+                return []  # Nothing to tell without values for the unbound variables.
+            literal: Literal = deepcopy(call)
+            literal.sign = outcome
+            return [literal]
+        facts: List[Literal] = []
+        for values in outcome:
+            facts.append(call.with_arguments([Constant.from_value(x) for x in values]))
+        return facts
+
+    def __get_compiled_rules(self) -> Dict[str, CompiledRule]:
+        if self._compiled_rules is None:  # Threads racing here compile the same rules, so any of them may win.
+            compiled_rules: Dict[str, CompiledRule] = dict()
+            for rule_name, rule in self.rules.items():
+                compiled_rule: Union[None, CompiledRule] = CompiledRule.compile(rule)
+                if compiled_rule is not None:
+                    compiled_rules[rule_name] = compiled_rule
+            self._compiled_rules = compiled_rules
+        return self._compiled_rules
+
+    def __get_encoded_rules(self) -> Union[None, Dict[str, EncodedRule]]:
+        """`None` if some rule cannot be compiled, since encoded facts cannot be shared with the interpreter."""
+        if self._encoded_rules is None:
+            self._encoded_rules = self.__encode_rules(EncodedRule)
+        return self._encoded_rules if self._encoded_rules else None
+
+    def __get_columnar_rules(self) -> Union[None, Dict[str, ColumnarRule]]:
+        """Same as `self.__get_encoded_rules()`."""
+        if self._columnar_rules is None:
+            self._columnar_rules = self.__encode_rules(ColumnarRule)
+        return self._columnar_rules if self._columnar_rules else None
+
+    def __encode_rules(self, rule_class: type) -> Dict[str, EncodedRule]:
+        """All rules compiled as instances of `rule_class`, or none at all if some rule cannot be compiled."""
+        encoded_rules: Dict[str, EncodedRule] = dict()
+        for rule_name, rule in self.rules.items():
+            encoded_rule: Union[None, EncodedRule] = rule_class.compile(rule, self.symbols)
+            if encoded_rule is None:
+                return dict()
+            encoded_rules[rule_name] = encoded_rule
+        return encoded_rules
+
+    def infer_many(
+        self,
+        contexts: Iterable[Context],
+        workers: Union[None, int] = None,
+        chunksize: int = 1,
+        ordered: bool = True,
+        **kwargs,
+    ) -> Iterator[Union[InferenceResult, Tuple[int, InferenceResult]]]:
+        """
+        Infers from each context independently, spreading contexts over a pool of `workers` processes (by default, as
+        many as there are CPUs), each holding its own copy of the policy, which is sent once upon start-up. Contexts
+        are sent to workers `chunksize` at a time. If `ordered`, results are yielded in the order of `contexts`;
+        otherwise they are yielded as soon as they are ready, as (index, result) pairs. Any other keyword arguments
+        are passed on to `infer()`. With a single worker, everything runs in the current process.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1:
+            for i, context in enumerate(contexts):
+                result: InferenceResult = self.infer(context, **kwargs)
+                yield result if ordered else (i, result)
+            return
+        with multiprocessing.Pool(
+            workers, initializer=_initialize_worker, initargs=(self, kwargs)
+        ) as pool:
+            if ordered:
+                yield from pool.imap(_infer_in_worker, contexts, chunksize)
+            else:
+                yield from pool.imap_unordered(
+                    _infer_in_worker_indexed, enumerate(contexts), chunksize
+                )
+
+    def update(
+        self,
+        added: Context,
+        removed: Context,
+        result: Union[None, InferenceResult] = None,
+        budget: Union[None, Budget] = None,
+    ) -> InferenceResult:
+        """
+        Brings `result` (by default, `self.last_result`) in line with its context after adding the facts in `added`
+        and removing the facts in `removed`, without recomputing anything that is not affected by these changes. The
+        inference graph is maintained incrementally (see `InferenceGraph.update()`) and a stratum is only re-evaluated
+        if some of its nodes changed, either in the inference graph or in the marked literals. Facts both added and
+        removed are ignored. If `result` has no inference graph (e.g., if `infer()` has not been called before), this
+        is the same as inferring from `added`. Results are updated in place, so a result must not be updated by two
+        threads at once. If `budget` runs out, a `BudgetExhaustedError` is raised and `result` is left half-way
+        updated, so one has to infer again.
+        """
+        if result is None:
+            result = self.last_result
+        if result.truncated:
+            raise ValueError("Truncated results cannot be updated, so one has to infer again instead.")
+        if result.inference_graph is None:
+            return self.infer(added, budget=budget)
+        self.__update(added, removed, result, budget)
+        return result
+
+    def __update(
+        self,
+        added: Context,
+        removed: Context,
+        result: InferenceResult,
+        budget: Union[None, Budget] = None,
+    ) -> Set[str]:
+        """
+        Same as `self.update()` for a result with an inference graph, but returns all dependency graph nodes affected.
+        """
+        inference_graph: InferenceGraph = result.inference_graph
+        marked_literals: Context = result.inferences
+        removed_facts: List[Literal] = [
+            literal
+            for literal in removed
+            if literal not in added and inference_graph.is_base(literal)
+        ]
+        added_facts: List[Literal] = [
+            literal
+            for literal in added
+            if literal not in removed and not inference_graph.is_base(literal)
+        ]
+        changed: Set[str] = inference_graph.update(added_facts, removed_facts, budget)
+        for literal in removed_facts:
+            marked_literals.remove_literal(literal)
+        for literal in added_facts:
+            try:
+                marked_literals.add_literal(literal)
+            except LiteralAlreadyInContextError:
+                for stratum_result in result.stratum_results:  # It was inferred up to now.
+                    if literal in stratum_result.inferences:
+                        stratum_result.inferences.remove_literal(literal)
+        for i, stratum in enumerate(self.strata):
+            if changed.isdisjoint(stratum.nodes):
+                continue
+            old_result: StratumResult = result.stratum_results[i]
+            for literal in old_result.inferences:
+                marked_literals.remove_literal(literal)
+            inference_graph.restore_consistent(stratum.head_signatures, marked_literals)
+            new_result: StratumResult = self.__infer_stratum(
+                stratum, inference_graph, marked_literals, budget=budget
+            )
+            for literal in old_result.inferences:
+                if literal not in new_result.inferences:
+                    changed.add(DependencyGraph.get_node(literal))
+            for literal in new_result.inferences:
+                if literal not in old_result.inferences:
+                    changed.add(DependencyGraph.get_node(literal))
+            result.stratum_results[i] = new_result
+        result.collect()
+        return changed
+
+    def __infer_stratum(
+        self,
+        stratum: Stratum,
+        inference_graph: InferenceGraph,
+        marked_literals: Context,
+        max_depth: float = inf,
+        budget: Union[None, Budget] = None,
+        result: Union[None, StratumResult] = None,
+    ) -> StratumResult:
+        """
+        Marks all literals inferred by the rules of `stratum`, given that all earlier strata are done. Everything is
+        recorded in `result` (a new one, by default) as soon as it is marked, so it is up to date even if `budget`
+        runs out.
+        """
+        if result is None:
+            result = StratumResult()
         inferred: bool = True
-        depth: int = 0
-        while inferred and depth < max_depth:
+        while inferred and result.depth < max_depth:
             inferred = False
-            inference_graph.remove_conflicts_with(marked_literals)
-            inferring_rules = (
-                inference_graph.get_consistent_rules()
+            new_literals: Context = Context()
+            conflicts: ConflictIndex = ConflictIndex()
+            inferring_rules = inference_graph.get_consistent_rules(
+                stratum.head_signatures, conflicts, budget
             )
             # print("inf rules keys:", inferring_rules.keys())
             # print("inf rules values:", [[str(x) for x in v] for v in inferring_rules.values()])
-            for rule_name in self.rule_hasse_diagram:
+            for rule_name in stratum.rule_hd:
                 # print("rule:", rule_name)
                 if rule_name not in inferring_rules.keys():
                     continue
@@ -269,14 +709,22 @@ class Policy:
                 # print(f"inferring_rules[{rule_name}]:", {str(x) for x in inferring_rules[rule_name]})
                 rule: Rule = self.rules[rule_name]
                 for sub in inferring_rules[rule_name]:
-                    # self.rule_hasse_diagram.update_last_call(False)
-                    if not rule.is_triggered(marked_literals, sub):
-                        self.rule_hasse_diagram.update_last_call(False)
+                    if budget is not None:
+                        budget.spend()
+                    if not rule.is_triggered(
+                        marked_literals, sub, inference_graph.get_body_instances(rule_name, sub)
+                    ):
+                        # NOTE Pruning super-signatures at this point would skip rules that are triggered by other
+                        # substitutions, so the diagram is only used for ordering here.
                         continue
-                    instance: Literal = sub.apply(rule.head)
+                    instance: Literal = inference_graph.get_head_instance(rule_name, sub)
                     try:
                         is_prior: bool = self.priorities.is_prior(
-                            rule_name, inferring_rules, sub
+                            rule_name,
+                            inferring_rules,
+                            sub,
+                            inference_graph.get_head_instance,
+                            conflicts,
                             # rule_name, inferring_heads, sub
                         )
                     except UnresolvedConflictsError as e:
@@ -288,40 +736,40 @@ class Policy:
                         positive_head: Literal = new_dilemma.literal
                         # new_dilemmas: List[FrozenSet[str, str]] = e.conflicts
                         # print("Before:", positive_head, [str(x) for x in dilemmas.keys()])
-                        if positive_head in dilemmas.keys():
-                            dilemmas[positive_head] = dilemmas[positive_head].union(
-                                new_dilemma
-                            )
+                        if positive_head in result.dilemmas.keys():
+                            result.dilemmas[positive_head] = result.dilemmas[
+                                positive_head
+                            ].union(new_dilemma)
                         else:
-                            dilemmas[positive_head] = new_dilemma
+                            result.dilemmas[positive_head] = new_dilemma
                     # print("After:", positive_head, [str(x) for x in dilemmas.keys()])
                     # print("\tis_prior:", is_prior)
                     if not is_prior:
-                        # self.rule_hasse_diagram.update_last_call(False) # FIXME Should this also be updated based on subs?
                         continue
                     # print("rule is prior")
                     # print("Literal not in context error")
-                    # self.rule_hasse_diagram.update_last_call(True)
                     # instance: Literal = sub.apply(rule.head)
                     # print("instance:", instance, "sub:", sub)
                     try:
                         marked_literals.add_literal(instance)
                     except LiteralAlreadyInContextError:
                         continue
+                    new_literals.add_literal(instance)
+                    result.inferences.add_literal(instance)
                     inferred = True
                     if (
-                        not instance in self.inferred_by.keys()
+                        not instance in result.inferred_by.keys()
                     ):  # FIXME Again, this has been computed. Nevertheless, is it efficient to remove elements from ig.inferred_by or is this more/equally efficient?
-                        self.inferred_by[instance] = {rule_name: set([sub])}
-                    elif not rule_name in self.inferred_by[instance].keys():
-                        self.inferred_by[instance][rule_name] = set([sub])
+                        result.inferred_by[instance] = {rule_name: set([sub])}
+                    elif not rule_name in result.inferred_by[instance].keys():
+                        result.inferred_by[instance][rule_name] = set([sub])
                     else:
-                        self.inferred_by[instance][rule_name].add(sub)
-            depth += 1
-        # print("depth:", depth)
-        # print("Marked literals: ", marked_literals)
-        self.inferences = marked_literals
-        self.dilemmas = dilemmas
+                        result.inferred_by[instance][rule_name].add(sub)
+            inference_graph.remove_conflicts_with(new_literals, budget)
+            result.depth += 1
+            if not stratum.recursive:
+                break  # Unblocking a rule never yields new literals, so a single pass suffices.
+        return result
 
     def __str__(self) -> str:
         policy_str: str = "@Policy\n"
@@ -331,6 +779,88 @@ class Policy:
         return policy_str
 
 
+_worker_policy: Union[None, Policy] = None  # The policy of the current worker process, if any.
+_worker_kwargs: Dict = dict()
+
+
+def _initialize_worker(policy: Policy, kwargs: Dict) -> None:
+    global _worker_policy, _worker_kwargs
+    _worker_policy = policy
+    _worker_kwargs = kwargs
+
+
+def _infer_in_worker(context: Context) -> InferenceResult:
+    return _worker_policy.infer(context, **_worker_kwargs)
+
+
+def _infer_in_worker_indexed(item: Tuple[int, Context]) -> Tuple[int, InferenceResult]:
+    return item[0], _infer_in_worker(item[1])
+
+
+class InferenceResult:
+    """
+    The outcome of a call to `Policy.infer()`. Along with the inferences, it keeps the inference graph and the
+    literals marked by each stratum, so that it can be brought up to date by `Policy.update()`. Only the inferences,
+    dilemmas, `inferred_by`, the depth reached and whether inference was truncated are pickled (e.g., when sent
+    across processes).
+    """
+
+    __slots__ = (
+        "inferences",
+        "dilemmas",
+        "inferred_by",
+        "inference_graph",
+        "stratum_results",
+        "depth",
+        "truncated",
+    )
+
+    def __init__(
+        self,
+        inferences: Union[None, Context] = None,
+        inference_graph: Union[None, InferenceGraph] = None,
+    ) -> None:
+        self.inferences: Context = inferences if inferences is not None else Context()
+        self.dilemmas: Dict[Literal, Dilemma] = dict()
+        self.inferred_by: Dict[Literal, Dict[str, Set[Substitution]]] = dict()
+        self.inference_graph: Union[None, InferenceGraph] = inference_graph
+        self.stratum_results: List[StratumResult] = []
+        self.depth: int = 0
+        self.truncated: bool = False  # Whether a budget ran out before inference was complete.
+
+    def collect(self) -> None:
+        """Gathers the dilemmas and `inferred_by` of all strata."""
+        self.dilemmas = dict()
+        self.inferred_by = dict()
+        for stratum_result in self.stratum_results:
+            self.dilemmas.update(stratum_result.dilemmas)
+            self.inferred_by.update(stratum_result.inferred_by)
+
+    def __getstate__(self) -> Dict:
+        inferences: Context = self.inferences
+        if isinstance(inferences, OverlayContext):
+            inferences = inferences.flatten()
+        return {
+            "inferences": inferences,
+            "dilemmas": self.dilemmas,
+            "inferred_by": self.inferred_by,
+            "depth": self.depth,
+            "truncated": self.truncated,
+        }
+
+    def __setstate__(self, state: Dict) -> None:
+        self.inferences = state["inferences"]
+        self.dilemmas = state["dilemmas"]
+        self.inferred_by = state["inferred_by"]
+        self.inference_graph = None
+        self.stratum_results = []
+        self.depth = state["depth"]
+        self.truncated = state["truncated"]
+
+    def __str__(self) -> str:
+        return str(self.inferences)
+
+
 class Dilemma:
     """This class is used merely for unit testing facilitation, so it is not intended for broader use."""
 
@@ -464,10 +994,13 @@ class InferenceGraph:
     __slots__ = (
         "rules",
         "rule_hd",
+        "strata",
         "context",
         "inferred_by",
         "inferences",
         "consistent",
+        "_head_instances",
+        "_body_instances",
     )
 
     def __init__(
@@ -476,115 +1009,642 @@ class InferenceGraph:
         rule_hd: HasseDiagram,
         context: Context,
         unittest_params: Union[None, Dict] = None,
+        semi_naive: bool = True,
+        network: Union[None, ReteNetwork] = None,
+        strata: Union[None, List[Stratum]] = None,
+        budget: Union[None, Budget] = None,
+        compiled_rules: Union[None, Dict[str, CompiledRule]] = None,
+        encoded_rules: Union[None, Dict[str, EncodedRule]] = None,
     ) -> None:
+        """
+        Rules in `compiled_rules` are triggered through their compiled versions. If `encoded_rules` is provided, it
+        must contain all rules and the graph is computed over encoded facts, unless `context` is not ground.
+        """
         self.rules: Dict[str, Rule] = rules
         self.rule_hd: HasseDiagram = rule_hd  # FIXME Maybe deepcopy this.
+        self.strata: List[Stratum] = (
+            strata if strata is not None else [Stratum(rules, True, rule_hd)]
+        )
         self.context: Context = context
         self.inferred_by: Dict[Literal, List[Dict[str, Set[Substitution]]]] = dict()
+        # Instances of rules under substitutions, built once per inference and reused by later passes.
+        self._head_instances: Dict[Tuple[str, Substitution], Literal] = dict()
+        self._body_instances: Dict[Tuple[str, Substitution], List[Literal]] = dict()
         # self.inferences: Context = Context()
         # self.consistent: Context = Context()
         # print("init complete\n" + "=" * 40)
-        self.__compute_ig(unittest_params=unittest_params)
+        if encoded_rules is not None:
+            any_rule: EncodedRule = next(iter(encoded_rules.values()))
+            try:
+                encoded_context: Union[None, EncodedContext] = any_rule.context_class.from_context(
+                    context, any_rule.symbols
+                )
+            except ValueError:  # Not ground, so falls back to the interpreter.
+                encoded_context = None
+        if encoded_rules is not None and encoded_context is not None:
+            self.__compute_ig_encoded(
+                encoded_rules,
+                encoded_context,
+                unittest_params=unittest_params,
+                semi_naive=semi_naive,
+                budget=budget,
+            )
+        elif network is None:
+            self.__compute_ig(
+                unittest_params=unittest_params,
+                semi_naive=semi_naive,
+                budget=budget,
+                compiled_rules=compiled_rules,
+            )
+        else:
+            self.__compute_ig_rete(network, unittest_params=unittest_params, budget=budget)
+        for literal, rule_subs in self.inferred_by.items():
+            for rule_name, subs in rule_subs.items():
+                for sub in subs:
+                    self._head_instances[(rule_name, sub)] = literal
         # print(str(self.inferences))
         # Just to stringify
         # str_inf_by = { str(key): { x: [str(s) for s in y] for x, y in val.items() } for key, val in self.inferred_by.items() }
         # print("str_inf_by:", str_inf_by)
 
     def __compute_ig(
-        self, max_depth: float = inf, unittest_params: Union[None, Dict] = None
+        self,
+        max_depth: float = inf,
+        unittest_params: Union[None, Dict] = None,
+        semi_naive: bool = True,
+        budget: Union[None, Budget] = None,
+        compiled_rules: Union[None, Dict[str, CompiledRule]] = None,
     ) -> None:
-        inferred: bool = True
-        facts: Context = deepcopy(self.context)
+        """
+        Strata are evaluated in topological order. Rules in a non-recursive stratum only depend on literals of earlier
+        strata, so they are evaluated exactly once, while recursive strata are evaluated until nothing new is inferred.
+        In semi-naive mode, each round after the first one only considers rule instances that use at least one
+        literal inferred during the previous round.
+
+        In full (i.e., not semi-naive) rounds, interpreted rules extend the body matches of their donors (see
+        `Stratum.get_donors()`) instead of joining their bodies from scratch. Only the matches of rules that are
+        donors of some interpreted rule in the same or a later stratum are kept: those of the current round, until a
+        recursive stratum infers something new, and those of completed strata, which are final, since later strata
+        never infer literals that earlier strata depend on.
+        """
+        facts: OverlayContext = OverlayContext(self.context)
         depth: int = 0
         hd_iterations: int = 0
         inferred_by: Dict[Literal, Set[Dict[str, List[Substitution]]]] = dict() # FIXME Wrong type hint?
-        while inferred and depth < max_depth:
-            inferred = False
-            for rule_name in self.rule_hd:
-                # print("In the loop:", rule_name)
-                hd_iterations += 1
-                # print("~" * 50 +  "\nrule:", rule_name)
-                rule: Rule = self.rules[rule_name]
-                try:
-                    # print("facts:", facts)
-                    inferences = rule.trigger(facts)
-                    # print("rule inferences:", [[str(y) for y in x] for x in inferences])
-                except LiteralNotInContextError:
-                    # print("in ig rule name:", rule_name)
-                    self.rule_hd.update_last_call(False)
-                    continue
-                self.rule_hd.update_last_call(True)
-                for literal, sub in inferences:
+        donors: Set[str] = self.__get_donors(compiled_rules)
+        final_matches: Dict[str, List[Substitution]] = dict()  # Matches of donors in completed strata.
+        for stratum in self.strata:
+            inferred: bool = True
+            delta: Union[None, Context] = None
+            matches: Dict[str, List[Substitution]] = dict()  # Matches of donors in the current round.
+            while inferred and depth < max_depth:
+                inferred = False
+                new_delta: Context = Context()
+                matches = dict()
+                cursor: HasseDiagramCursor = iter(stratum.rule_hd)
+                for rule_name in cursor:
+                    # print("In the loop:", rule_name)
+                    hd_iterations += 1
+                    # print("~" * 50 +  "\nrule:", rule_name)
+                    rule: Union[Rule, CompiledRule] = self.rules[rule_name]
+                    if compiled_rules is not None and rule_name in compiled_rules.keys():
+                        rule = compiled_rules[rule_name]
                     try:
-                        facts.add_literal(literal)
-                    except LiteralAlreadyInContextError:
-                        if literal in self.context:
+                        # print("facts:", facts)
+                        inferences = None
+                        if delta is None and isinstance(rule, Rule):
+                            for donor, embedding in stratum.get_donors(rule_name, self.rules, self.rule_hd):
+                                subs: Union[None, List[Substitution]] = matches.get(donor)
+                                if subs is None:
+                                    subs = final_matches.get(donor)
+                                if subs is not None:
+                                    inferences = rule.trigger_from(facts, subs, embedding, budget)
+                                    break
+                        if inferences is None:
+                            inferences = rule.trigger(facts, delta, budget)
+                        # print("rule inferences:", [[str(y) for y in x] for x in inferences])
+                    except LiteralNotInContextError:
+                        # print("in ig rule name:", rule_name)
+                        cursor.update_last_call(False)
+                        continue
+                    cursor.update_last_call(True)
+                    donated: Union[None, List[Substitution]] = (
+                        [] if delta is None and rule_name in donors else None
+                    )
+                    for literal, sub in inferences:
+                        if budget is not None:
+                            budget.spend()
+                        if donated is not None:
+                            donated.append(sub)
+                        try:
+                            facts.add_literal(literal)
+                        except LiteralAlreadyInContextError:
+                            if literal in self.context:
+                                continue
+                            if not rule_name in inferred_by[literal].keys():
+                                inferred_by[literal][rule_name] = set([sub])
+                            else:
+                                inferred_by[literal][rule_name].add(sub)
                             continue
-                        if not rule_name in inferred_by[literal].keys():
+                        inferred = True
+                        new_delta.add_literal(literal)
+                        if stratum.recursive:
+                            matches.clear()  # These might miss the new literal, and so might the current ones.
+                            donated = None
+                        if not literal in inferred_by.keys():
+                            inferred_by[literal] = {rule_name: set([sub])}
+                        elif not rule_name in inferred_by[literal].keys():
                             inferred_by[literal][rule_name] = set([sub])
                         else:
                             inferred_by[literal][rule_name].add(sub)
-                        continue
-                    inferred = True
-                    if not literal in inferred_by.keys():
-                        inferred_by[literal] = {rule_name: set([sub])}
-                    elif not rule_name in inferred_by[literal].keys():
-                        inferred_by[literal][rule_name] = set([sub])
-                    else:
-                        inferred_by[literal][rule_name].add(sub)
-            depth += 1
+                    if donated is not None:
+                        matches[rule_name] = donated
+                if semi_naive:
+                    delta = new_delta
+                depth += 1
+                if not stratum.recursive:
+                    break
+            final_matches.update(matches)  # Only those stored after the last new literal are left.
         self.inferences = facts
         # print("inferred_by:", {str(l): {str(k): {str(x) for x in val} for k, val in v.items()} for l, v in inferred_by.items()})
         self.inferred_by = inferred_by
-        self.consistent = deepcopy(
+        self.consistent = OverlayContext(
             self.inferences
         )  # FIXME This ensures an absurd behaviour if called before remove_conflicts_with
         if unittest_params:
             unittest_params["depth"] = depth
             unittest_params["hd_iterations"] = hd_iterations
 
-    def remove_conflicts_with(self, marked: List[Literal]) -> Context:
+    def __get_donors(self, compiled_rules: Union[None, Dict[str, CompiledRule]] = None) -> Set[str]:
+        """The rules that are donors of some interpreted rule in their own or a later stratum."""
+        positions: Dict[str, int] = {
+            rule_name: i for i, stratum in enumerate(self.strata) for rule_name in stratum.rules
+        }
+        return {
+            donor
+            for i, stratum in enumerate(self.strata)
+            for rule_name in stratum.rules
+            if compiled_rules is None or rule_name not in compiled_rules.keys()
+            for donor, _ in stratum.get_donors(rule_name, self.rules, self.rule_hd)
+            if positions[donor] <= i
+        }
+
+    def __compute_ig_encoded(
+        self,
+        encoded_rules: Dict[str, EncodedRule],
+        encoded_context: EncodedContext,
+        max_depth: float = inf,
+        unittest_params: Union[None, Dict] = None,
+        semi_naive: bool = True,
+        budget: Union[None, Budget] = None,
+    ) -> None:
+        """Same as `self.__compute_ig()`, over encoded facts, which are only decoded once the graph is complete."""
+        symbols: SymbolTable = encoded_context.symbols
+        facts: EncodedContext = type(encoded_context)(symbols)
+        for fact in encoded_context:
+            facts.add_fact(fact)
+        derived: List[Fact] = []
+        matched_by: Dict[Fact, Dict[str, Set[Tuple[int, ...]]]] = dict()
+        depth: int = 0
+        hd_iterations: int = 0
+        for stratum in self.strata:
+            inferred: bool = True
+            delta: Union[None, EncodedContext] = None
+            while inferred and depth < max_depth:
+                inferred = False
+                new_delta: EncodedContext = type(encoded_context)(symbols)
+                cursor: HasseDiagramCursor = iter(stratum.rule_hd)
+                for rule_name in cursor:
+                    hd_iterations += 1
+                    rule: EncodedRule = encoded_rules[rule_name]
+                    try:
+                        matches: List[Tuple[int, ...]] = rule.trigger(facts, delta, budget)
+                    except LiteralNotInContextError:
+                        cursor.update_last_call(False)
+                        continue
+                    cursor.update_last_call(True)
+                    for values in matches:
+                        if budget is not None:
+                            budget.spend()
+                        fact: Fact = rule.head_fact(values)
+                        if not facts.add_fact(fact):
+                            if fact in encoded_context:
+                                continue
+                        else:
+                            inferred = True
+                            new_delta.add_fact(fact)
+                            derived.append(fact)
+                            matched_by[fact] = dict()
+                        if not rule_name in matched_by[fact].keys():
+                            matched_by[fact][rule_name] = {values}
+                        else:
+                            matched_by[fact][rule_name].add(values)
+                if semi_naive:
+                    delta = new_delta
+                depth += 1
+                if not stratum.recursive:
+                    break
+        self.inferences = OverlayContext(self.context)
+        self.inferred_by = dict()
+        for fact in derived:
+            literal: Literal = symbols.decode_literal(fact)
+            self.inferences.add_literal(literal)
+            self.inferred_by[literal] = {
+                rule_name: {encoded_rules[rule_name].substitution(x) for x in values}
+                for rule_name, values in matched_by[fact].items()
+            }
+        self.consistent = OverlayContext(self.inferences)
+        if unittest_params:
+            unittest_params["depth"] = depth
+            unittest_params["hd_iterations"] = hd_iterations
+
+    def __compute_ig_rete(
+        self,
+        network: ReteNetwork,
+        unittest_params: Union[None, Dict] = None,
+        budget: Union[None, Budget] = None,
+    ) -> None:
+        depth: int = network.run(self.context, budget)
+        inferred_by: Dict[Literal, Dict[str, Set[Substitution]]] = dict()
+        for rule_name, sub in network.matches():
+            literal: Literal = sub.apply(self.rules[rule_name].head)
+            if literal in self.context:
+                continue
+            if not literal in inferred_by.keys():
+                inferred_by[literal] = {rule_name: set([sub])}
+            elif not rule_name in inferred_by[literal].keys():
+                inferred_by[literal][rule_name] = set([sub])
+            else:
+                inferred_by[literal][rule_name].add(sub)
+        self.inferences = OverlayContext(self.context)
+        for literal in network.derived:
+            self.inferences.add_literal(literal)
+        self.inferred_by = inferred_by
+        self.consistent = OverlayContext(self.inferences)
+        if unittest_params:
+            unittest_params["depth"] = depth
+            unittest_params["hd_iterations"] = 0
+
+    def remove_conflicts_with(self, marked: List[Literal], budget: Union[None, Budget] = None) -> Context:
         # print("marked:", marked)
-        self.consistent.remove_conflicts_with(marked)
+        self.consistent.remove_conflicts_with(marked, budget)
 
-    def get_consistent_rules(self) -> Dict[str, Set[Substitution]]:
+    def get_consistent_rules(
+        self,
+        signatures: Union[None, Set[str]] = None,
+        conflicts: Union[None, ConflictIndex] = None,
+        budget: Union[None, Budget] = None,
+    ) -> Dict[str, Set[Substitution]]:
+        """
+        If `signatures` is provided, only consistent literals with one of these signatures are considered. If
+        `conflicts` is provided, all considered instances are also added to it. Each literal considered costs one
+        operation of `budget`.
+        """
         # instances: Set[str] = set()
         instances: Dict[str, Set[Substitution]] = dict()
         # print("inferred by:", self.inferred_by.keys())
         # print("self.consistent:", self.consistent)
         # print("self.inferred_by.keys():", [str(x) for x in self.inferred_by.keys()])
-        for literal in self.consistent:
+        if signatures is None:
+            literals: Iterator[Literal] = self.consistent
+        else:
+            literals = (
+                literal
+                for signature in signatures
+                for literal in self.consistent.get_bucket(signature)
+            )
+        for literal in literals:
             # print("literal:", literal)
+            if budget is not None:
+                budget.spend()
             if literal not in self.inferred_by.keys():
                 # print("NOT EQUAL!")
                 continue
             # print("EQUAL")
+            if conflicts is not None:
+                conflicts.add(literal, self.inferred_by[literal])
             for rule_name, subs in self.inferred_by[literal].items():
                 if rule_name not in instances.keys():
-                    instances[rule_name] = subs
+                    instances[rule_name] = set(subs)
                 else:
-                    instances[rule_name] = instances[rule_name].union(subs)
+                    instances[rule_name].update(subs)  # In place, as copying each time is quadratic.
             # instances = instances.union(set(self.inferred_by[literal].keys()))
         return instances
 
-    """Add and remove rules in an inference graph in a consistent way that saves up time. The same might apply
-    to contexts, as well."""
+    def get_head_instance(self, rule_name: str, sub: Substitution) -> Literal:
+        try:
+            return self._head_instances[(rule_name, sub)]
+        except KeyError:
+            instance: Literal = sub.apply(self.rules[rule_name].head)
+            self._head_instances[(rule_name, sub)] = instance
+            return instance
+
+    def get_body_instances(self, rule_name: str, sub: Substitution) -> List[Literal]:
+        try:
+            return self._body_instances[(rule_name, sub)]
+        except KeyError:
+            instances: List[Literal] = [sub.apply(x) for x in self.rules[rule_name].body]
+            self._body_instances[(rule_name, sub)] = instances
+            return instances
+
+    def is_base(self, literal: Literal) -> bool:
+        """Whether `literal` is a fact of the context, as opposed to an inferred literal."""
+        return literal in self.inferences and literal not in self.inferred_by.keys()
+
+    def update(
+        self, added: List[Literal], removed: List[Literal], budget: Union[None, Budget] = None
+    ) -> Set[str]:
+        """
+        Maintains the graph after adding the facts in `added` and removing the facts in `removed` (delete and
+        re-derive), returning all affected dependency graph nodes. First, each rule instance that uses a deleted literal
+        is found against the old facts and dropped from `inferred_by`. A literal is deleted once it has lost all of its
+        instances or, in recursive strata, as soon as it loses any of them, since its remaining ones might only support
+        it cyclically. Then, stratum by stratum, deleted literals with instances left (or, for removed facts, with
+        instances in the remaining facts) are restored and all insertions are propagated semi-naively. Rules are
+        triggered as by `Rule.trigger()`, which charges `budget`, if provided.
+        """
+        changed: Set[str] = set()
+        deleted: Context = Context()
+        for literal in removed:
+            deleted.add_literal(literal)
+            changed.add(DependencyGraph.get_node(literal))
+        for literal in added:
+            if literal in self.inferred_by.keys():  # Inferred literals that become facts lose their instances.
+                del self.inferred_by[literal]
+            changed.add(DependencyGraph.get_node(literal))
+        for stratum in self.strata:
+            delta: Context = deleted
+            while len(delta) > 0:
+                new_deleted: Context = Context()
+                for rule_name in stratum.rules:
+                    try:
+                        instances = self.rules[rule_name].trigger(self.inferences, delta, budget)
+                    except LiteralNotInContextError:
+                        continue
+                    for literal, sub in instances:
+                        try:
+                            supports: Dict[str, Set[Substitution]] = self.inferred_by[literal]
+                        except KeyError:
+                            continue  # A fact.
+                        if rule_name in supports.keys():
+                            supports[rule_name].discard(sub)
+                            if len(supports[rule_name]) == 0:
+                                del supports[rule_name]
+                        changed.add(DependencyGraph.get_node(literal))
+                        if literal in deleted or literal in new_deleted:
+                            continue
+                        if stratum.recursive or len(supports) == 0:
+                            new_deleted.add_literal(literal)
+                deleted += new_deleted
+                if not stratum.recursive:
+                    break
+                delta = new_deleted
+        for literal in deleted:
+            self.inferences.remove_literal(literal)
+            self.consistent.forget(literal)
+        inserted: Context = Context()
+        for literal in added:
+            if literal not in self.inferences:
+                self.inferences.add_literal(literal)
+                inserted.add_literal(literal)
+        for stratum in self.strata:
+            for literal in (
+                literal
+                for signature in stratum.head_signatures
+                for literal in deleted.get_bucket(signature)
+            ):
+                if literal in self.inferred_by.keys():
+                    supports = self.inferred_by[literal]
+                else:
+                    supports = self.__derive(stratum, literal)
+                if len(supports) == 0:
+                    self.inferred_by.pop(literal, None)
+                    continue
+                self.inferred_by[literal] = supports
+                self.inferences.add_literal(literal)
+                inserted.add_literal(literal)
+            delta = inserted
+            while True:
+                new_inserted: Context = Context()
+                for rule_name in stratum.rules:
+                    try:
+                        instances = self.rules[rule_name].trigger(self.inferences, delta, budget)
+                    except LiteralNotInContextError:
+                        continue
+                    for literal, sub in instances:
+                        if literal in self.inferred_by.keys():
+                            supports = self.inferred_by[literal]
+                        elif literal in self.inferences:
+                            continue  # A fact.
+                        else:
+                            supports = dict()
+                            self.inferred_by[literal] = supports
+                            self.inferences.add_literal(literal)
+                            new_inserted.add_literal(literal)
+                        if rule_name not in supports.keys():
+                            supports[rule_name] = set([sub])
+                        else:
+                            supports[rule_name].add(sub)
+                        changed.add(DependencyGraph.get_node(literal))
+                inserted += new_inserted
+                if not stratum.recursive or len(new_inserted) == 0:
+                    break
+                delta = new_inserted
+        return changed
+
+    def __derive(self, stratum: Stratum, literal: Literal) -> Dict[str, Set[Substitution]]:
+        supports: Dict[str, Set[Substitution]] = dict()
+        for rule_name in stratum.rules:
+            rule: Rule = self.rules[rule_name]
+            if rule.head.signature != literal.signature:
+                continue
+            subs: List[Substitution] = rule.derive(self.inferences, literal)
+            if subs:
+                supports[rule_name] = set(subs)
+        return supports
+
+    def restore_consistent(self, signatures: Set[str], marked: Context) -> None:
+        """Recomputes the consistent literals with the provided signatures from scratch."""
+        for signature in signatures:
+            for literal in self.consistent.get_bucket(signature)[:]:
+                self.consistent.remove_literal(literal)
+            for literal in self.inferences.get_bucket(signature):
+                negation: Literal = deepcopy(literal)
+                negation.sign = not literal.sign
+                if negation not in marked:
+                    self.consistent.add_literal(literal)
+
+    """Add and remove rules in an inference graph in a consistent way that saves up time."""
+
+class Stratum:
+    """A group of rules whose heads belong to the same strongly connected component of the dependency graph."""
+
+    __slots__ = ("rules", "rule_hd", "recursive", "head_signatures", "nodes", "donors")
+
+    def __init__(
+        self,
+        rules: Dict[str, Rule],
+        recursive: bool,
+        rule_hd: Union[None, HasseDiagram] = None,
+    ) -> None:
+        self.rules: List[str] = list(rules.keys())
+        self.rule_hd: HasseDiagram = rule_hd if rule_hd is not None else HasseDiagram(rules)
+        self.recursive: bool = recursive
+        self.head_signatures: Set[str] = {rule.head.signature for rule in rules.values()}
+        self.nodes: Set[str] = {
+            DependencyGraph.get_node(literal)
+            for rule in rules.values()
+            for literal in rule.body + [rule.head]
+            if not literal.is_truism()
+        }  # Everything the stratum's inferences may depend on.
+        self.donors: Dict[str, List[Tuple[str, Embedding]]] = dict()  # Filled upon first use.
+
+    def get_donors(
+        self, rule_name: str, rules: Dict[str, Rule], rule_hd: HasseDiagram
+    ) -> List[Tuple[str, Embedding]]:
+        """
+        The rules whose matches may be carried over to rule `rule_name` (see `Rule.trigger_from()`), i.e., the rules
+        with the same or a closest sub-signature in `rule_hd`, the diagram of all rules of the policy, that embed into
+        it, along with their embeddings. Donors may belong to any stratum, though only those of the same or an earlier
+        stratum have matches to carry over by the time rule `rule_name` is triggered. Rules with larger bodies come
+        first, as they leave less to join.
+        """
+        try:
+            return self.donors[rule_name]
+        except KeyError:
+            pass
+        rule: Rule = rules[rule_name]
+        signature: RuleSignature = RuleSignature(rule.signature)
+        candidates: List[str] = []
+        try:
+            index: int = rule_hd.node_indices[signature]
+        except KeyError:  # Not part of the diagram.
+            index = -1
+        if index != -1:
+            candidates += [x for x in rule_hd.nodes[signature] if x != rule_name]
+            for parent in rule_hd.parents[index]:
+                candidates += rule_hd.nodes[rule_hd.node_indices_rev[parent]]
+        donors: List[Tuple[str, Embedding]] = []
+        for candidate in sorted(candidates, key=lambda x: -len(rules[x].body)):
+            embedding: Union[None, Embedding] = rules[candidate].embed(rule)
+            if embedding is not None:
+                donors.append((candidate, embedding))
+        self.donors[rule_name] = donors
+        return donors
+
+    @classmethod
+    def stratify(cls, rules: Dict[str, Rule], rule_hd: Union[None, HasseDiagram] = None) -> List[Stratum]:
+        """
+        Strata in the order they should be evaluated. If `rule_hd` (the diagram of all rules) is provided, strata that
+        do not depend on each other are ordered so that, where possible, the donors of a rule (see `get_donors()`) are
+        evaluated before it, i.e., in an earlier stratum, if not in the same one.
+        """
+        strata: List[Stratum] = [
+            cls({rule_name: rules[rule_name] for rule_name in rule_names}, recursive)
+            for rule_names, recursive in DependencyGraph(rules).strata()
+        ]
+        if rule_hd is None:
+            return strata
+        positions: Dict[str, int] = {
+            rule_name: i for i, stratum in enumerate(strata) for rule_name in stratum.rules
+        }
+        producers: Dict[str, int] = {
+            DependencyGraph.get_node(rules[rule_name].head): i for rule_name, i in positions.items()
+        }
+        successors: List[Set[int]] = [set() for _ in strata]  # Strata that depend on each stratum.
+        preferred: List[Set[int]] = [set() for _ in strata]  # Strata with donors of rules of each stratum.
+        for j, stratum in enumerate(strata):
+            for node in stratum.nodes:
+                i: int = producers.get(node, j)
+                if i != j:
+                    successors[i].add(j)
+            for rule_name in stratum.rules:
+                for donor, _ in stratum.get_donors(rule_name, rules, rule_hd):
+                    if positions[donor] != j:
+                        preferred[j].add(positions[donor])
+        return [strata[i] for i in cls.__order(successors, preferred)]
+
+    @staticmethod
+    def __order(successors: List[Set[int]], preferred: List[Set[int]]) -> List[int]:
+        """
+        A topological order of the graph with the provided `successors` (Kahn's algorithm), taking the first ready
+        node in the original order, except that a ready node is postponed until all of its `preferred` nodes are
+        placed, unless no other node is ready.
+        """
+        n: int = len(successors)
+        in_degrees: List[int] = [0] * n
+        for targets in successors:
+            for j in targets:
+                in_degrees[j] += 1
+        pending: List[int] = [len(x) for x in preferred]  # Preferred nodes not placed yet.
+        preferred_by: List[List[int]] = [[] for _ in range(n)]
+        for j, sources in enumerate(preferred):
+            for i in sources:
+                preferred_by[i].append(j)
+        placed: List[bool] = [False] * n
+        free: List[int] = []  # Ready nodes, as heaps.
+        postponed: List[int] = []
+        for i in range(n):
+            if in_degrees[i] == 0:
+                heapq.heappush(free if pending[i] == 0 else postponed, i)
+        order: List[int] = []
+        while free or postponed:
+            i = heapq.heappop(free) if free else heapq.heappop(postponed)
+            if placed[i]:  # Also pushed to `free` once its preferred nodes were placed.
+                continue
+            placed[i] = True
+            order.append(i)
+            for j in preferred_by[i]:
+                pending[j] -= 1
+                if pending[j] == 0 and in_degrees[j] == 0 and not placed[j]:
+                    heapq.heappush(free, j)
+            for j in successors[i]:
+                in_degrees[j] -= 1
+                if in_degrees[j] == 0:
+                    heapq.heappush(free if pending[j] == 0 else postponed, j)
+        return order
+
+
+class StratumResult:
+    """The literals marked by a stratum during inference, along with the dilemmas that came up."""
+
+    __slots__ = ("inferences", "dilemmas", "inferred_by", "depth")
+
+    def __init__(self) -> None:
+        self.inferences: Context = Context()
+        self.dilemmas: Dict[Literal, Dilemma] = dict()
+        self.inferred_by: Dict[Literal, Dict[str, Set[Substitution]]] = dict()
+        self.depth: int = 0
 
 
 class HasseDiagram:  # Implemented specifically for use within Prudens, not for wider audience.
+    """
+    The diagram itself is never modified while being traversed: each traversal gets its own `HasseDiagramCursor`,
+    so the same diagram may be traversed by many threads at once.
+
+    Edges are found through `self.literal_index`, which maps each key of a signature (see `RuleSignature.keys`) to
+    the bitset (i.e., an int) of the indices of all nodes whose signatures have this key. So, the super-signatures of
+    a signature are the intersection of the bitsets of its keys, without comparing it with any other signature.
+
+    Node indices are stable, i.e., never reused or renumbered when nodes are removed, and edges are kept as adjacency
+    sets, so both updating the diagram and following a node's edges only involve that node's neighbours.
+    `self.order` lists all node indices by signature size (and then by index), i.e., in traversal order.
+    """
+
     __slots__ = (
-        "_last_call",
         "nodes",
         "layers",
         "node_indices",
         "node_indices_rev",
-        "front",
         "existing_layers",
-        "edges",
+        "children",
+        "parents",
+        "literal_index",
+        "order",
+        "next_index",
     )
 
     def __init__(self, nodes: Dict[str, Rule]) -> None:
-        self._last_call: LastCall = LastCall("")
         self.__initialize_nodes(nodes)
         self.__initialize_edges()
         # print("self.nodes:", {str(item[0]): str(item[1]) for item in self.nodes.items()})
@@ -597,101 +1657,128 @@ class HasseDiagram:  # Implemented specifically for use within Prudens, not for
         for name, rule in nodes.items():
             signature: RuleSignature = RuleSignature(rule.signature)
             signature_size: int = len(signature)
-            if signature not in self.nodes.keys():
-                self.nodes[signature] = [name]
-            else:
+            if signature in self.nodes.keys():
                 self.nodes[signature].append(name)
+                continue
+            self.nodes[signature] = [name]
             if signature_size not in self.layers.keys():
                 self.layers[signature_size] = [signature]
-            elif signature not in self.layers[signature_size]:
+            else:
                 self.layers[signature_size].append(signature)
         node_keys = list(self.nodes.keys())
-        self.front: List[RuleSignature] = node_keys[:]
         self.node_indices = {node_keys[i]: i for i in range(len(node_keys))}
         self.node_indices_rev = {item[1]: item[0] for item in self.node_indices.items()}
         self.existing_layers: List[int] = sorted(list(self.layers.keys()))
+        self.next_index: int = len(node_keys)
+        self.order: List[int] = sorted(
+            self.node_indices_rev.keys(), key=lambda x: len(self.node_indices_rev[x])
+        )
 
     def __initialize_edges(self) -> None:
-        self.edges: Set[Tuple[int]] = set()
-        for signature in self.nodes.keys():
-            self.__update_edges(signature)
+        """
+        Builds all edges in bulk: the super-signatures of each node are found through `self.literal_index` and an
+        edge is kept only towards those that are not super-signatures of another one, i.e., the transitive reduction.
+        """
+        self.children: Dict[int, Set[int]] = {index: set() for index in self.node_indices_rev.keys()}
+        self.parents: Dict[int, Set[int]] = {index: set() for index in self.node_indices_rev.keys()}
+        self.literal_index: Dict[Tuple[str, int], int] = dict()
+        for signature, index in self.node_indices.items():
+            self.__index_node(signature, index)
+        supersets: Dict[int, int] = {
+            index: self.__get_supersets(signature, index)
+            for signature, index in self.node_indices.items()
+        }
+        for index, superset in supersets.items():
+            transitive: int = 0
+            for super_index in utils.get_bits(superset):
+                transitive |= supersets[super_index]
+            for super_index in utils.get_bits(superset & ~transitive):
+                self.__add_edge(index, super_index)
+
+    @property
+    def edges(self) -> Set[Tuple[int, int]]:
+        """All edges, as (sub-signature index, super-signature index) pairs."""
+        return {(start, end) for start, ends in self.children.items() for end in ends}
+
+    def __add_edge(self, start: int, end: int) -> None:
+        self.children[start].add(end)
+        self.parents[end].add(start)
+
+    def __remove_edge(self, start: int, end: int) -> None:
+        self.children[start].discard(end)
+        self.parents[end].discard(start)
+
+    def __index_node(self, signature: RuleSignature, index: int) -> None:
+        for key in signature.keys:
+            try:
+                self.literal_index[key] |= 1 << index
+            except KeyError:
+                self.literal_index[key] = 1 << index
+
+    def __unindex_node(self, signature: RuleSignature, index: int) -> None:
+        for key in signature.keys:
+            bitset: int = self.literal_index[key] & ~(1 << index)
+            if bitset:
+                self.literal_index[key] = bitset
+            else:
+                del self.literal_index[key]
+
+    def __get_supersets(self, signature: RuleSignature, index: int) -> int:
+        """The bitset of the indices of all strict super-signatures of `signature`, whose index is `index`."""
+        superset: int = -1
+        for key in signature.keys:
+            superset &= self.literal_index.get(key, 0)
+        return superset & ~(1 << index)
+
+    def __get_subsets(self, signature: RuleSignature, index: int) -> int:
+        """The bitset of the indices of all strict sub-signatures of `signature`, whose index is `index`."""
+        candidates: int = 0
+        for key in signature.keys:
+            candidates |= self.literal_index.get(key, 0)
+        subset: int = 0
+        for candidate in utils.get_bits(candidates & ~(1 << index)):
+            if self.node_indices_rev[candidate].keys <= signature.keys:
+                subset |= 1 << candidate
+        return subset
 
     def __update_edges(self, signature: RuleSignature) -> None:
-        signature_size: int = len(signature)
-        layer_index: int = self.existing_layers.index(signature_size)
+        """Links a new node to its closest super- and sub-signatures, replacing the edges it now lies between."""
         node_index: int = self.node_indices[signature]
+        self.__index_node(signature, node_index)
+        superset: int = self.__get_supersets(signature, node_index)
+        subset: int = self.__get_subsets(signature, node_index)
         super_added: List[int] = []
-        super_excluded: List[RuleSignature] = []
-        for super_layer in self.existing_layers[(layer_index + 1) :]:
-            for super_signature in self.__exclude_supersets(
-                super_excluded, self.layers[super_layer][:]
-            ):
-                if signature.is_subsignature(super_signature):
-                    super_index: int = self.node_indices[super_signature]
-                    self.edges.add((node_index, super_index))
-                    super_added.append(super_index)
-                super_excluded.append(super_signature)
+        for super_index in utils.get_bits(superset):
+            super_signature: RuleSignature = self.node_indices_rev[super_index]
+            if not self.__get_subsets(super_signature, super_index) & superset:
+                self.__add_edge(node_index, super_index)
+                super_added.append(super_index)
         sub_added: List[int] = []
-        sub_excluded: List[RuleSignature] = []
-        for sub_layer in self.existing_layers[:layer_index]:
-            for sub_signature in self.__exclude_subsets(
-                sub_excluded, self.layers[sub_layer][:]
-            ):
-                if sub_signature.is_subsignature(signature):
-                    sub_index: int = self.node_indices[sub_signature]
-                    self.edges.add((sub_index, node_index))
-                    sub_added.append(sub_index)
-                sub_excluded.append(sub_signature)
-        # self.edges.difference(it.product(super_added, sub_added))
-        for end_node in super_added:  # FIXME Why is this loop needed?
+        for sub_index in utils.get_bits(subset):
+            sub_signature: RuleSignature = self.node_indices_rev[sub_index]
+            if not self.__get_supersets(sub_signature, sub_index) & subset:
+                self.__add_edge(sub_index, node_index)
+                sub_added.append(sub_index)
+        for end_node in super_added:  # These are no longer covering edges, as the new node lies between their ends.
             for start_node in sub_added:
-                try:
-                    self.edges.remove((start_node, end_node))
-                except KeyError:
-                    pass
-
-    def __exclude_supersets(
-        self, sub_signatures: List[RuleSignature], signatures: List[RuleSignature]
-    ) -> List[RuleSignature]:
-        if len(sub_signatures) == 0:
-            for x in signatures:
-                yield x
-        for signature in signatures:
-            i = 0
-            while i < len(sub_signatures) and not sub_signatures[i].is_subsignature(
-                signature
-            ):
-                i += 1
-            if i == len(sub_signatures):
-                yield signature
-
-    def __exclude_subsets(
-        self, super_signatures: List[RuleSignature], signatures: List[RuleSignature]
-    ) -> List[RuleSignature]:
-        if (len(super_signatures)) == 0:
-            for x in signatures:
-                yield x
-        for signature in signatures:
-            i = 0
-            while i < len(super_signatures) and not signature.is_subsignature(
-                super_signatures[i]
-            ):
-                i += 1
-            if i == len(super_signatures):
-                yield signature
+                self.__remove_edge(start_node, end_node)
 
     def add_node(self, common_signature: str, rules: List[str]) -> None:
         signature: RuleSignature = RuleSignature(common_signature)
         signature_size: int = len(signature)
-        if signature not in self.nodes.keys():
-            n: int = len(self.nodes)
-            self.node_indices[signature] = n
-            self.node_indices_rev[n] = signature
-            self.nodes[signature] = rules
-        else:
+        if signature in self.nodes.keys():
             self.nodes[signature] += rules
             # for rule in rules:
             #     self.nodes[signature].append(rule)  # TODO Check for actual duplicates?
+            return
+        n: int = self.next_index
+        self.next_index += 1
+        self.node_indices[signature] = n
+        self.node_indices_rev[n] = signature
+        self.nodes[signature] = rules
+        self.children[n] = set()
+        self.parents[n] = set()
+        self.__insert_in_order(n)
         if signature_size not in self.existing_layers:
             self.layers[signature_size] = [signature]
             self.__add_layer(signature_size)
@@ -699,6 +1786,19 @@ class HasseDiagram:  # Implemented specifically for use within Prudens, not for
             self.layers[signature_size].append(signature)
         self.__update_edges(signature)
 
+    def __insert_in_order(self, index: int) -> None:
+        """Inserts a new node after all nodes with signatures of at most the same size, as it has the largest index."""
+        size: int = len(self.node_indices_rev[index])
+        low: int = 0
+        high: int = len(self.order)
+        while low < high:
+            middle: int = (low + high) // 2
+            if len(self.node_indices_rev[self.order[middle]]) <= size:
+                low = middle + 1
+            else:
+                high = middle
+        self.order.insert(low, index)
+
     def __add_layer(self, layer: int) -> None:
         n: int = len(self.existing_layers)
         length: int = n // 2
@@ -721,174 +1821,107 @@ class HasseDiagram:  # Implemented specifically for use within Prudens, not for
             self.__remove_node(signature)
 
     def __remove_node(self, signature) -> None:
-        n: int = len(self.nodes)
         signature_size: int = len(signature)
         node_index: int = self.node_indices[signature]
         del self.nodes[signature]
         del self.node_indices[signature]
         del self.node_indices_rev[node_index]
-        for node, index in self.node_indices.items():
-            if index > node_index:
-                self.node_indices[node] = index - 1
-                self.node_indices_rev[index - 1] = node
-        old_ends: List[int] = []
-        old_starts: List[int] = []
-        for i in range(n):
-            if (node_index, i) in self.edges:
-                old_ends.append(i)
-                self.edges.remove((node_index, i))
-            if (i, node_index) in self.edges:
-                old_starts.append(i)
-                self.edges.remove((i, node_index))
+        self.__unindex_node(signature, node_index)
+        old_ends: Set[int] = self.children.pop(node_index)
+        old_starts: Set[int] = self.parents.pop(node_index)
+        for end in old_ends:
+            self.parents[end].discard(node_index)
+        for start in old_starts:
+            self.children[start].discard(node_index)
         for start in old_starts:
             for end in old_ends:
-                self.edges.add((start, end))
+                self.__add_edge(start, end)
+        self.order.remove(node_index)
         self.layers[signature_size].remove(signature)
-        if len(self.layers[signature]) == 0:
+        if len(self.layers[signature_size]) == 0:
             self.__remove_layer(signature_size)
 
     def __remove_layer(self, layer: int) -> None:
         del self.layers[layer]
         self.existing_layers.remove(layer)
 
+    def get_children_indices(self, index: int) -> List[int]:
+        return list(self.children[index])
+
+    def __iter__(self) -> HasseDiagramCursor:
+        return HasseDiagramCursor(self)
+
+
+class HasseDiagramCursor:
+    """
+    The state of a single traversal of a `HasseDiagram`, which visits nodes in `diagram.order`. The front of the
+    traversal is the rest of that order after `self.position`, minus the nodes in `self.pruned`, so taking the next
+    node takes amortized constant time and pruning a branch only visits the nodes in it.
+    """
+
+    __slots__ = ("diagram", "_last_call", "position", "pruned")
+
+    def __init__(self, diagram: HasseDiagram) -> None:
+        self.diagram: HasseDiagram = diagram
+        self._last_call: LastCall = LastCall("")
+        self.position: int = 0
+        self.pruned: Set[int] = set()
+
     def __next__(self) -> str:
-        if not self._last_call:
-            # print("not self._last_call")
-            layer: List[RuleSignature] = self.layers[self.existing_layers[0]]
-            signature: RuleSignature = layer[0]
-            name: str = self.nodes[signature][0]
-            # print(self.front)
-            self._last_call.signature = signature
-            self._last_call.index = 0
-            # self._last_call.min_layer_index = 0
-            # self._last_call.layer_index = 0
-            self.front = [
-                x
-                for x in self.nodes.keys()
-                if x != signature or len(self.nodes[signature]) != 1
-            ]  # FIXME How to handle rules with same signature?
-            self.front.sort(key=lambda x: len(x))
-            # self.front = list(self.nodes.keys()) # FIXME This is a bit profligate...
-            # print("front:", [str(x) for x in self.front])
-            # print("self._last_call:", self._last_call.signature)
-            return name
-        if not self._last_call.triggered:
-            # print("Before prunning:", self.front)
-            self.__prune_front()
-            # print("After prunning:", self.front)
-        if (
-            len(self.front) == 0
-            and self._last_call.index == len(self.nodes[self._last_call.signature]) - 1
-        ):
-            # print("empty front")
-            # print("self._last_call.index:", self._last_call.index)
-            # print("self.nodes[self._last_call.signature]:", self.nodes[self._last_call.signature])
-            self._last_call = LastCall("")
-            self.front = list(self.nodes.keys())[:]
+        nodes: Dict[RuleSignature, List[str]] = self.diagram.nodes
+        if self._last_call:
+            if not self._last_call.triggered:
+                self.__prune_branch(self.diagram.node_indices[self._last_call.signature])
+            if self._last_call.index < len(nodes[self._last_call.signature]) - 1:
+                self._last_call.index += 1
+                return nodes[self._last_call.signature][self._last_call.index]
+        order: List[int] = self.diagram.order
+        while self.position < len(order) and order[self.position] in self.pruned:
+            self.position += 1
+        if self.position == len(order):
             raise StopIteration
-        if self._last_call.index < len(self.nodes[self._last_call.signature]) - 1:
-            next_rule = self.nodes[self._last_call.signature][self._last_call.index + 1]
-            # print("last if")
-            # print("next_rule:", next_rule)
-            # print("self._last_call.signature:", self._last_call.signature)
-            self._last_call.index += 1
-            return next_rule
-        signature: RuleSignature = self.front.pop(
-            0
-        )  # TODO Consider adding a "LastCall.reset()" method to tidy this up!
+        signature: RuleSignature = self.diagram.node_indices_rev[order[self.position]]
+        self.position += 1
         self._last_call.signature = signature
         self._last_call.index = 0
-        # print("Popping another one:", signature)
-        # self.last_rule = { "signature": signature, "index": 0 }
-        return self.nodes[signature][0]
-
-    def __prune_front(self) -> None:
-        last_signature: RuleSignature = self._last_call.signature
-        # print("last_signature:", last_signature)
-        n: int = len(self.front)
-        i: int = 0
-        # print(i, n)
-        while i < n:
-            # print(f"i: {i}, n: {n}")
-            front_signature: RuleSignature = self.front[i]
-            # print("front_signature:", front_signature)
-            if last_signature.is_subsignature(front_signature):
-                # print(last_signature, "is subsignature of", front_signature)
-                before, total = self.__prune_branch(
-                    self.node_indices[front_signature]
-                )  # FIXME Annotation? Tuple[int, int]
-                i -= before
-                n -= total
-            else:
-                # print("else")
-                i += 1
-
-    def __prune_branch(
-        self, index: int
-    ) -> Tuple[
-        int
-    ]:  # FIXME You might calculate the branch wrongly, in __get_children_indices()!
-        # print("index:", index)
-        # print("self.front:", [str(x) for x in self.front])
-        branch_front: List[int] = [index]
-        before: int = 0
-        total: int = 0
+        return nodes[signature][0]
+
+    def __prune_branch(self, index: int) -> None:
+        """Prunes all super-signatures of the node with index `index`, i.e., all nodes reachable from it."""
+        children: Dict[int, Set[int]] = self.diagram.children
+        branch_front: List[int] = list(children[index])
         while len(branch_front) > 0:
-            current: RuleSignature = branch_front.pop()
-            children: List[int] = self.__get_children_indices(current)
-            # print(f"\tcurrent: {self.node_indices_rev[current]}\n\tchildren: {[str(self.node_indices_rev[i]) for i in children]}")
-            branch_front += children
-            try:
-                # print(f"Trying to remove: {self.node_indices_rev[current]}")
-                self.front.remove(self.node_indices_rev[current])
-                # print(f"Success!\n{'=' * 50}")
-            except ValueError:
-                # print(f"Failure!\n{'=' * 50}")
-                pass
-            if current < index:
-                before += 1
-            total += 1
-        return (before, total)
-
-    def __get_children_indices(self, index: int) -> List[int]:
-        n: int = len(self.nodes)
-        children: List[int] = []
-        for i in range(n):
-            if (index, i) in self.edges:
-                children.append(i)
-        return children
+            current: int = branch_front.pop()
+            if current in self.pruned:
+                continue
+            self.pruned.add(current)
+            branch_front += children[current]
 
     def update_last_call(self, triggered: bool):
         self._last_call.triggered = triggered
 
-    def __iter__(self) -> HasseDiagram:
+    def __iter__(self) -> HasseDiagramCursor:
         return self
 
 
 class RuleSignature:  # TODO Consider moving this to rule and fix all instances of rule.signature accordingly.
-    __slots__ = ("signature", "literal_signatures", "length")
+    __slots__ = ("signature", "literal_signatures", "length", "keys")
 
     def __init__(self, signature: str) -> None:
         self.signature: str = signature
         self.literal_signatures: List[str] = self.signature.split("|")
         self.length: int = len(self.literal_signatures)
+        # The k-th occurrence of each literal signature is keyed by (literal signature, k), so that signatures, which
+        # are multisets of literal signatures, are compared as plain sets of keys.
+        counts: Dict[str, int] = dict()
+        keys: List[Tuple[str, int]] = []
+        for literal in self.literal_signatures:
+            counts[literal] = counts.get(literal, 0) + 1
+            keys.append((literal, counts[literal]))
+        self.keys: FrozenSet[Tuple[str, int]] = frozenset(keys)
 
     def is_subsignature(self, other: RuleSignature) -> bool:
-        start_index: int = 0
-        # print(f"is_subsignature({self}, {other})")
-        # print(f"literal_signatures: {self.literal_signatures}")
-        for literal in self.literal_signatures:
-            # print(f"\tliteral: {literal}")
-            try:
-                found_index: int = other.literal_signatures[start_index:].index(literal)
-                # print(f"\tfound_index: {found_index}")
-            except ValueError:
-                # print("False")
-                return False
-            start_index = found_index
-            # print(f"\tstart_index: {start_index}")
-        # print("True")
-        return True
+        return self.keys <= other.keys
 
     @overload
     def __getitem__(self, key: int) -> str: ...
@@ -1,13 +1,15 @@
 from __future__ import annotations
-from typing import Dict, Set, List, FrozenSet, Tuple
+from typing import Dict, Set, List, FrozenSet, Tuple, Union, Callable
 from prudens_core.entities.Literal import Literal
 from prudens_core.entities.Rule import Rule
 from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.ConflictIndex import ConflictIndex
 from prudens_core.parsers.PriorityRelationParser import (
     PriorityRelationParser,
     ParsedPriorityRelation,
 )
 from prudens_core.errors.RuntimeErrors import UnresolvedConflictsError
+from prudens_core.errors.SyntaxErrors import CyclicPriorityError
 import prudens_core.utilities.utils as utils
 
 
@@ -21,6 +23,7 @@ class PriorityRelation:
         "conflict_matrix",
         "default",
         "candidate_conflicts",
+        "dominated",
     )
 
     def __init__(self, priority_str: str, rules: Dict[str, Rule]) -> None:
@@ -35,22 +38,16 @@ class PriorityRelation:
         self.rule_heads: Dict[str, Literal] = {
             rule_name: rule.head for rule_name, rule in rules.items()
         }
-        self.candidate_conflicts: Dict[str, Set[str]] = {
-            rn_1: {
-                rn_2
-                for rn_2, r_2 in rules.items()
-                if r_1.head.name == r_2.head.name and r_1.head.sign != r_2.head.sign
-            }
-            for rn_1, r_1 in rules.items()
-        }
+        self.candidate_conflicts: Dict[str, Set[str]] = self.__get_candidate_conflicts(
+            self.rule_heads
+        )
         self.rule_indices: Dict[str, int] = parsed_priorities.rule_indices
         self.indice_rules: Dict[int, str] = {
             index: name for name, index in self.rule_indices.items()
         }
         self.priorities: Set[Tuple[int]] = parsed_priorities.priorities
         self.default: bool = parsed_priorities.default
-
-    # TODO There are priorities which are incosistent, like R1 > R2 > R1. Catch them and throw errors.
+        self.__compile_priorities()
 
     @classmethod
     def from_dict(cls, init_dict) -> PriorityRelation:
@@ -98,14 +95,7 @@ class PriorityRelation:
                     f"While parsing priority relation from a dict, literal dict {head} in provided rule_heads "
                     "could not be properly parsed to a literal."
                 ) from e
-        pr.candidate_conflicts = {
-            rn_1: {
-                rn_2
-                for rn_2, rh_2 in pr.rule_heads.items()
-                if rh_1.name == rh_2.name and rh_1.sign != rh_2.sign
-            }
-            for rn_1, rh_1 in pr.rule_heads.items()
-        }
+        pr.candidate_conflicts = cls.__get_candidate_conflicts(pr.rule_heads)
         # try:
         #     candidate_conflicts = init_dict["candidate_conflicts"]
         # except KeyError:
@@ -171,8 +161,91 @@ class PriorityRelation:
                     f"Expected input of type 'int' in priority {p} as a second element but received {type(p[1])}."
                 )
             pr.priorities.add(tuple(p))
+        pr.__compile_priorities()
         return pr
 
+    @staticmethod
+    def __get_candidate_conflicts(rule_heads: Dict[str, Literal]) -> Dict[str, Set[str]]:
+        """
+        Rules are grouped by the signatures of their heads, so the candidate conflicts of each rule are the rules whose
+        heads have the opposite sign and otherwise the same signature. These sets are shared by all rules of a group,
+        so memory stays linear in the number of rules, even when many rules have the same head.
+        """
+        groups: Dict[str, Set[str]] = dict()
+        for rule_name, head in rule_heads.items():
+            try:
+                groups[head.signature].add(rule_name)
+            except KeyError:
+                groups[head.signature] = {rule_name}
+        empty: Set[str] = set()
+        candidate_conflicts: Dict[str, Set[str]] = dict()
+        for rule_name, head in rule_heads.items():
+            complement: str = "-" + head.signature if head.sign else head.signature[1:]
+            candidate_conflicts[rule_name] = groups.get(complement, empty)
+        return candidate_conflicts
+
+    def __compile_priorities(self) -> None:
+        """
+        Compiles `self.priorities` into their transitive closure: `self.dominated[i]` is a bitset (i.e., an int) whose
+        bit `j` is set iff the rule with index `i` is, directly or transitively, prior to the rule with index `j`.
+        Rules are sorted topologically (Kahn's algorithm), so cycles, e.g., R1 > R2 > R1, are caught in O(V + E).
+        Default priorities are not compiled, since rule indices are ranks themselves, i.e., later rules are prior.
+        """
+        if self.default:
+            self.dominated: List[int] = []
+            return
+        n: int = max(self.rule_indices.values(), default=-1) + 1
+        lower: List[List[int]] = [[] for _ in range(n)]
+        in_degrees: List[int] = [0] * n
+        for i, j in self.priorities:
+            lower[i].append(j)
+            in_degrees[j] += 1
+        order: List[int] = [i for i in range(n) if in_degrees[i] == 0]
+        for i in order:  # Grows while iterating.
+            for j in lower[i]:
+                in_degrees[j] -= 1
+                if in_degrees[j] == 0:
+                    order.append(j)
+        if len(order) < n:
+            raise CyclicPriorityError(self.__find_cycle(in_degrees))
+        self.dominated = [0] * n
+        for i in reversed(order):
+            dominated: int = 0
+            for j in lower[i]:
+                dominated |= self.dominated[j] | (1 << j)
+            self.dominated[i] = dominated
+
+    def __find_cycle(self, in_degrees: List[int]) -> List[str]:
+        """
+        A cycle among the rules left with positive in-degrees by a topological sort, each of which has such a rule
+        prior to it, so following these backwards eventually closes a cycle.
+        """
+        higher: Dict[int, List[int]] = dict()
+        for i, j in self.priorities:
+            if in_degrees[i] > 0 and in_degrees[j] > 0:
+                try:
+                    higher[j].append(i)
+                except KeyError:
+                    higher[j] = [i]
+        path: List[int] = [next(iter(higher.keys()))]
+        positions: Dict[int, int] = {path[0]: 0}
+        while True:
+            i: int = higher[path[-1]][0]
+            if i in positions.keys():
+                cycle: List[int] = path[positions[i] :] + [i]
+                return [self.indice_rules[x] for x in reversed(cycle)]
+            positions[i] = len(path)
+            path.append(i)
+
+    def is_preferred(self, rule_1: str, rule_2: str) -> bool:
+        """Whether `rule_1` is, directly or transitively, prior to `rule_2`."""
+        return self.__is_preferred(self.rule_indices[rule_1], self.rule_indices[rule_2])
+
+    def __is_preferred(self, ind_1: int, ind_2: int) -> bool:
+        if self.default:
+            return ind_1 > ind_2
+        return (self.dominated[ind_1] >> ind_2) & 1 == 1
+
     def to_dict(self) -> Dict:
         return {
             "original_string": self.original_string,
@@ -183,44 +256,62 @@ class PriorityRelation:
         }
 
     def is_prior(
-        self, rule_1: str, rules: Dict[str, Set[Substitution]], main_sub: Substitution
+        self,
+        rule_1: str,
+        rules: Dict[str, Set[Substitution]],
+        main_sub: Substitution,
+        get_head_instance: Union[None, Callable[[str, Substitution], Literal]] = None,
+        conflicts: Union[None, ConflictIndex] = None,
     ) -> bool:
+        """
+        Head instances are taken from `get_head_instance(rule_name, sub)`, if provided, e.g., to reuse cached ones. If
+        `conflicts` indexes the instances of `rules`, conflicting rules are looked up in it instead of being found by
+        comparing the heads of all their instances.
+        """
         # print("rules_values:", [ str(x) for x in rules.values()])
         # print("rules:", [[str(y) for y in x] for x in rules.values()])
-        target_head = main_sub.apply(self.rule_heads[rule_1])
+        candidates: Set[str] = self.candidate_conflicts[rule_1].intersection(
+            rules.keys()
+        )  # This is better than using `filter()`.
+        if not candidates:
+            return True  # Nothing can conflict with the rule, so there is no need to instantiate its head.
+        if get_head_instance is None:
+            get_head_instance = self.__get_head_instance
+        target_head = get_head_instance(rule_1, main_sub)
         # print(f"\ttarget_head: {target_head}")
+        if conflicts is not None:
+            candidates = candidates.intersection(conflicts.get_conflicting_rules(target_head))
         dilemmas: List[FrozenSet[str]] = []
         ind_1: int = self.rule_indices[rule_1]
         is_prior: bool = True
-        for rule_2 in self.candidate_conflicts[rule_1].intersection(
-            rules.keys()
-        ):  # This is better than using `filter()`.
-            actual_conflict = False
-            for sub in rules[rule_2]:
-                # print(f"sub: {sub}")
-                if target_head.is_conflicting_with(sub.apply(self.rule_heads[rule_2])):
-                # if target_head.is_conflicting_with(head):
-                    actual_conflict = True
-                    break
-            if not actual_conflict:
-                continue
+        for rule_2 in candidates:
+            if conflicts is None:
+                actual_conflict = False
+                for sub in rules[rule_2]:
+                    # print(f"sub: {sub}")
+                    if target_head.is_conflicting_with(get_head_instance(rule_2, sub)):
+                    # if target_head.is_conflicting_with(head):
+                        actual_conflict = True
+                        break
+                if not actual_conflict:
+                    continue
             # print("\tActual conflict")
             ind_2: int = self.rule_indices[rule_2]
             # if self.conflict_matrix[ind_1, ind_2] and not self.priorities[ind_1, ind_2] and not self.priorities[ind_2, ind_1]:
-            if (ind_1, ind_2) not in self.priorities and (
-                ind_2,
-                ind_1,
-            ) not in self.priorities:
+            if not self.__is_preferred(ind_1, ind_2) and not self.__is_preferred(ind_2, ind_1):
                 dilemmas.append(frozenset([rule_1, rule_2]))
                 is_prior = False
                 continue
-            if (ind_1, ind_2) not in self.priorities:
+            if not self.__is_preferred(ind_1, ind_2):
                 return False
                 # You need not use `is_prior = False` and then proceed to dilemmas because any dilemmas will be captured by rule_2.
         if len(dilemmas) > 0:
             raise UnresolvedConflictsError(dilemmas)
         return is_prior
 
+    def __get_head_instance(self, rule_name: str, sub: Substitution) -> Literal:
+        return sub.apply(self.rule_heads[rule_name])
+
     def __str__(self) -> str:
         if self.default:
             return "default"
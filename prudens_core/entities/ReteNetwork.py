@@ -0,0 +1,254 @@
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple, Union, Iterator
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Rule import Rule
+from prudens_core.entities.Context import Context
+from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Budget import Budget
+from prudens_core.errors.RuntimeErrors import DuplicateValueError
+
+
+Token = Tuple[Union[None, Literal], ...]
+
+
+class AlphaMemory:
+    __slots__ = ("signature", "facts", "successors")
+
+    def __init__(self, signature: str) -> None:
+        self.signature: str = signature
+        self.facts: Dict[Literal, None] = dict()  # Used as an ordered set.
+        self.successors: List[JoinNode] = []
+
+
+class JoinNode:
+    """
+    A node of the beta network, corresponding to a body prefix. Each token is keyed by the facts it has matched
+    (`None` for truisms) and maps to the substitution these facts induce.
+    """
+
+    __slots__ = ("literal", "parent", "children", "rules", "tokens", "fact_tokens")
+
+    def __init__(
+        self, literal: Union[None, Literal], parent: Union[None, JoinNode]
+    ) -> None:
+        self.literal: Union[None, Literal] = literal
+        self.parent: Union[None, JoinNode] = parent
+        self.children: List[JoinNode] = []
+        self.rules: List[str] = []
+        self.tokens: Dict[Token, Substitution] = dict()
+        self.fact_tokens: Dict[Literal, Set[Token]] = dict()
+
+
+class ReteNetwork:
+    """
+    A Rete match network compiled from a policy's rules. Alpha memories are keyed by literal signature and join nodes
+    are shared among rules with common body prefixes. The working memory, along with all partial matches, persists
+    between consecutive calls to `run()`, so only the difference between consecutive contexts is propagated.
+    """
+
+    __slots__ = (
+        "rules",
+        "root",
+        "alpha",
+        "signature_nodes",
+        "terminals",
+        "base",
+        "derived",
+        "facts",
+        "_agenda",
+        "_budget",
+    )
+
+    def __init__(self, rules: Dict[str, Rule]) -> None:
+        self.rules: Dict[str, Rule] = rules
+        self.root: JoinNode = JoinNode(None, None)
+        self.root.tokens[()] = Substitution()
+        self.alpha: Dict[str, AlphaMemory] = dict()
+        self.signature_nodes: Dict[str, List[JoinNode]] = dict()
+        self.terminals: List[JoinNode] = []
+        self.base: Context = Context()
+        self.derived: Context = Context()
+        self.facts: Context = Context()
+        self._agenda: List[Tuple[str, Substitution]] = []
+        self._budget: Union[None, Budget] = None  # Only set while running.
+        self.__compile()
+
+    def __compile(self) -> None:
+        prefixes: Dict[Tuple[str, ...], JoinNode] = dict()
+        for rule_name, rule in self.rules.items():
+            node: JoinNode = self.root
+            prefix: Tuple[str, ...] = ()
+            signatures: Set[str] = set()
+            for literal in rule.body:
+                prefix += (str(literal),)
+                if literal.is_truism():
+                    signature: Union[None, str] = None
+                else:
+                    signature = literal.signature
+                    signatures.add(signature)
+                if prefix in prefixes.keys():
+                    node = prefixes[prefix]
+                    continue
+                child: JoinNode = JoinNode(literal, node)
+                node.children.append(child)
+                if signature is not None:
+                    self.__get_alpha(signature).successors.append(child)
+                for s in signatures:
+                    if s not in self.signature_nodes.keys():
+                        self.signature_nodes[s] = [child]
+                    else:
+                        self.signature_nodes[s].append(child)
+                prefixes[prefix] = child
+                node = child
+            if len(node.rules) == 0:
+                self.terminals.append(node)
+            node.rules.append(rule_name)
+        # Truisms under the root match no fact, so they are never activated by `__assert()` and are seeded here.
+        for child in self.root.children:
+            if child.literal.is_truism():
+                self.__add_token(child, (None,), Substitution())
+
+    def __get_alpha(self, signature: str) -> AlphaMemory:
+        try:
+            return self.alpha[signature]
+        except KeyError:
+            alpha: AlphaMemory = AlphaMemory(signature)
+            self.alpha[signature] = alpha
+            return alpha
+
+    def run(self, context: Context, budget: Union[None, Budget] = None) -> int:
+        """
+        Brings the working memory in line with `context` and computes its closure under all rules, returning the
+        number of propagation rounds needed. Each join is charged to `budget`, if provided; if the budget runs out,
+        the network is left in an inconsistent state and should be discarded.
+        """
+        self._budget = budget
+        try:
+            return self.__run(context)
+        finally:
+            self._budget = None
+
+    def __run(self, context: Context) -> int:
+        self.load(context)
+        self._agenda = [
+            (rule_name, sub)
+            for node in self.terminals
+            for rule_name in node.rules
+            for sub in node.tokens.values()
+        ]
+        rounds: int = 0
+        while self._agenda:
+            rounds += 1
+            agenda: List[Tuple[str, Substitution]] = self._agenda
+            self._agenda = []
+            for rule_name, sub in agenda:
+                head: Literal = sub.apply(self.rules[rule_name].head)
+                if head in self.facts:
+                    continue
+                self.facts.add_literal(head)
+                self.derived.add_literal(head)
+                self.__assert(head)
+        return rounds
+
+    def load(self, context: Context) -> None:
+        """Retracts all derived facts along with any facts missing from `context` and asserts all new ones."""
+        for bucket in list(self.derived.facts.values()):
+            for literal in bucket[:]:
+                self.__retract(literal)
+                self.facts.remove_literal(literal)
+        self.derived = Context()
+        for bucket in list(self.base.facts.values()):
+            for literal in bucket[:]:
+                if literal in context:
+                    continue
+                self.__retract(literal)
+                self.base.remove_literal(literal)
+                self.facts.remove_literal(literal)
+        for bucket in context.facts.values():
+            for literal in bucket:
+                if literal in self.base:
+                    continue
+                self.base.add_literal(literal)
+                self.facts.add_literal(literal)
+                self.__assert(literal)
+
+    def matches(self) -> Iterator[Tuple[str, Substitution]]:
+        """All complete matches as (rule name, substitution) pairs."""
+        for node in self.terminals:
+            for rule_name in node.rules:
+                for sub in node.tokens.values():
+                    yield rule_name, sub
+
+    def __assert(self, fact: Literal) -> None:
+        alpha: AlphaMemory = self.__get_alpha(fact.signature)
+        alpha.facts[fact] = None
+        for node in alpha.successors:
+            for key, sub in list(node.parent.tokens.items()):
+                self.__join(node, key, sub, fact)
+
+    def __retract(self, fact: Literal) -> None:
+        try:
+            del self.alpha[fact.signature].facts[fact]
+        except KeyError:
+            return
+        try:
+            nodes: List[JoinNode] = self.signature_nodes[fact.signature]
+        except KeyError:
+            return
+        for node in nodes:
+            try:
+                keys: Set[Token] = node.fact_tokens.pop(fact)
+            except KeyError:
+                continue
+            for key in keys:
+                if node.tokens.pop(key, None) is None:
+                    continue
+                for other in key:
+                    if other is None or other == fact:
+                        continue
+                    try:
+                        node.fact_tokens[other].discard(key)
+                    except KeyError:
+                        pass
+
+    def __join(
+        self, node: JoinNode, key: Token, sub: Substitution, fact: Literal
+    ) -> None:
+        if self._budget is not None:
+            self._budget.spend()
+        extension: Union[None, Substitution] = sub.apply(node.literal).unify(fact)
+        if extension is None:
+            return
+        new_sub: Substitution = sub.copy()
+        try:
+            new_sub.extend(extension)
+        except DuplicateValueError:
+            return
+        self.__add_token(node, key + (fact,), new_sub)
+
+    def __add_token(self, node: JoinNode, key: Token, sub: Substitution) -> None:
+        if key in node.tokens.keys():
+            return
+        node.tokens[key] = sub
+        for fact in key:
+            if fact is None:
+                continue
+            if fact not in node.fact_tokens.keys():
+                node.fact_tokens[fact] = {key}
+            else:
+                node.fact_tokens[fact].add(key)
+        for rule_name in node.rules:
+            self._agenda.append((rule_name, sub))
+        for child in node.children:
+            self.__left_activate(child, key, sub)
+
+    def __left_activate(self, node: JoinNode, key: Token, sub: Substitution) -> None:
+        if node.literal.is_truism():
+            self.__add_token(node, key + (None,), sub)
+            return
+        try:
+            alpha: AlphaMemory = self.alpha[node.literal.signature]
+        except KeyError:
+            return
+        for fact in list(alpha.facts.keys()):
+            self.__join(node, key, sub, fact)
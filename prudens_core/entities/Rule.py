@@ -1,9 +1,13 @@
 from __future__ import annotations
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Union, Set
 from copy import deepcopy
+from math import inf
 from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Variable import Variable
+from prudens_core.entities.Constant import Constant
 from prudens_core.entities.Context import Context
 from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Budget import Budget
 from prudens_core.parsers.RuleParser import RuleParser, ParsedRule
 from prudens_core.errors.RuntimeErrors import (
     LiteralNotInContextError,
@@ -11,9 +15,13 @@ from prudens_core.errors.RuntimeErrors import (
 )
 import prudens_core.utilities.utils as utils
 
+# A mapping of the variables of a rule (by name) to arguments of another rule, along with the indices of the body
+# literals of the latter that the former's body is not mapped to (see `Rule.embed()`).
+Embedding = Tuple[Dict[str, Union[Variable, Constant]], List[int]]
+
 
 class Rule:
-    __slots__ = ("original_string", "name", "body", "head", "signature")
+    __slots__ = ("original_string", "name", "body", "head", "signature", "variables")
 
     def __init__(self, rule_string: str) -> None:
         self.original_string = rule_string
@@ -28,6 +36,7 @@ class Rule:
         )  # TODO Consider splitting body to distinguish between ? and casual predicates.
         self.head: Literal = parsed_rule.head
         self.signature: str = self.__get_signature()
+        self.variables: List[Variable] = self.__get_variables()
 
     @classmethod
     def from_dict(cls, init_dict: Dict) -> Rule:
@@ -101,6 +110,7 @@ class Rule:
             default_value=rule.__get_signature(),
             expected_types=[str],
         )
+        rule.variables = rule.__get_variables()
         return rule
 
     def to_dict(self) -> Dict:
@@ -112,15 +122,143 @@ class Rule:
             "signature": self.signature,
         }
 
-    def trigger(self, context: Context) -> List[Tuple[Literal, Substitution]]:
+    def trigger(
+        self,
+        context: Context,
+        delta: Union[None, Context] = None,
+        budget: Union[None, Budget] = None,
+    ) -> List[Tuple[Literal, Substitution]]:
+        """
+        If `delta` is provided (and is a subset of `context`), only instances that use at least one fact from `delta`
+        are returned (semi-naive evaluation). Each unification step is charged to `budget`, if provided.
+        """
         try:
-            subs: List[Substitution] = self.__unify(context)
+            if delta is None:
+                subs: List[Substitution] = self.__join(context, budget=budget)
+            else:
+                subs: List[Substitution] = self.__unify_delta(context, delta, budget)
             # print("subs in rule.trigger():", [str(x) for x in subs])
         except LiteralNotInContextError as e:
             raise e
         return ((sub.apply(self.head), sub) for sub in subs)
 
-    def is_triggered(self, context: Context, sub: Substitution) -> bool:
+    def trigger_from(
+        self,
+        context: Context,
+        subs: List[Substitution],
+        embedding: Embedding,
+        budget: Union[None, Budget] = None,
+    ) -> Union[None, List[Tuple[Literal, Substitution]]]:
+        """
+        Same as `self.trigger(context)`, given all matches `subs` of the body of a rule that embeds into this one
+        through `embedding` (see `Rule.embed()`). Only the rest of the body is joined, starting from the carried over
+        matches, so bindings that failed for the embedded body are not tried again, e.g., if `bird(X), penguin(X)` has
+        no match with X = bob, `bird(X), penguin(X), flies(X)` does not join `bird(X)` again to find that out. Returns
+        `None` if some match cannot be carried over, e.g., binds variables to variables, or if there are more matches
+        than facts to scan when joining the rest of the body from scratch, which is then likely cheaper. In both cases,
+        the rule has to be triggered as usual.
+        """
+        mapping, rest = embedding
+        scanned: int = sum(
+            context.count_signature(x.signature)
+            for i, x in enumerate(self.body)
+            if i not in rest and not x.is_truism()
+        )
+        if len(subs) > scanned:
+            return None
+        if budget is not None:
+            budget.spend(len(subs))
+        slots: Dict[str, int] = dict()  # The slot of each variable bound through the mapping (by name) in the rows.
+        for target in mapping.values():
+            if isinstance(target, Variable) and target.name not in slots.keys():
+                slots[target.name] = len(slots)
+        rows: List[Tuple[Constant, ...]] = []
+        for sub in subs:
+            if len(sub.sub) != len(mapping) or sub.equivalent_variables:
+                return None
+            values: Dict[str, Constant] = dict()
+            for variable, value in sub.sub.items():
+                if not isinstance(value, Constant):
+                    return None
+                target: Union[Variable, Constant] = mapping[variable.name]
+                if isinstance(target, Constant):
+                    if target != value:
+                        break
+                elif values.setdefault(target.name, value) != value:
+                    break
+            else:
+                rows.append(tuple(values[x] for x in slots.keys()))
+        if not rows:
+            return []
+        order: List[int] = [i for i in self.plan(context, bound=set(slots.keys())) if i in rest]
+        for i in order:
+            if not self.body[i].is_truism() and not context.has_signature(self.body[i]):
+                raise LiteralNotInContextError(self.body[i])
+        matches: Union[None, List[Substitution]] = self.__join_rows(context, order, rows, slots, budget=budget)
+        if matches is None:
+            return None
+        return [(sub.apply(self.head), sub) for sub in matches]
+
+    def embed(self, other: Rule) -> Union[None, Embedding]:
+        """
+        A mapping of the variables of the rule to arguments of `other` under which each body literal of the rule is a
+        distinct body literal of `other`, if any. Then, each match of the body of `other` extends a match of the body
+        of the rule (after mapping), so matches of the latter may be carried over (see `Rule.trigger_from()`).
+        """
+        mapping: Dict[str, Union[Variable, Constant]] = dict()
+        used: List[bool] = [False] * len(other.body)
+        if not self.__embed(other, 0, mapping, used):
+            return None
+        return mapping, [i for i, x in enumerate(used) if not x]
+
+    def __embed(
+        self, other: Rule, k: int, mapping: Dict[str, Union[Variable, Constant]], used: List[bool]
+    ) -> bool:
+        """Extends `mapping` so that body literals `k:` are mapped as well, by backtracking over the candidates."""
+        if k == len(self.body):
+            return True
+        literal: Literal = self.body[k]
+        for i, candidate in enumerate(other.body):
+            if used[i] or candidate.signature != literal.signature:
+                continue
+            added: List[str] = []
+            if self.__map_arguments(literal, candidate, mapping, added):
+                used[i] = True
+                if self.__embed(other, k + 1, mapping, used):
+                    return True
+                used[i] = False
+            for name in added:
+                del mapping[name]
+        return False
+
+    @staticmethod
+    def __map_arguments(
+        literal: Literal,
+        candidate: Literal,
+        mapping: Dict[str, Union[Variable, Constant]],
+        added: List[str],
+    ) -> bool:
+        """Extends `mapping` so that `literal` is mapped to `candidate`, recording new variables in `added`."""
+        for argument, target in zip(literal.arguments, candidate.arguments):
+            if isinstance(argument, Constant):
+                if not isinstance(target, Constant) or argument != target:
+                    return False
+                continue
+            if argument.name not in mapping.keys():
+                mapping[argument.name] = target
+                added.append(argument.name)
+                continue
+            mapped: Union[Variable, Constant] = mapping[argument.name]
+            if isinstance(mapped, Constant):
+                if not isinstance(target, Constant) or mapped != target:
+                    return False
+            elif not isinstance(target, Variable) or mapped.name != target.name:
+                return False
+        return True
+
+    def is_triggered(
+        self, context: Context, sub: Substitution, body_instances: Union[None, List[Literal]] = None
+    ) -> bool:
         # FIXME This method should behave as in the following docstring:
         """
         1. Accept `sub` as an argument, which is the sub with which we want to examine the rule.
@@ -131,12 +269,17 @@ class Rule:
         Implementation:
         1. Either as self.__unify (i.e., copy-pasting code and making any changes where needed);
         2. or add a parameter to self.__unify to pass the desired version of the body (beware of deepcopies etc).
+
+        If provided, `body_instances` are the instances of the body under `sub`, e.g., cached ones.
         """
         # FIXME You should not return true but the output of self.__unify()!!! (???)
         # print(f"Rule name: {self.name}\n\tContext: {context}")
-        body_instance = ( # NOTE This silently assumes that the entire body is grounded (or noty?)
-            sub.apply(literal) for literal in self.body
-        )  # sub.apply() deepcopies, so you are fine!
+        if body_instances is not None:
+            body_instance = body_instances
+        else:
+            body_instance = ( # NOTE This silently assumes that the entire body is grounded (or noty?)
+                sub.apply(literal) for literal in self.body
+            )  # Instances are only read here, so sub.apply() need not copy.
         for fact in body_instance:
             if not context.unifies(fact):
                 return False
@@ -152,6 +295,73 @@ class Rule:
         # # print("\t\tTrue")
         # return bool(unifying_subs)
 
+    def derive(self, context: Context, literal: Literal) -> List[Substitution]:
+        """
+        All substitutions under which the rule is triggered in `context` and infers the (ground) `literal`. These are
+        equal to the ones `trigger()` would produce, i.e., they bind variables in the order they appear in the body.
+        """
+        head_sub: Union[None, Substitution] = self.head.unify(literal)
+        if head_sub is None:
+            return []
+        try:
+            subs: List[Substitution] = self.__unify(
+                context,
+                initial_sub=head_sub,
+                order=self.plan(context, bound={str(x) for x in head_sub.sub.keys()}),
+            )
+        except LiteralNotInContextError:
+            return []
+        derivations: List[Substitution] = []
+        for sub in subs:
+            body_sub: Substitution = Substitution()
+            for body_literal in self.body:
+                for argument in body_literal.arguments:
+                    if (
+                        isinstance(argument, Variable)
+                        and argument in sub.sub.keys()
+                        and argument not in body_sub.sub.keys()
+                    ):
+                        body_sub.extend((argument, sub.sub[argument]))
+            if body_sub.apply(self.head) == literal:
+                derivations.append(body_sub)
+        return derivations
+
+    def external_calls(self, context: Context, evaluated: Set[Literal]) -> List[Literal]:
+        """
+        Instances of external body literals that have to be evaluated for the rule to be triggered in `context`, given
+        that the outcomes of all instances in `evaluated` are already in `context`. Calls are always positive, may
+        contain unbound variables and are considered in body order, so each of them may use the values produced by
+        earlier ones.
+        """
+        externals: List[Literal] = [x for x in self.body if x.is_external]
+        if not externals:
+            return []
+        try:
+            subs: List[Substitution] = self.__unify(
+                context, order=[i for i, x in enumerate(self.body) if not x.is_external]
+            )
+        except LiteralNotInContextError:
+            return []
+        calls: Dict[Literal, None] = dict()  # Used as an ordered set.
+        for i, literal in enumerate(self.body):
+            if not literal.is_external:
+                continue
+            extended_subs: List[Substitution] = []
+            for sub in subs:
+                call: Literal = sub.apply(literal)
+                if not call.sign:
+                    call = deepcopy(call)
+                    call.sign = True
+                if call not in evaluated:
+                    calls[call] = None
+                    continue
+                try:
+                    extended_subs += self.__unify(context, initial_sub=sub, order=[i])
+                except LiteralNotInContextError:
+                    pass
+            subs = extended_subs
+        return list(calls.keys())
+
     def instantiate(self, sub: Substitution) -> Rule:
         instance: Rule = Rule(self.original_string)
         for literal in instance.body:
@@ -177,45 +387,314 @@ class Rule:
         body_signature: str = "|".join(sorted([x.signature for x in self.body]))
         return body_signature
 
+    def __get_variables(self) -> List[Variable]:
+        """All body variables, in the order they first appear."""
+        variables: List[Variable] = []
+        names: Set[str] = set()
+        for literal in self.body:
+            for argument in literal.arguments:
+                if isinstance(argument, Variable) and argument.name not in names:
+                    names.add(argument.name)
+                    variables.append(argument)
+        return variables
+
+    def plan(
+        self,
+        context: Context,
+        delta: Union[None, Context] = None,
+        delta_index: int = -1,
+        bound: Union[None, Set[str]] = None,
+    ) -> List[int]:
+        """
+        The order in which body literals are joined, as a list of body indices. The literal joined against `delta` (if
+        any) goes first and then, greedily, the literal with the fewest expected matches, given the size of its bucket
+        in `context` and how many of its arguments are constants or variables already bound (initially, the names in
+        `bound`). Literals without facts go first, so that joins fail as early as possible, while external literals go
+        right after all their variables are bound. Ties are broken in body order.
+        """
+        n: int = len(self.body)
+        if n < 2:
+            return list(range(n))
+        bound = set() if bound is None else set(bound)
+        remaining: List[int] = list(range(n))
+        order: List[int] = []
+        if delta_index > -1:
+            remaining.remove(delta_index)
+            order.append(delta_index)
+            bound.update(
+                x.name for x in self.body[delta_index].arguments if isinstance(x, Variable)
+            )
+        while remaining:
+            best: int = min(
+                remaining, key=lambda i: self.__estimate(self.body[i], context, bound)
+            )
+            remaining.remove(best)
+            order.append(best)
+            bound.update(x.name for x in self.body[best].arguments if isinstance(x, Variable))
+        return order
+
+    @staticmethod
+    def __estimate(literal: Literal, context: Context, bound: Set[str]) -> float:
+        if literal.is_truism():
+            return 0.0
+        size: int = context.count_signature(literal.signature)
+        if size == 0:
+            return -1.0
+        bound_arguments: int = sum(
+            1 for x in literal.arguments if isinstance(x, Constant) or x.name in bound
+        )
+        if literal.is_external:
+            return 0.0 if bound_arguments == len(literal.arguments) else inf
+        return size * 0.1**bound_arguments
 
-    def __unify(self, context: Context) -> List[Substitution]:
-        # initial_sub: Substitution = Substitution()
-        current_subs: List[Substitution] = [Substitution()]
-        # print("current_subs:", [str(x) for x in current_subs])
-        # print("=" * 40)
+    def __canonical(self, sub: Substitution) -> Substitution:
+        """The same substitution, binding variables in the order they appear in the body, as when joined in order."""
+        canonical: Substitution = Substitution()
+        for variable in self.variables:
+            if variable in sub.sub.keys():
+                canonical.sub[variable] = sub.sub[variable]
+        for variable, value in sub.sub.items():
+            if variable not in canonical.sub.keys():
+                canonical.sub[variable] = value
+        canonical.equivalent_variables = sub.equivalent_variables
+        return canonical
+
+
+    def __unify_delta(
+        self, context: Context, delta: Context, budget: Union[None, Budget] = None
+    ) -> List[Substitution]:
+        """
+        The i-th pass joins body literal i against `delta`, all literals before it against `context` minus `delta`
+        and all literals after it against `context`, so each new instance is produced by exactly one pass.
+        """
         for literal in self.body:
-            new_subs: List[Substitution] = []  # FIXME This needs to be a set!
-            while current_subs:
-                sub: Substitution = current_subs.pop()
-                # print("sub before extension:", sub)
-                instance: Literal = sub.apply(literal)
-                # print("instance:", instance)
-                try:
-                    extensions: List[Substitution] = context.unify(instance)
-                    # print("extensions:", [str(x) for x in extensions])
-                except LiteralNotInContextError as e:
-                    raise e
-                # new_subs: List[Substitution] = []
-                for extension in extensions:
-                    copy_sub: Substitution = (
-                        deepcopy(sub) if len(extensions) > 1 else sub
-                    )  # No need to deepcopy for a single extension
-                    try:
-                        copy_sub.extend(extension)
-                        new_subs.append(copy_sub)
-                    except DuplicateValueError:
-                        pass
-                # print("new_subs:", [str(x) for x in new_subs])
-                # print("current_subs:", [str(x) for x in current_subs])
-            if new_subs:
-                current_subs = new_subs  # [:]
-                # print([str(x) for x in new_instances])
-                # print("EXTENDED current_subs:", [str(x) for x in current_subs])
+            if not context.has_signature(literal):
+                raise LiteralNotInContextError(literal)
+        subs: List[Substitution] = []
+        for i, literal in enumerate(self.body):
+            if literal.is_truism() or not delta.has_signature(literal):
+                continue
+            subs += self.__join(context, delta, i, budget)
+        return subs
+
+    def __join(
+        self,
+        context: Context,
+        delta: Union[None, Context] = None,
+        delta_index: int = -1,
+        budget: Union[None, Budget] = None,
+    ) -> List[Substitution]:
+        """
+        Same as `self.__unify()` in planned order, but set-at-a-time: each body literal is joined with all partial
+        bindings at once, by hashing the facts of its bucket on the values of the variables it shares with them and
+        probing that table with each binding. Bindings are kept as tuples, with a slot for each variable bound so far,
+        so extending one only copies a small tuple. Falls back to `self.__unify()` if some fact is not ground.
+        """
+        order: List[int] = self.plan(context, delta, delta_index)
+        subs: Union[None, List[Substitution]] = self.__join_rows(
+            context, order, [()], dict(), delta, delta_index, budget
+        )
+        if subs is None:
+            return self.__unify(context, delta, delta_index, budget=budget, order=order)
+        return subs
+
+    def __join_rows(
+        self,
+        context: Context,
+        order: List[int],
+        rows: List[Tuple[Constant, ...]],
+        slots: Dict[str, int],
+        delta: Union[None, Context] = None,
+        delta_index: int = -1,
+        budget: Union[None, Budget] = None,
+    ) -> Union[None, List[Substitution]]:
+        """
+        Joins the body literals in `order` with the partial bindings in `rows`, where `slots` holds the slot of each
+        bound variable (by name), which all body variables should have in the end. If there are fewer bindings than
+        facts to join them with, each binding probes the argument indexes of the context (see `Context.lookup()`), so
+        a small delta costs time proportional to its matches; otherwise, the facts are hashed into a table, which costs
+        no more than the bindings probing it. Returns `None` if some fact is not ground. Each fact hashed, each binding
+        probed or emitted and each substitution built costs one operation of `budget`.
+        """
+        slots = dict(slots)
+        for i in order:
+            literal: Literal = self.body[i]
+            if literal.is_truism():
+                continue
+            if i == delta_index:
+                source: Context = delta
+            elif not context.has_signature(literal):
+                raise LiteralNotInContextError(literal)
+            else:
+                source = context
+            if not source.is_ground_signature(literal.signature):
+                return None
+            key_positions: List[int] = []
+            key_slots: List[int] = []
+            new_positions: Dict[str, int] = dict()  # The first position of each variable bound by this literal.
+            checks: List[Tuple[int, Union[int, Constant]]] = []  # Position equal to constant or other position.
+            for j, argument in enumerate(literal.arguments):
+                if isinstance(argument, Constant):
+                    checks.append((j, argument))
+                elif argument.name in slots.keys():
+                    key_positions.append(j)
+                    key_slots.append(slots[argument.name])
+                elif argument.name in new_positions.keys():
+                    checks.append((j, new_positions[argument.name]))
+                else:
+                    new_positions[argument.name] = j
+            if (
+                i != delta_index
+                and (key_positions or any(isinstance(x, Constant) for _, x in checks))
+                and len(rows) < context.count_signature(literal.signature)
+            ):
+                new_rows: List[Tuple[Constant, ...]] = self.__probe_rows(
+                    context, literal, rows, key_positions, key_slots, new_positions, checks,
+                    delta if i < delta_index else None, budget,
+                )
             else:
+                if i == delta_index:
+                    facts: List[Literal] = delta.get_bucket(literal.signature)
+                elif i < delta_index:
+                    facts = [x for x in context.get_bucket(literal.signature) if x not in delta]
+                else:
+                    facts = context.get_bucket(literal.signature)
+                if budget is not None:
+                    budget.spend(len(facts))
+                table: Dict[Tuple, List[Tuple]] = dict()
+                for fact in facts:
+                    arguments = fact.arguments
+                    if checks and any(
+                        arguments[j] != (arguments[x] if isinstance(x, int) else x)
+                        for j, x in checks
+                    ):
+                        continue
+                    key: Tuple = tuple(arguments[j] for j in key_positions)
+                    values: Tuple = tuple(arguments[j] for j in new_positions.values())
+                    if key in table.keys():
+                        table[key].append(values)
+                    else:
+                        table[key] = [values]
+                new_rows = []
+                for row in rows:
+                    matches: List[Tuple] = table.get(tuple(row[x] for x in key_slots), [])
+                    if budget is not None:
+                        budget.spend(1 + len(matches))
+                    for values in matches:
+                        new_rows.append(row + values)
+            if not new_rows:
                 return []
-        # print("OUTSIDE of while:", [str(x) for x in  current_subs])
+            rows = new_rows
+            for name in new_positions.keys():
+                slots[name] = len(slots)
+        permutation: List[int] = [slots[x.name] for x in self.variables]
+        subs: List[Substitution] = []
+        for row in rows:
+            if budget is not None:
+                budget.spend()
+            subs.append(Substitution.from_values(self.variables, [row[x] for x in permutation]))
+        return subs
+
+    @staticmethod
+    def __probe_rows(
+        context: Context,
+        literal: Literal,
+        rows: List[Tuple[Constant, ...]],
+        key_positions: List[int],
+        key_slots: List[int],
+        new_positions: Dict[str, int],
+        checks: List[Tuple[int, Union[int, Constant]]],
+        exclude: Union[None, Context],
+        budget: Union[None, Budget],
+    ) -> List[Tuple[Constant, ...]]:
+        """The extensions of `rows` by the facts of `context` (minus `exclude`) that match `literal`, row by row."""
+        keys: List[Tuple[int, int]] = list(zip(key_positions, key_slots))
+        probe: List[Union[Variable, Constant]] = list(literal.arguments)
+        new_rows: List[Tuple[Constant, ...]] = []
+        for row in rows:
+            for j, x in keys:
+                probe[j] = row[x]
+            candidates: List[Literal] = context.lookup(literal.signature, probe)
+            if budget is not None:
+                budget.spend(1 + len(candidates))
+            for fact in candidates:
+                arguments = fact.arguments
+                if any(arguments[j] != row[x] for j, x in keys):
+                    continue
+                if checks and any(
+                    arguments[j] != (arguments[x] if isinstance(x, int) else x) for j, x in checks
+                ):
+                    continue
+                if exclude is not None and fact in exclude:
+                    continue
+                new_rows.append(row + tuple(arguments[j] for j in new_positions.values()))
+        return new_rows
+
+    def __unify(
+        self,
+        context: Context,
+        delta: Union[None, Context] = None,
+        delta_index: int = -1,
+        initial_sub: Union[None, Substitution] = None,
+        budget: Union[None, Budget] = None,
+        order: Union[None, List[int]] = None,
+    ) -> List[Substitution]:
+        """
+        Body literals are joined in the provided `order` (by default, body order), or only these if it is partial. The
+        search is depth-first over a single substitution, which is extended in place and reverted through its undo log
+        when backtracking, so it is only copied once per complete match.
+        """
+        sub: Substitution = initial_sub.copy() if initial_sub is not None else Substitution()
+        current_subs: List[Substitution] = []
+        self.__search(
+            context,
+            delta,
+            delta_index,
+            sub,
+            list(range(len(self.body))) if order is None else order,
+            0,
+            budget,
+            current_subs,
+        )
+        if order is not None and order != sorted(order):
+            return [self.__canonical(sub) for sub in current_subs]
         return current_subs
 
+    def __search(
+        self,
+        context: Context,
+        delta: Union[None, Context],
+        delta_index: int,
+        sub: Substitution,
+        order: List[int],
+        k: int,
+        budget: Union[None, Budget],
+        subs: List[Substitution],
+    ) -> None:
+        """Appends to `subs` all extensions of `sub` that unify the body literals `order[k:]`, leaving `sub` as is."""
+        if k == len(order):
+            subs.append(sub.copy())
+            return
+        i: int = order[k]
+        if budget is not None:
+            budget.spend()
+        instance: Literal = sub.apply(self.body[i])
+        if i == delta_index:
+            extensions: List[Substitution] = delta.unify(instance)
+        elif i < delta_index:
+            extensions = context.unify(instance, exclude=delta)
+        else:
+            extensions = context.unify(instance)
+        for extension in extensions:
+            mark: int = sub.mark()
+            try:
+                sub.extend(extension)
+            except DuplicateValueError:
+                sub.undo(mark)
+                continue
+            self.__search(context, delta, delta_index, sub, order, k + 1, budget, subs)
+            sub.undo(mark)
+
     def __str__(self) -> str:
         rule_str: str = self.name + " :: "
         n: int = len(self.body)
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Union, Dict, Set, Tuple, TYPE_CHECKING
+from typing import Union, Dict, Set, Tuple, List, Sequence, TYPE_CHECKING
 # import itertools as it
 from copy import deepcopy
 from prudens_core.entities.Constant import Constant
@@ -15,22 +15,85 @@ if TYPE_CHECKING:
 
 
 class Substitution:
-    __slots__ = ("sub", "equivalent_variables")
+    """
+    Variables bound to constants are kept in `self.sub`, while variables bound to each other are kept in a union-find
+    structure (with union by size and path compression), whose classes are exposed as `self.equivalent_variables`.
+    Once any variable of a class is bound to a constant, so are all others. All changes after `self.mark()` are
+    logged, so that `self.undo()` can revert them, e.g., when backtracking during unification. Hashes are cached, so
+    `self.sub` should only be modified through `self.extend()` once the substitution has been hashed.
+    """
+
+    __slots__ = ("sub", "_parent", "_members", "_log", "_hash")
 
     def __init__(self, other: Union[None, Substitution] = None) -> None:
-        # The two dicts (should) have at any time disjoint sets of keys.
+        # No variable is both bound to a constant and in an unbound class.
         if other == None:
             self.sub: Dict[Variable, Constant] = (
                 dict()
             )  # FIXME Why is this both Variable and Constant?
-            self.equivalent_variables: Dict[Variable, Set[Variable]] = dict()
+            self._parent: Dict[Variable, Variable] = dict()  # Roots are their own parents.
+            self._members: Dict[Variable, List[Variable]] = dict()  # Only up to date for roots.
         else:
             self.sub: Dict[Variable, Union[Variable, Constant]] = other.sub
-            self.equivalent_variables: Dict[Variable, Set[Variable]] = (other.equivalent_variables)
+            self._parent: Dict[Variable, Variable] = other._parent
+            self._members: Dict[Variable, List[Variable]] = other._members
+        self._log: Union[None, List[Tuple]] = None
+        self._hash: Union[None, int] = None
 
     @classmethod
-    def from_dict(cls, init_dict) -> Variable:
+    def from_values(
+        cls, variables: Sequence[Variable], values: Sequence[Union[Variable, Constant]]
+    ) -> Substitution:
+        """
+        The substitution binding the i-th of `variables` (e.g., a rule's variables, as numbered by `Rule.variables`)
+        to the i-th of `values`, as produced by joins that keep bindings in fixed-length tuples.
+        """
         sub = cls.__new__(cls)
+        sub.sub = dict(zip(variables, values))
+        sub._parent = dict()
+        sub._members = dict()
+        sub._log = None
+        sub._hash = None
+        return sub
+
+    def copy(self) -> Substitution:
+        """A copy that may be extended independently, e.g., for each branch of a unification."""
+        copycat = Substitution.__new__(Substitution)
+        copycat.sub = self.sub.copy()
+        if self._parent:
+            copycat._parent = self._parent.copy()
+            copycat._members = {k: v[:] for k, v in self._members.items()}
+        else:
+            copycat._parent = dict()
+            copycat._members = dict()
+        copycat._log = None
+        copycat._hash = self._hash
+        return copycat
+
+    @property
+    def equivalent_variables(self) -> Dict[Variable, Set[Variable]]:
+        """Each variable bound to other variables (but not to a constant), mapped to its class, itself included."""
+        classes: Dict[Variable, Set[Variable]] = dict()
+        for variable, parent in self._parent.items():
+            if parent.name != variable.name or variable in self.sub.keys():
+                continue
+            members: Set[Variable] = set(self._members[variable])
+            for member in members:
+                classes[member] = members
+        return classes
+
+    @equivalent_variables.setter
+    def equivalent_variables(self, equivalent_variables: Dict[Variable, Set[Variable]]) -> None:
+        self._parent = dict()
+        self._members = dict()
+        self._hash = None
+        for variable, members in equivalent_variables.items():
+            for member in members:
+                self.__union(variable, member)
+
+    @classmethod
+    def from_dict(cls, init_dict) -> Variable:
+        sub = cls()
         try:
             sub_dict = init_dict["sub"]
         except KeyError:
@@ -74,7 +137,7 @@ class Substitution:
             raise TypeError(
                 f"Expected input of type 'dict' for Substitution.equivalent_variables but received {type(ev_dict)}."
             )
-        sub.equivalent_variables = dict()
+        equivalent_variables: Dict[Variable, Set[Variable]] = dict()
         for v, vs in ev_dict.items():
             if type(v) != str:
                 raise TypeError(
@@ -99,31 +162,38 @@ class Substitution:
                         f"While parsing substitution from a dict, constant {c} could not be properly parsed."
                     ) from e
                 ev_set.add(eq_var)
-            sub.equivalent_variables[variable] = ev_set
+            equivalent_variables[variable] = ev_set
+        sub.equivalent_variables = equivalent_variables
         return sub
 
     def to_dict(self) -> Dict:
         return {
             "sub": {str(k): v.to_dict() for k, v in self.sub.items()},
             "equivalent_variables": {
-                str(k): [v.to_dict() for v in vs] for k, vs in self.equivalent_variables
+                str(k): [v.to_dict() for v in vs] for k, vs in self.equivalent_variables.items()
             },
         }
 
     def is_propositional(self) -> bool:
-        return len(self.sub) == 0 and len(self.equivalent_variables) == 0
+        return len(self.sub) == 0 and len(self._parent) == 0
 
     def apply(self, literal: Literal) -> Literal:
+        """
+        The instance of `literal` under the substitution, built from its arguments without copying the literal as a
+        whole. If nothing is substituted, this is `literal` itself, so instances should not be modified in place.
+        """
         if self.is_propositional():
             return literal
-        instance: Literal = deepcopy(literal)
-        for i, argument in enumerate(instance.arguments):
-            if isinstance(argument, Variable):
-                try:
-                    instance.arguments[i] = self.sub[argument]
-                except KeyError:
-                    pass
-        return instance
+        sub: Dict[Variable, Constant] = self.sub
+        substituted: bool = False
+        arguments: List[Union[Variable, Constant]] = []
+        for argument in literal.arguments:
+            if isinstance(argument, Variable) and argument in sub:
+                arguments.append(sub[argument])
+                substituted = True
+            else:
+                arguments.append(argument)
+        return literal.with_arguments(arguments) if substituted else literal
 
     # def __apply(self, variable: Variable) -> Union[Constant, Variable]:
     #     """
@@ -145,13 +215,34 @@ class Substitution:
                 self.__extend(variable, value)
             except DuplicateValueError as e:
                 raise e
-        for var1, vars in other.equivalent_variables.items():
-            for var2 in vars:
+        for variable, parent in other._parent.items():
+            if parent.name != variable.name:
                 try:
-                    self.__extend(var1, var2)
+                    self.__extend(variable, parent)
                 except DuplicateValueError as e:
                     raise e
 
+    def mark(self) -> int:
+        """A point to revert to through `self.undo()`; changes are only logged from the first mark on."""
+        if self._log is None:
+            self._log = []
+        return len(self._log)
+
+    def undo(self, mark: int) -> None:
+        """Reverts all changes since `mark` was returned by `self.mark()`."""
+        self._hash = None
+        while len(self._log) > mark:
+            entry: Tuple = self._log.pop()
+            if entry[0] == 0:  # Bound to a constant.
+                del self.sub[entry[1]]
+            elif entry[0] == 1:  # Parent changed.
+                self._parent[entry[1]] = entry[2]
+            elif entry[0] == 2:  # Members added.
+                del self._members[entry[1]][entry[2] :]
+            else:  # Added to the union-find structure.
+                del self._parent[entry[1]]
+                del self._members[entry[1]]
+
     def __extend(self, variable: Variable, value: Union[Variable, Constant]) -> None:
         # Consider returning the new sub (is this OO, though?)
         # Extend self.sub by variable: value and raise relevant errors when needed (e.g., inconsistent extension)
@@ -164,32 +255,63 @@ class Substitution:
             self.__extend_by_variable(variable, value)
 
     def __extend_by_constant(self, variable: Variable, value: Constant) -> None:
-        if variable in self.equivalent_variables.keys():
-            for v in self.equivalent_variables[variable]:
-                self.sub[v] = value
-            del self.equivalent_variables[variable]
-        elif variable not in self.sub.keys():
-            self.sub[variable] = value
-        elif self.sub[variable] != value:
-            raise DuplicateValueError(variable, self.sub[variable], value)
+        if variable in self.sub.keys():
+            if self.sub[variable] != value:
+                raise DuplicateValueError(variable, self.sub[variable], value)
+        elif variable in self._parent.keys():
+            for member in self._members[self.__find(variable)]:
+                self.__bind(member, value)
+        else:
+            self.__bind(variable, value)
 
     def __extend_by_variable(self, variable: Variable, value: Variable) -> None:
-        # print(f"self.sub: {self.sub}\n\tvalue: {value},\n\ttype(value): {type(value)}")
         if variable in self.sub.keys():
-            self.extend_by_constant(value, self.sub[variable])
+            self.__extend_by_constant(value, self.sub[variable])
         elif value in self.sub.keys():
-            self.extend_by_constant(variable, self.sub[value])
-        elif variable in self.equivalent_variables.keys():
-            self.equivalent_variables[variable].add(value)
-            for var in self.equivalent_variables[variable]:
-                self.equivalent_variables[var] = self.equivalent_variables[variable]
-        elif value in self.equivalent_variables.keys():
-            self.equivalent_variables[value].add(variable)
-            for var in self.equivalent_variables[value].add(variable):
-                self.equivalent_variables[var] = self.equivalent_variables[value]
+            self.__extend_by_constant(variable, self.sub[value])
         else:
-            self.equivalent_variables[variable] = {variable, value}
-            self.equivalent_variables[value] = {value, variable}
+            self.__union(variable, value)
+
+    def __bind(self, variable: Variable, value: Constant) -> None:
+        self.sub[variable] = value
+        self._hash = None
+        if self._log is not None:
+            self._log.append((0, variable))
+
+    def __find(self, variable: Variable) -> Variable:
+        """The root of the class of `variable`, which is added as a class of its own if it is not there yet."""
+        if variable not in self._parent.keys():
+            self._parent[variable] = variable
+            self._members[variable] = [variable]
+            self._hash = None
+            if self._log is not None:
+                self._log.append((3, variable))
+            return variable
+        root: Variable = variable
+        while self._parent[root].name != root.name:
+            root = self._parent[root]
+        while variable.name != root.name:  # Path compression.
+            parent: Variable = self._parent[variable]
+            if parent.name != root.name:
+                self._parent[variable] = root
+                if self._log is not None:
+                    self._log.append((1, variable, parent))
+            variable = parent
+        return root
+
+    def __union(self, variable: Variable, other: Variable) -> None:
+        root: Variable = self.__find(variable)
+        other_root: Variable = self.__find(other)
+        if root.name == other_root.name:
+            return
+        if len(self._members[root]) < len(self._members[other_root]):
+            root, other_root = other_root, root
+        self._parent[other_root] = root
+        self._hash = None
+        if self._log is not None:
+            self._log.append((1, other_root, other_root))
+            self._log.append((2, root, len(self._members[root])))
+        self._members[root].extend(self._members[other_root])
 
     def to_code(self) -> str:
         code_string: str = ""
@@ -214,22 +336,30 @@ class Substitution:
         return sub_str.strip()
 
     def __deepcopy__(self, memodict={}) -> Substitution:
-        copycat: Substitution = Substitution()
-        copycat.sub = {k: v for k, v in self.sub.items()}
-        copycat.equivalent_variables = {k: v for k, v in self.equivalent_variables.items()}
-        return copycat
+        return self.copy()
 
     def __eq__(self, other: Substitution) -> bool:
         if not isinstance(other, Substitution):
             return False
         if self.is_propositional() and other.is_propositional():
             return True
-        return (
-            self.sub == other.sub
-            and self.equivalent_variables == other.equivalent_variables
-        )
+        if self.sub != other.sub:
+            return False
+        if not self._parent and not other._parent:
+            return True
+        return self.equivalent_variables == other.equivalent_variables
 
     def __hash__(self) -> int:
-        return hash(self.__str__())
-
-    # FIXME To be fixed according to __eq__()
+        """Structural, i.e., independent of the order of bindings, as `self.__eq__()` is."""
+        if self._hash is not None:
+            return self._hash
+        if not self._parent:
+            self._hash = hash(frozenset(self.sub.items()))
+        else:
+            self._hash = hash(
+                (
+                    frozenset(self.sub.items()),
+                    frozenset(frozenset(x) for x in self.equivalent_variables.values()),
+                )
+            )
+        return self._hash
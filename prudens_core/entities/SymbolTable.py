@@ -0,0 +1,68 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple, Union
+from copy import deepcopy
+import threading
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+
+Fact = Tuple[int, Tuple[int, ...]]  # The code of a ground literal's signature and the codes of its arguments.
+
+
+class SymbolTable:
+    """
+    Maps symbols, i.e., predicate signatures and constants, to small consecutive ints and back, so that ground literals
+    may be encoded as tuples of ints (see `EncodedContext`). Symbols are only ever added, so codes never change during
+    the lifetime of a table, which may be shared among threads. Hence, the table of a policy keeps growing with every
+    constant of every context it has ever encoded, so a long-lived policy inferring over contexts with ever new
+    constants holds on to all of them.
+    """
+
+    __slots__ = ("_codes", "_symbols", "_templates", "_lock")
+
+    def __init__(self) -> None:
+        self._codes: Dict[Union[str, Constant], int] = dict()
+        self._symbols: List[Union[str, Constant]] = []
+        self._templates: Dict[int, Literal] = dict()  # Argument-less literals, by the codes of their signatures.
+        self._lock: threading.Lock = threading.Lock()
+
+    def encode(self, symbol: Union[str, Constant]) -> int:
+        try:
+            return self._codes[symbol]
+        except KeyError:
+            pass
+        with self._lock:
+            if symbol not in self._codes.keys():  # Another thread may have added it in the meantime.
+                self._symbols.append(symbol)
+                self._codes[symbol] = len(self._symbols) - 1
+        return self._codes[symbol]
+
+    def decode(self, code: int) -> Union[str, Constant]:
+        return self._symbols[code]
+
+    def encode_signature(self, literal: Literal) -> int:
+        code: int = self.encode(literal.signature)
+        if code not in self._templates.keys():
+            template: Literal = deepcopy(literal)
+            template.arguments = []
+            template.original_string = ""
+            self._templates[code] = template
+        return code
+
+    def encode_literal(self, literal: Literal) -> Fact:
+        arguments: List[int] = []
+        for argument in literal.arguments:
+            if isinstance(argument, Variable):
+                raise ValueError(f"Only ground literals may be encoded, but {literal} is not ground.")
+            arguments.append(self.encode(argument))
+        return self.encode_signature(literal), tuple(arguments)
+
+    def decode_literal(self, fact: Fact) -> Literal:
+        """
+        The interned literal `fact` stands for, which is shared with all contexts and policies and so is returned as
+        is, with a string of its own (see `Literal.with_arguments()`).
+        """
+        return self._templates[fact[0]].with_arguments([self._symbols[x] for x in fact[1]])
+
+    def __len__(self) -> int:
+        return len(self._symbols)
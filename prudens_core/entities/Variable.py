@@ -1,4 +1,5 @@
 from __future__ import annotations
+import weakref
 from typing import Union, Dict, TYPE_CHECKING
 from types import CodeType
 
@@ -23,7 +24,10 @@ import prudens_core.utilities.utils as utils
 
 
 class Variable:  # TODO Consider adding fields about the (rule), literal and position of the variable.
-    __slots__ = ("original_string", "name", "type", "code")
+    __slots__ = ("original_string", "name", "type", "code", "__weakref__")
+
+    # Variables in use, by their string representation, so that repeated variables share a single object.
+    _interned: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
 
     def __init__(self, variable_string: str) -> None:
         parser: VariableParser = VariableParser(variable_string)
@@ -36,6 +40,14 @@ class Variable:  # TODO Consider adding fields about the (rule), literal and pos
         self.type: VariableType = parsed_variable.type
         self.code: Union[None, CodeType] = parsed_variable.code
 
+    @classmethod
+    def interned(cls, variable_string: str) -> Variable:
+        """The shared instance of the variable `variable_string` stands for; variables are never modified in place."""
+        try:
+            return cls._interned[variable_string]
+        except KeyError:
+            return cls._interned.setdefault(variable_string, cls(variable_string))
+
     @classmethod
     def from_dict(cls, init_dict: Dict) -> Variable:
         variable = cls.__new__(cls)
@@ -144,3 +144,51 @@ class UnresolvedConflictsError(PrudensRuntimeError):
             + " has not been resolved.",
             *args,
         )
+
+
+class InvalidEngineError(PrudensRuntimeError):
+    """Available engines are 'interpreter', 'compiled', 'encoded', 'columnar' and 'rete'."""
+
+    __slots__ = "engine"
+
+    def __init__(self, engine: str, *args: object) -> None:
+        self.engine: str = engine
+        super(InvalidEngineError, self).__init__(
+            "Unknown inference engine '" + self.engine + "'. " + self.__doc__, *args
+        )
+
+
+class ExternalPredicateNotFoundError(PrudensRuntimeError):
+    """External predicates should be provided along with the context they are evaluated in."""
+
+    __slots__ = "name"
+
+    def __init__(self, name: str, *args: object) -> None:
+        self.name: str = name
+        super(ExternalPredicateNotFoundError, self).__init__(
+            "No evaluation provided for external predicate ?" + self.name + ". " + self.__doc__, *args
+        )
+
+
+class BudgetExhaustedError(PrudensRuntimeError):
+    """Inference was interrupted before completion."""
+
+    __slots__ = "reason"
+
+    def __init__(self, reason: str, *args: object) -> None:
+        self.reason: str = reason
+        super(BudgetExhaustedError, self).__init__(
+            self.__doc__ + " Reason: " + self.reason + ".", *args
+        )
+
+
+class MissingDependencyError(PrudensRuntimeError):
+    """This functionality relies on an optional package, which has to be installed separately."""
+
+    __slots__ = "package"
+
+    def __init__(self, package: str, *args: object) -> None:
+        self.package: str = package
+        super(MissingDependencyError, self).__init__(
+            "Package '" + self.package + "' is not installed. " + self.__doc__, *args
+        )
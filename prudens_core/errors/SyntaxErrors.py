@@ -170,6 +170,18 @@ class MalformedPriorityError(PrudensSyntaxError):
         )
 
 
+class CyclicPriorityError(PrudensSyntaxError):
+    """Priorities should be acyclic, as a rule cannot be, even transitively, prior to itself."""
+
+    __slots__ = "cycle"
+
+    def __init__(self, cycle: list, *args: object) -> None:
+        self.cycle: list = cycle
+        super(CyclicPriorityError, self).__init__(
+            "Cyclic priorities " + " > ".join(self.cycle) + ". " + self.__doc__, *args
+        )
+
+
 class EmptyContextError(PrudensSyntaxError):
     """A context should contain at least one literal."""
 
@@ -18,7 +18,7 @@ class ContextParser:
             if literal_str == "":
                 continue
             try:
-                literal: Literal = Literal(literal_str)
+                literal: Literal = Literal.interned(literal_str)
             except PrudensSyntaxError as e:
                 raise e
             literals.append(literal)
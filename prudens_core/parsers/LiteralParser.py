@@ -91,12 +91,12 @@ class LiteralParser:
                     r"[a-z0-9]", arg[0]
                 ):  # FIXME This ignores cases such as `1 + X`.
                     try:
-                        arg_obj: Constant = Constant(arg)
+                        arg_obj: Constant = Constant.interned(arg)
                     except PrudensSyntaxError as e:
                         raise e
                 else:
                     try:
-                        arg_obj: Variable = Variable(arg)
+                        arg_obj: Variable = Variable.interned(arg)
                     except PrudensSyntaxError as e:
                         raise e
                 predicate_arguments.append(arg_obj)
@@ -37,12 +37,8 @@ class PriorityRelationParser:  # FIXME Check that all names appearing in priorit
         rule_names: List[str] = list(self.rules.keys())
         rule_indices: Dict[str, int] = {rule_names[i]: i for i in range(n)}
         if self.priority_str == "default":
-            default_priorities: Set[Tuple[int]] = self.__generate_default_priorities(
-                rule_names
-            )
-            return ParsedPriorityRelation(
-                rule_indices, default_priorities, default=True
-            )
+            # Later rules are prior to earlier ones, so rule indices act as ranks and no pairs need to be generated.
+            return ParsedPriorityRelation(rule_indices, set(), default=True)
         priorities: List[str] = self.priority_str.split(";")
         if len(priorities) == 1:
             raise MissingDelimiterError(";")
@@ -62,11 +58,10 @@ class PriorityRelationParser:  # FIXME Check that all names appearing in priorit
             except KeyError:
                 raise ReferenceError(parsed_priority[1])
             # print\("rules:", higher, lower)
-            if higher.is_conflicting_with(lower):
-                # print\("conflict")
-                priority_matrix.add(
-                    (rule_indices[parsed_priority[0]], rule_indices[parsed_priority[1]])
-                )
+            # Priorities between non-conflicting rules are kept as well, as they may be part of transitive ones.
+            priority_matrix.add(
+                (rule_indices[parsed_priority[0]], rule_indices[parsed_priority[1]])
+            )
         # print\(priority_matrix)
         return ParsedPriorityRelation(rule_indices, priority_matrix)
 
@@ -83,17 +78,6 @@ class PriorityRelationParser:  # FIXME Check that all names appearing in priorit
     #                 conflict_matrix[i][j] = 1
     #     return dok_matrix(conflict_matrix)
 
-    def __generate_default_priorities(self, rule_names) -> Set[Tuple[int]]:
-        n: int = len(self.rules)
-        priority_matrix = set()
-        for i in range(n - 1):
-            row_rule: Rule = self.rules[rule_names[i]]
-            for j in range(i + 1, n):
-                col_rule: Rule = self.rules[rule_names[j]]
-                if row_rule.is_conflicting_with(col_rule):
-                    priority_matrix.add((j, i))
-        return priority_matrix
-
     def __parse_priority_str(self, priority_string: str) -> List[str]:
         if not re.match(
             r"^[a-zA-Z]\w*\s*\>\s*[a-zA-Z]\w*", priority_string, flags=re.ASCII
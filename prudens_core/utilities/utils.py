@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 
 
 def parse_dict_prop(
@@ -20,3 +20,11 @@ def parse_dict_prop(
                 f"Expected input of type {types_str} for {class_name}.{dict_key} but received {type(object_attr)}."
             )
     return object_attr
+
+
+def get_bits(bitset: int) -> Iterator[int]:
+    """The positions of the set bits of `bitset` (a non-negative int), in increasing order."""
+    while bitset:
+        lowest: int = bitset & -bitset
+        yield lowest.bit_length() - 1
+        bitset ^= lowest
@@ -0,0 +1,66 @@
+"""Argument-position indexes, lookups, membership checks and groundness of contexts."""
+from typing import List, Set
+from prudens_core.entities.Context import Context
+from prudens_core.entities.OverlayContext import OverlayContext
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+
+
+def make_locations() -> Context:
+    """Plenty of facts for indexes to kick in, along with a non-ground one."""
+    return Context(" ".join(f"loc(c{i % 10}, d{i});" for i in range(40)) + " loc(X, d0);")
+
+
+def test_bound_lookups_use_argument_indexes() -> None:
+    context: Context = make_locations()
+    literal: Literal = Literal("loc(c3, Y)")
+    for _ in range(Context.INDEX_MIN_REQUESTS + 1):
+        candidates: Set[str] = {str(x) for x in context.candidates(literal)}
+    assert candidates == {"loc(c3, d3)", "loc(c3, d13)", "loc(c3, d23)", "loc(c3, d33)", "loc(X, d0)"}
+    context.add_literal(Literal("loc(c3, d40)"))
+    context.remove_literal(Literal("loc(c3, d13)"))
+    assert {str(x) for x in context.candidates(literal)} == candidates.difference({"loc(c3, d13)"}).union(
+        {"loc(c3, d40)"}
+    )
+
+
+def test_unify_matches_full_scan() -> None:
+    context: Context = make_locations()
+    for literal in [Literal("loc(c3, Y)"), Literal("loc(X, d0)"), Literal("loc(c5, d5)")]:
+        for _ in range(Context.INDEX_MIN_REQUESTS + 1):
+            subs: List[str] = sorted(str(x) for x in context.unify(literal))
+        expected: List[str] = sorted(
+            str(literal.unify(x)) for x in context.get_bucket(literal.signature) if literal.unifies(x)
+        )
+        assert subs == expected
+
+
+def test_membership_of_ground_and_non_ground_literals() -> None:
+    context: Context = make_locations()
+    assert Literal("loc(c3, d13)") in context
+    assert Literal("loc(c3, d14)") not in context
+    assert Literal("loc(X, d0)") in context
+    context.remove_literal(Literal("loc(c3, d13)"))
+    assert Literal("loc(c3, d13)") not in context
+
+
+def test_ground_signatures() -> None:
+    context: Context = make_locations()
+    assert not context.is_ground_signature("loc2") and context.is_ground_signature("missing0")
+    context.remove_literal(Literal("loc(X, d0)"))
+    assert context.is_ground_signature("loc2")
+    overlay: OverlayContext = OverlayContext(context)
+    overlay.add_literal(Literal("loc(c0, Y)"))
+    assert not overlay.is_ground_signature("loc2") and context.is_ground_signature("loc2")
+
+
+def test_lookups_with_bound_values() -> None:
+    context: Context = make_locations()
+    arguments = [Constant.interned("c3"), Variable.interned("Y")]
+    for _ in range(Context.INDEX_MIN_REQUESTS):
+        expected: List[Literal] = context.candidates(Literal("loc(c3, Y)"))
+    assert context.lookup("loc2", arguments) == expected and len(expected) == 5
+    overlay: OverlayContext = OverlayContext(context)
+    overlay.remove_literal(Literal("loc(c3, d13)"))
+    assert {str(x) for x in overlay.lookup("loc2", arguments)} == {str(x) for x in expected} - {"loc(c3, d13)"}
@@ -0,0 +1,47 @@
+"""Construction and maintenance of Hasse diagrams of rule signatures."""
+from typing import Set, Tuple
+from prudens_core.entities.Policy import Policy, HasseDiagram, RuleSignature
+
+POLICY: str = """@Policy
+    R1 :: a(X) implies x(X);
+    R2 :: a(X), b(X), c(X) implies y(X);
+    R3 :: a(X), a(Y) implies z(X);
+    R4 :: b(X), a(X) implies w(X);
+    @Priorities
+    R2 > R1;"""
+
+
+def named_edges(diagram: HasseDiagram) -> Set[Tuple[str, str]]:
+    return {(str(diagram.node_indices_rev[x]), str(diagram.node_indices_rev[y])) for x, y in diagram.edges}
+
+
+def test_edges_are_the_transitive_reduction() -> None:
+    diagram: HasseDiagram = HasseDiagram(Policy(POLICY).rules)
+    assert named_edges(diagram) == {("a1", "a1|a1"), ("a1", "a1|b1"), ("a1|b1", "a1|b1|c1")}
+
+
+def test_repeated_literals_are_counted() -> None:
+    assert RuleSignature("a1").is_subsignature(RuleSignature("a1|a1"))
+    assert not RuleSignature("a1|a1").is_subsignature(RuleSignature("a1|b1"))
+    assert RuleSignature("b1|a1").is_subsignature(RuleSignature("a1|c1|b1"))
+
+
+def test_added_nodes_are_linked_in_between() -> None:
+    rules = Policy(POLICY).rules
+    diagram: HasseDiagram = HasseDiagram({x: rules[x] for x in ["R1", "R2", "R3"]})
+    assert named_edges(diagram) == {("a1", "a1|a1"), ("a1", "a1|b1|c1")}
+    diagram.add_node(rules["R4"].signature, ["R4"])
+    assert named_edges(diagram) == {("a1", "a1|a1"), ("a1", "a1|b1"), ("a1|b1", "a1|b1|c1")}
+
+
+def test_node_ids_are_stable() -> None:
+    rules = Policy(POLICY).rules
+    diagram: HasseDiagram = HasseDiagram(rules)
+    ids = dict(diagram.node_indices)
+    diagram.remove_rule(rules["R4"])
+    assert named_edges(diagram) == {("a1", "a1|a1"), ("a1", "a1|b1|c1")}
+    assert all(diagram.node_indices[x] == ids[x] for x in diagram.node_indices.keys())
+    diagram.add_node("b1", ["R5"])
+    assert diagram.node_indices[RuleSignature("b1")] == max(ids.values()) + 1
+    assert named_edges(diagram) == {("a1", "a1|a1"), ("a1", "a1|b1|c1"), ("b1", "a1|b1|c1")}
+    assert list(diagram) == ["R1", "R5", "R3", "R2"]
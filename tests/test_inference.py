@@ -0,0 +1,312 @@
+"""
+Equivalence of the inference engines with each other and of incremental updates and batch or asynchronous inference
+with plain inference, as well as budgets cutting inference short. Run from the repository root, e.g.:
+
+    python -m pytest tests
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, List, Set, Tuple
+import pytest
+from prudens_core.entities.Policy import Policy, InferenceResult
+from prudens_core.entities.Context import Context
+from prudens_core.entities.Budget import Budget
+
+ENGINES: List[str] = ["interpreter", "compiled", "encoded", "columnar", "rete"]
+
+POLICIES: Dict[str, str] = {
+    "birds": """@Policy
+        R1 :: bird(X) implies flies(X);
+        R2 :: bird(X), penguin(X) implies -flies(X);
+        R3 :: bird(X), penguin(X), small(X) implies cute(X);
+        R4 :: super(X) implies flies(X);
+        R5 :: flies(X), small(X) implies -cute(X);
+        R6 :: true implies t;
+        R7 :: true, bird(X) implies tame(X);
+        @Priorities
+        R2 > R1;
+        R4 > R2;""",
+    "paths": """@Policy
+        T1 :: edge(X, Y) implies path(X, Y);
+        T2 :: path(X, Y), edge(Y, Z) implies path(X, Z);
+        T3 :: path(X, X), node(X) implies cyclic(X);
+        T4 :: node(X), blocked(X) implies -cyclic(X);
+        T5 :: path(X, Y), blocked(Y) implies -path(X, Y);
+        @Priorities
+        T4 > T3;
+        T5 > T2;""",
+}
+
+
+def generate_facts(policy_name: str, n_facts: int, seed: int) -> List[str]:
+    """`n_facts` distinct facts for the policy `policy_name`, of which there are only 48 for birds."""
+    rng: random.Random = random.Random(seed)
+    facts: Set[str] = set()
+    while len(facts) < n_facts:
+        a: str = f"c{rng.randrange(12)}"
+        b: str = f"c{rng.randrange(12)}"
+        if policy_name == "birds":
+            facts.add(rng.choice([f"bird({a})", f"penguin({a})", f"small({a})", f"super({a})"]))
+        else:
+            facts.add(rng.choice([f"edge({a}, {b})", f"edge({a}, {b})", f"node({a})", f"blocked({a})"]))
+    return sorted(facts)
+
+
+def make_context(facts: List[str]) -> Context:
+    return Context(" ".join(x + ";" for x in facts))
+
+
+def summarize(result: InferenceResult) -> Tuple[Set[str], Set[str]]:
+    """The inferences and the dilemmas, as strings."""
+    return {str(x) for x in result.inferences}, {str(x) for x in result.dilemmas.keys()}
+
+
+def summarize_graph(result: InferenceResult) -> Tuple[Set[str], Set[str], Dict[str, Dict[str, List[str]]]]:
+    """Same as `summarize()`, along with the rule instances of the inference graph."""
+    return summarize(result) + (
+        {
+            str(literal): {name: sorted(str(x) for x in subs) for name, subs in rule_subs.items()}
+            for literal, rule_subs in result.inference_graph.inferred_by.items()
+        },
+    )
+
+
+@pytest.mark.parametrize("semi_naive", [True, False])
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("policy_name", sorted(POLICIES.keys()))
+def test_engines_agree(policy_name: str, engine: str, semi_naive: bool) -> None:
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    policy: Policy = Policy(POLICIES[policy_name])
+    for seed in range(5):
+        context: Context = make_context(generate_facts(policy_name, 30, seed))
+        expected = summarize_graph(policy.infer(context))
+        assert summarize_graph(policy.infer(context, engine=engine, semi_naive=semi_naive)) == expected
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_rules_starting_with_truisms_fire(engine: str) -> None:
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    policy: Policy = Policy(
+        """@Policy
+        R0 :: true implies t;
+        R1 :: true, p(X) implies q(X);
+        @Priorities
+        R1 > R0;"""
+    )
+    assert summarize(policy.infer(Context("p(a);"), engine=engine))[0] == {"p(a)", "t", "q(a)"}
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_agree_on_non_ground_facts(engine: str) -> None:
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    policy: Policy = Policy(POLICIES["birds"])
+    for seed in range(5):
+        context: Context = make_context(generate_facts("birds", 20, seed) + ["bird(Y)", "small(Z)"])
+        assert summarize(policy.infer(context, engine=engine)) == summarize(policy.infer(context))
+    policy = Policy(
+        """@Policy
+        R1 :: bird(X), small(X) implies cute(X);
+        R2 :: bird(X) implies flies(X);
+        @Priorities
+        R1 > R2;"""
+    )
+    result: InferenceResult = policy.infer(Context("bird(Y); small(a); bird(b);"), engine=engine)
+    assert "cute(a)" in summarize(result)[0]
+
+
+def test_only_recursive_predicates_share_a_recursive_stratum() -> None:
+    strata = Policy(POLICIES["paths"]).strata
+    assert [sorted(x.rules) for x in strata if x.recursive] == [["T1", "T2", "T5"]]
+    assert not any(x.recursive for x in Policy(POLICIES["birds"]).strata)
+
+
+@pytest.mark.parametrize("policy_name", sorted(POLICIES.keys()))
+def test_update_matches_inference_from_scratch(policy_name: str) -> None:
+    policy: Policy = Policy(POLICIES[policy_name])
+    rng: random.Random = random.Random(0)
+    facts: List[str] = generate_facts(policy_name, 30, 0)
+    pool: List[str] = generate_facts(policy_name, 40, 1)
+    result: InferenceResult = policy.infer(make_context(facts))
+    for _ in range(10):
+        removed: List[str] = rng.sample(facts, 3)
+        added: List[str] = rng.sample([x for x in pool if x not in facts], 3)
+        policy.update(make_context(added), make_context(removed), result)
+        facts = sorted(set(facts).difference(removed).union(added))
+        expected: InferenceResult = policy.infer(make_context(facts))
+        assert summarize(result) == summarize(expected)
+
+
+def test_infer_leaves_context_untouched() -> None:
+    policy: Policy = Policy(POLICIES["paths"])
+    facts: List[str] = generate_facts("paths", 30, 0)
+    context: Context = make_context(facts)
+    expected: Tuple[Set[str], Set[str]] = summarize(policy.infer(context))
+    assert {str(x) for x in context} == set(facts)
+    assert summarize(policy.infer(context)) == expected
+
+
+def test_infer_many_matches_infer() -> None:
+    policy: Policy = Policy(POLICIES["paths"])
+    contexts: List[Context] = [make_context(generate_facts("paths", 30, seed)) for seed in range(4)]
+    expected: List[Set[str]] = [summarize(policy.infer(x))[0] for x in contexts]
+    assert [summarize(x)[0] for x in policy.infer_many(contexts, workers=2)] == expected
+    unordered = sorted(policy.infer_many(contexts, workers=2, ordered=False), key=lambda x: x[0])
+    assert [summarize(x)[0] for _, x in unordered] == expected
+
+
+def test_concurrent_calls_get_their_own_results() -> None:
+    policy: Policy = Policy(POLICIES["paths"])
+    contexts: List[Context] = [make_context(generate_facts("paths", 30, seed)) for seed in range(8)]
+    expected: List[Tuple[Set[str], Set[str]]] = [summarize(policy.infer(x)) for x in contexts]
+    results: List[InferenceResult] = [InferenceResult() for _ in contexts]
+
+    def run(i: int) -> None:
+        results[i] = policy.infer(contexts[i])
+
+    threads: List[threading.Thread] = [threading.Thread(target=run, args=(i,)) for i in range(len(contexts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [summarize(x) for x in results] == expected
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_budget_truncates_inference(engine: str) -> None:
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    policy: Policy = Policy(POLICIES["paths"])
+    context: Context = make_context(generate_facts("paths", 30, 0))
+    assert not policy.infer(context, engine=engine, budget=Budget(timeout=60)).truncated
+    assert policy.infer(context, engine=engine, budget=Budget(max_operations=20)).truncated
+    budget: Budget = Budget()
+    budget.cancel()
+    assert policy.infer(context, engine=engine, budget=budget).truncated
+
+
+def test_budget_exhausted_while_computing_graph_infers_nothing() -> None:
+    policy: Policy = Policy(POLICIES["paths"])
+    facts: List[str] = generate_facts("paths", 30, 0)
+    result: InferenceResult = policy.infer(make_context(facts), budget=Budget(max_operations=20))
+    assert result.truncated
+    assert result.depth == 0
+    assert summarize(result) == (set(facts), set())
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_budget_cuts_cartesian_joins_short(engine: str) -> None:
+    if engine == "columnar":
+        pytest.importorskip("numpy")
+    policy: Policy = Policy(
+        """@Policy
+        R1 :: a(X), a(Y), a(Z) implies b(X, Y, Z);
+        R2 :: a(X) implies c(X);
+        @Priorities
+        R1 > R2;"""
+    )
+    context: Context = make_context([f"a(x{i})" for i in range(60)])
+    start: float = time.monotonic()
+    result: InferenceResult = policy.infer(context, engine=engine, budget=Budget(timeout=0.2))
+    assert result.truncated
+    assert time.monotonic() - start < 2.0
+
+
+def test_ainfer_evaluates_plain_and_async_externals() -> None:
+    policy: Policy = Policy(
+        """@Policy
+        R1 :: item(X), ?weight(X, W) implies weighs(X, W);
+        R2 :: weighs(X, W), ?lt(W, 10) implies light(X);
+        @Priorities
+        R2 > R1;"""
+    )
+
+    def weight(x, w):
+        time.sleep(0.01)
+        return [(x, len(x) * 3)]
+
+    async def lt(a, b):
+        await asyncio.sleep(0.01)
+        return a < b
+
+    result: InferenceResult = asyncio.run(
+        policy.ainfer(Context("item(ab); item(abcd);"), externals={"weight": weight, "lt": lt})
+    )
+    inferences: Set[str] = {str(x) for x in result.inferences}
+    assert {"weighs(ab, 6)", "weighs(abcd, 12)", "light(ab)"} <= inferences
+    assert "light(abcd)" not in inferences
+
+
+def test_ainfer_dispatches_calls_while_others_are_pending(monkeypatch: pytest.MonkeyPatch) -> None:
+    policy: Policy = Policy(
+        """@Policy
+        R1 :: item(X), ?slow(X) implies slow(X);
+        R2 :: item(X), ?weight(X, W) implies weighs(X, W);
+        R3 :: weighs(X, W), ?lt(W, 10) implies light(X);
+        R4 :: slow(X), weighs(X, W) implies -light(X);
+        @Priorities
+        R4 > R3;"""
+    )
+    infer_calls: List[Context] = []
+    plain_infer = Policy.infer
+
+    def counting_infer(self: Policy, context: Context, **kwargs) -> InferenceResult:
+        infer_calls.append(context)
+        return plain_infer(self, context, **kwargs)
+
+    monkeypatch.setattr(Policy, "infer", counting_infer)
+    slow_done: threading.Event = threading.Event()
+    dispatched_while_slow: List[bool] = []
+
+    async def slow(x):
+        await asyncio.sleep(0.3)
+        slow_done.set()
+        return x == "ab"
+
+    def lt(a, b):
+        dispatched_while_slow.append(not slow_done.is_set())
+        return a < b
+
+    result: InferenceResult = asyncio.run(
+        policy.ainfer(
+            Context("item(ab); item(abcd);"),
+            externals={"slow": slow, "weight": lambda x, w: [(x, len(x) * 3)], "lt": lt},
+        )
+    )
+    assert dispatched_while_slow == [True, True]
+    assert len(infer_calls) == 1  # Outcomes are fed into the same result instead of inferring again.
+    outcomes: str = "?slow(ab); -?slow(abcd); ?weight(ab, 6); ?weight(abcd, 12); ?lt(6, 10); -?lt(12, 10);"
+    expected: Tuple[Set[str], Set[str]] = summarize(plain_infer(policy, Context("item(ab); item(abcd); " + outcomes)))
+    assert summarize(result) == expected
+    assert "-light(ab)" in expected[0] and "light(abcd)" not in expected[0]
+
+
+def test_ainfer_cancels_pending_calls_past_the_deadline() -> None:
+    policy: Policy = Policy(
+        """@Policy
+        R1 :: item(X), ?slow(X) implies slow(X);
+        R2 :: item(X) implies seen(X);
+        @Priorities
+        R1 > R2;"""
+    )
+    cancelled: List[bool] = []
+
+    async def slow(x):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return True
+
+    start: float = time.monotonic()
+    result: InferenceResult = asyncio.run(
+        policy.ainfer(Context("item(a);"), externals={"slow": slow}, budget=Budget(timeout=0.2))
+    )
+    assert time.monotonic() - start < 2.0
+    assert result.truncated and cancelled == [True]
+    assert "seen(a)" in {str(x) for x in result.inferences}  # Everything inferred without the dropped outcomes.
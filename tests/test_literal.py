@@ -0,0 +1,48 @@
+"""Interning of constants, variables and ground literals."""
+import pickle
+from typing import Dict, List
+from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Context import Context
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+
+
+def test_symbols_are_interned() -> None:
+    assert Constant.interned("a") is Constant.interned("a")
+    assert Variable.interned("X") is Variable.interned("X")
+    assert Literal.interned("p(a, b)") is Literal.interned("p(a,b)")
+    assert Literal.interned("p(X, b)") is not Literal.interned("p(X, b)")
+
+
+def test_parsed_facts_are_shared() -> None:
+    fact: Literal = next(iter(Context("p(a, b);")))
+    assert next(iter(Context("q(c); p(a, b);").get_bucket(fact.signature))) is fact
+    assert fact.arguments[0] is Constant.interned("a")
+
+
+def test_cached_hashes_survive_pickling() -> None:
+    literal: Literal = Literal.interned("p(a, b)")
+    copy: Literal = pickle.loads(pickle.dumps(literal))
+    assert copy == literal and hash(copy) == hash(literal)
+    constant: Constant = pickle.loads(pickle.dumps(Constant.interned("a")))
+    assert constant == Constant.interned("a") and hash(constant) == hash(Constant.interned("a"))
+
+
+def test_ground_instances_are_interned() -> None:
+    sub: Substitution = Substitution()
+    sub.extend((Variable.interned("X"), Constant.interned("a")))
+    literal: Literal = Literal.interned("p(a, b)")
+    assert sub.apply(Literal("p(X, b)")) is literal
+    complement: Literal = literal.complement()
+    assert complement is not literal and str(complement) == "-p(a, b)" and str(literal) == "p(a, b)"
+
+
+def test_derived_instances_keep_their_own_string() -> None:
+    sub: Substitution = Substitution()
+    sub.extend((Variable.interned("X"), Constant.interned("tweety")))
+    derived: Literal = sub.apply(Literal("flies(X)"))
+    fact: Literal = next(iter(Context("flies(tweety);")))
+    assert fact is derived and fact.original_string == "flies(tweety)"
+    facts: List[Dict] = [x for bucket in Context("flies(tweety);").to_dict()["facts"].values() for x in bucket]
+    assert [x["original_string"] for x in facts] == ["flies(tweety)"]
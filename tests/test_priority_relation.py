@@ -0,0 +1,53 @@
+"""Compiled priority relations."""
+import pytest
+from prudens_core.entities.Policy import Policy
+from prudens_core.entities.Context import Context
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+from prudens_core.entities.Substitution import Substitution
+from prudens_core.errors.SyntaxErrors import CyclicPriorityError
+
+RULES: str = """@Policy
+    R1 :: a(X) implies -p(X);
+    R2 :: a(X) implies q(X);
+    R3 :: a(X) implies p(X);
+    R4 :: a(X) implies -q(X, X);
+    @Priorities
+"""
+
+
+def test_priorities_are_transitive() -> None:
+    policy: Policy = Policy(RULES + "R1 > R2; R2 > R3;")
+    assert policy.priorities.is_preferred("R1", "R3")
+    assert not policy.priorities.is_preferred("R3", "R1")
+    sub: Substitution = Substitution()
+    sub.extend((Variable("X"), Constant("c")))
+    rules = {"R1": {sub}, "R3": {sub}}
+    assert policy.priorities.is_prior("R1", rules, sub)
+    assert not policy.priorities.is_prior("R3", rules, sub)
+    result = policy.infer(Context("a(c);"))
+    assert {str(x) for x in result.inferences} == {"a(c)", "-p(c)", "q(c)", "-q(c, c)"}
+    assert len(result.dilemmas) == 0
+
+
+def test_cyclic_priorities_are_rejected() -> None:
+    with pytest.raises(CyclicPriorityError) as e:
+        Policy(RULES + "R1 > R2; R2 > R3; R3 > R1; R4 > R1;")
+    assert "R1 > R2 > R3 > R1" in str(e.value) or "R2 > R3 > R1 > R2" in str(e.value) or (
+        "R3 > R1 > R2 > R3" in str(e.value)
+    )
+
+
+def test_default_priorities_compare_rule_indices() -> None:
+    policy: Policy = Policy(RULES + "default")
+    assert policy.priorities.default and len(policy.priorities.priorities) == 0
+    assert policy.priorities.is_preferred("R3", "R1")
+    assert not policy.priorities.is_preferred("R1", "R3")
+    result = policy.infer(Context("a(c);"))
+    assert {str(x) for x in result.inferences} == {"a(c)", "p(c)", "q(c)", "-q(c, c)"}
+
+
+def test_only_opposite_heads_of_the_same_signature_are_candidate_conflicts() -> None:
+    candidates = Policy(RULES + "default").priorities.candidate_conflicts
+    assert candidates["R1"] == {"R3"} and candidates["R3"] == {"R1"}
+    assert len(candidates["R2"]) == 0 and len(candidates["R4"]) == 0
@@ -0,0 +1,68 @@
+"""Joins of rule bodies against small deltas and carrying body matches over between rules that embed into each other."""
+from typing import List, Set, Tuple
+from prudens_core.entities.Policy import Policy
+from prudens_core.entities.Budget import Budget
+from prudens_core.entities.Context import Context
+from prudens_core.entities.Rule import Rule
+from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Variable import Variable
+
+POLICY: str = """@Policy
+    R1 :: bird(X), penguin(X) implies -flies(X);
+    R2 :: penguin(Y), small(Y), bird(Y) implies cute(Y);
+    R3 :: bird(X) implies flies(X);
+    @Priorities
+    R1 > R3;"""
+
+
+def make_context() -> Context:
+    return Context(
+        " ".join(f"bird(b{i});" for i in range(10))
+        + " penguin(b1); penguin(b2); penguin(b3); penguin(c0); small(b1); small(b3); small(b4);"
+    )
+
+
+def instances(triggered) -> Set[Tuple[str, str]]:
+    return {(str(literal), str(sub)) for literal, sub in triggered}
+
+
+def test_small_deltas_probe_argument_indexes() -> None:
+    rule: Rule = Rule("R1 :: r(X), edge(X, Y) implies r(Y)")
+    context: Context = Context(" ".join(f"edge(c{i}, c{i + 1});" for i in range(1000)) + " r(c0); r(c500);")
+    for fact in ["r(c0)", "r(c500)"]:  # The first lookup builds the index of edges on their first argument.
+        budget: Budget = Budget()
+        triggered = instances(rule.trigger(context, Context(fact + ";"), budget))
+    assert triggered == {("r(c501)", "X -> c500; Y -> c501;")}
+    assert budget.operations < 10
+
+
+def test_trigger_from_extends_donor_matches() -> None:
+    rules = Policy(POLICY).rules
+    assert rules["R2"].embed(rules["R1"]) is None
+    embedding = rules["R1"].embed(rules["R2"])
+    assert embedding is not None and embedding[1] == [1]
+    context: Context = make_context()
+    subs: List[Substitution] = [sub for _, sub in rules["R1"].trigger(context)]
+    assert len(subs) == 3
+    expected = instances(rules["R2"].trigger(context))
+    assert instances(rules["R2"].trigger_from(context, subs, embedding)) == expected
+    # Only carried over matches are extended, so bindings missing from them are not joined again.
+    subs = [x for x in subs if "b3" not in str(x)]
+    assert instances(rules["R2"].trigger_from(context, subs, embedding)) == {("cute(b1)", "Y -> b1;")}
+
+
+def test_trigger_from_rejects_bindings_to_variables() -> None:
+    rules = Policy(POLICY).rules
+    embedding = rules["R1"].embed(rules["R2"])
+    sub: Substitution = Substitution()
+    sub.extend((Variable("X"), Variable("Z")))
+    assert rules["R2"].trigger_from(make_context(), [sub], embedding) is None
+
+
+def test_donors_may_belong_to_earlier_strata() -> None:
+    policy: Policy = Policy(POLICY)
+    stratum = next(x for x in policy.strata if "R2" in x.rules)
+    assert "R1" not in stratum.rules
+    donors = stratum.get_donors("R2", policy.rules, policy.rule_hasse_diagram)
+    assert [name for name, _ in donors] == ["R1"]
+    assert {str(x) for x in policy.infer(make_context()).inferences} >= {"cute(b1)", "cute(b3)", "-flies(b1)"}
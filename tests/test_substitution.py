@@ -0,0 +1,54 @@
+"""Hashing of substitutions and their variable equivalence classes."""
+from prudens_core.entities.Substitution import Substitution
+from prudens_core.entities.Constant import Constant
+from prudens_core.entities.Variable import Variable
+
+X: Variable = Variable("X")
+Y: Variable = Variable("Y")
+Z: Variable = Variable("Z")
+a: Constant = Constant("a")
+b: Constant = Constant("b")
+
+
+def test_hash_ignores_binding_order() -> None:
+    sub: Substitution = Substitution()
+    sub.extend((X, a))
+    sub.extend((Y, b))
+    other: Substitution = Substitution()
+    other.extend((Y, b))
+    other.extend((X, a))
+    assert sub == other and hash(sub) == hash(other)
+    assert Substitution.from_values([Y, X], [b, a]) == sub
+    assert hash(Substitution.from_values([Y, X], [b, a])) == hash(sub)
+
+
+def test_copies_are_independent() -> None:
+    sub: Substitution = Substitution()
+    sub.extend((X, a))
+    copy: Substitution = sub.copy()
+    copy.extend((Y, b))
+    assert Y not in sub.sub.keys()
+    assert copy != sub and hash(copy) != hash(sub)
+
+
+def test_binding_a_class_binds_all_its_members() -> None:
+    sub: Substitution = Substitution()
+    sub.extend((X, Y))
+    sub.extend((Y, Z))
+    assert sub.equivalent_variables[X] == {X, Y, Z}
+    sub.extend((Z, a))
+    assert sub.sub == {X: a, Y: a, Z: a}
+    assert sub.equivalent_variables == dict()
+
+
+def test_undo_reverts_bindings_and_unions() -> None:
+    sub: Substitution = Substitution()
+    sub.extend((X, b))
+    expected: Substitution = sub.copy()
+    mark: int = sub.mark()
+    sub.extend((Y, Z))
+    sub.extend((Z, a))
+    assert sub.sub[Y] == a
+    sub.undo(mark)
+    assert sub == expected and hash(sub) == hash(expected)
+    assert sub.equivalent_variables == dict()
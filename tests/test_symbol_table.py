@@ -0,0 +1,18 @@
+"""Encoding and decoding of ground literals through symbol tables."""
+from prudens_core.entities.Literal import Literal
+from prudens_core.entities.SymbolTable import SymbolTable
+
+
+def test_decoding_returns_interned_literals_untouched() -> None:
+    literal: Literal = Literal.interned("r(d,e)")  # Written differently from `str(literal)`.
+    symbols: SymbolTable = SymbolTable()
+    assert symbols.decode_literal(symbols.encode_literal(literal)) is literal
+    assert literal.original_string == "r(d,e)"
+
+
+def test_decoded_literals_are_complete() -> None:
+    symbols: SymbolTable = SymbolTable()
+    fact = symbols.encode_literal(Literal("-q(c, 12)"))
+    literal: Literal = symbols.decode_literal(fact)
+    assert str(literal) == "-q(c, 12)" and literal.original_string == "-q(c, 12)"
+    assert symbols.encode_literal(literal) == fact